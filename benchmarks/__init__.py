@@ -0,0 +1 @@
+"""Benchmarks for Carbon feeds, run against synthetic SQLite databases."""
@@ -0,0 +1,58 @@
+"""Compare the row and columnar transforms for both feeds at several scales.
+
+Requires pyarrow.
+
+Usage: python -m benchmarks.columnar --records 10000 --records 100000
+"""
+
+import os
+import tempfile
+from functools import partial
+
+import click
+
+from benchmarks.common import create_benchmark_engine, time_call
+from carbon.feed import ArticlesXmlFeed, PeopleXmlFeed
+
+
+@click.command()
+@click.option(
+    "--records",
+    type=int,
+    multiple=True,
+    default=(10_000, 100_000),
+    help="Number of records; repeat the option to benchmark several scales.",
+)
+@click.option(
+    "--batch_size", type=int, default=10_000, help="Number of rows per Arrow table."
+)
+def main(records: tuple[int, ...], batch_size: int) -> None:
+    for record_count in records:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_benchmark_engine(
+                directory, people_count=record_count, article_count=record_count
+            )
+            for feed_class in (PeopleXmlFeed, ArticlesXmlFeed):
+                for columnar_batch_size in (None, batch_size):
+                    with open(os.devnull, "wb") as output_file:
+                        feed = feed_class(
+                            engine=engine,
+                            output_file=output_file,
+                            columnar_batch_size=columnar_batch_size,
+                        )
+                        nsmap = getattr(feed, "namespace_mapping", {})
+                        seconds = time_call(partial(feed.run, nsmap=nsmap))
+                    mode = (
+                        f"columnar ({columnar_batch_size})"
+                        if columnar_batch_size
+                        else "row"
+                    )
+                    click.echo(
+                        f"records={record_count} {feed_class.__name__} {mode}: "
+                        f"{seconds:.2f}s, "
+                        f"{feed.processed_record_count / seconds:,.0f} records/s"
+                    )
+
+
+if __name__ == "__main__":
+    main()
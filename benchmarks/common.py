@@ -0,0 +1,124 @@
+import os
+import time
+from collections.abc import Callable
+from contextlib import closing
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from carbon.database import (
+    DatabaseEngine,
+    aa_articles,
+    dlcs,
+    metadata,
+    orcids,
+    persons,
+)
+
+BATCH_SIZE = 10_000
+
+
+def _scrambled_id(index: int) -> str:
+    # multiplying by a number coprime to 10**9 is a permutation of the 9-digit ids,
+    # so ids are unique but not inserted in sorted order
+    return f"{index * 2654435761 % 10**9:09d}"
+
+
+def _insert_in_batches(
+    engine: DatabaseEngine,
+    table: Any,  # noqa: ANN401
+    count: int,
+    create_row: Callable[[int], dict[str, Any]],
+) -> None:
+    with closing(engine().connect()) as connection:
+        for start in range(0, count, BATCH_SIZE):
+            connection.execute(
+                table.insert(),
+                [
+                    create_row(index)
+                    for index in range(start, min(start + BATCH_SIZE, count))
+                ],
+            )
+        connection.commit()
+
+
+def _person(index: int) -> dict[str, Any]:
+    return {
+        "MIT_ID": _scrambled_id(index),
+        "KRB_NAME_UPPERCASE": f"USER{index}",
+        "FIRST_NAME": "Þorgerðr",
+        "MIDDLE_NAME": "Hǫlgabrúðr",
+        "LAST_NAME": f"Person {index}",
+        "EMAIL_ADDRESS": f"user{index}@example.com",
+        "DATE_TO_FACULTY": datetime(2015, 1, 1) if index % 3 else None,  # noqa: DTZ001
+        "ORIGINAL_HIRE_DATE": datetime(2010, 1, 1),  # noqa: DTZ001
+        "APPOINTMENT_END_DATE": datetime(2999, 12, 31),  # noqa: DTZ001
+        "PERSONNEL_SUBAREA_CODE": "CFAT" if index % 2 else "COAC",
+        "JOB_TITLE": "PROFESSOR",
+        "HR_ORG_UNIT_ID": str(index % 100),
+    }
+
+
+def _dlc(index: int) -> dict[str, Any]:
+    return {
+        "HR_ORG_UNIT_ID": str(index),
+        "ORG_HIER_SCHOOL_AREA_NAME": "SCIENCE AREA",
+        "DLC_NAME": f"Department {index}",
+        "HR_ORG_LEVEL5_NAME": f"Department {index} Level 5",
+    }
+
+
+def _orcid(index: int) -> dict[str, Any]:
+    return {"MIT_ID": _scrambled_id(index), "ORCID": f"http://example.com/{index}"}
+
+
+def _article(index: int) -> dict[str, Any]:
+    return {
+        "AA_MATCH_SCORE": Decimal("0.9"),
+        "ARTICLE_ID": _scrambled_id(index),
+        "ARTICLE_TITLE": f"Interaction between microfluids and the Abyss ☈ {index}",
+        "ARTICLE_YEAR": "1999",
+        "AUTHORS": "McRandallson, Randall M.|Lord, Dark|☭",
+        "DOI": f"10.0000/{index}",
+        "ISSN_ELECTRONIC": "0987654",
+        "ISSN_PRINT": "01234567",
+        "IS_CONFERENCE_PROCEEDING": "0",
+        "JOURNAL_FIRST_PAGE": "666",
+        "JOURNAL_LAST_PAGE": "667",
+        "JOURNAL_ISSUE": "10",
+        "JOURNAL_NAME": "Bunnies",
+        "JOURNAL_VOLUME": "1",
+        "MIT_ID": _scrambled_id(index % 5000),
+        "PUBLISHER": "MIT Press",
+    }
+
+
+def create_benchmark_engine(
+    directory: str, people_count: int = 0, article_count: int = 0
+) -> DatabaseEngine:
+    """Create a SQLite database file populated with synthetic feed records.
+
+    Args:
+        directory (str): The directory in which the database file is created.
+        people_count (int, optional): The number of 'people' records. Every person
+            matches the 'people' feed query. Defaults to 0.
+        article_count (int, optional): The number of 'articles' records. Defaults to 0.
+
+    Returns:
+        DatabaseEngine: An engine connected to the populated database.
+    """
+    engine = DatabaseEngine()
+    engine.configure(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+    metadata.create_all(bind=engine())
+    _insert_in_batches(engine, persons, people_count, _person)
+    _insert_in_batches(engine, orcids, people_count, _orcid)
+    _insert_in_batches(engine, dlcs, min(people_count, 100), _dlc)
+    _insert_in_batches(engine, aa_articles, article_count, _article)
+    return engine
+
+
+def time_call(function: Callable[[], Any]) -> float:
+    """Return the number of seconds taken to call a function."""
+    start_time = time.perf_counter()
+    function()
+    return time.perf_counter() - start_time
@@ -0,0 +1,177 @@
+"""Run the FTP pipe end to end over simulated network links.
+
+For each network profile, a local FTPS server is started behind a proxy that adds
+latency, limits bandwidth, stalls, or drops the upload (see benchmarks.network),
+and carbon.app.DatabaseToFtpPipe.run uploads the 'articles' feed through it. The
+throughput, the time the feed spent writing (which includes waiting for the
+upload), and the outcome are printed. If a run fails, it is run again over the
+same link to measure the time to recover.
+
+The upload can be paced with --upload_rate_limit (see
+carbon.ratelimit.RateSchedule).
+
+Usage: python -m benchmarks.ftps_network --records 20000 --mode streamed
+"""
+
+import gc
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import click
+
+from benchmarks.common import create_benchmark_engine
+from benchmarks.network import PROXY_HOST, NetworkProfile, run_proxied_ftps_server
+from carbon.app import DatabaseToFtpPipe
+from carbon.config import Config
+from carbon.database import DatabaseEngine
+from carbon.metrics import metrics
+from carbon.ratelimit import RateSchedule
+
+NETWORK_PROFILES = {
+    "local": NetworkProfile("local"),
+    "wan": NetworkProfile("wan", latency=0.04, bandwidth=2 * 1024**2),
+    "slow": NetworkProfile("slow", latency=0.15, bandwidth=256 * 1024),
+    "stalls": NetworkProfile(
+        "stalls",
+        latency=0.04,
+        bandwidth=2 * 1024**2,
+        stall_interval=1.0,
+        stall_seconds=2.0,
+    ),
+    "disconnect": NetworkProfile(
+        "disconnect",
+        latency=0.04,
+        bandwidth=2 * 1024**2,
+        disconnect_after_bytes=1024**2,
+    ),
+}
+
+
+def run_pipe(
+    engine: DatabaseEngine,
+    mode: str,
+    timeout: float,
+    upload_rate_schedule: RateSchedule | None = None,
+) -> tuple[str, float, dict]:
+    """Run the pipe in a thread, so a run that hangs is reported rather than waited on.
+
+    Returns:
+        tuple[str, float, dict]: The outcome ('ok', 'failed: <error>', or 'hung'),
+            the elapsed seconds, and the summary of the pipe.
+    """
+    pipe = DatabaseToFtpPipe(
+        config=Config(),
+        engine=engine,
+        spool=mode == "spooled",
+        buffer_memory_limit=16 * 1024**2 if mode == "buffered" else None,
+        upload_rate_schedule=upload_rate_schedule,
+    )
+    errors: list[Exception] = []
+
+    def run() -> None:
+        try:
+            pipe.run()
+        except Exception as error:  # noqa: BLE001
+            errors.append(error)
+
+    metrics.reset()
+    start_time = time.perf_counter()
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    elapsed_seconds = time.perf_counter() - start_time
+    if thread.is_alive():
+        return "hung", elapsed_seconds, pipe.summary
+    if errors:
+        outcome = f"failed: {errors[0]!r}"
+        # the traceback of the error references the feed's record generator; close
+        # it (and its database connection) now rather than at interpreter exit
+        errors.clear()
+        gc.collect()
+        return outcome, elapsed_seconds, pipe.summary
+    return "ok", elapsed_seconds, pipe.summary
+
+
+@click.command()
+@click.option("--records", type=int, default=20_000, help="Number of article records.")
+@click.option(
+    "--mode",
+    type=click.Choice(["streamed", "buffered", "spooled"]),
+    default="streamed",
+    help="How the feed is connected to the upload.",
+)
+@click.option(
+    "--profile",
+    "profile_names",
+    type=click.Choice(list(NETWORK_PROFILES)),
+    multiple=True,
+    default=tuple(NETWORK_PROFILES),
+    help="Network profiles to run; repeat the option to run several.",
+)
+@click.option(
+    "--timeout", type=float, default=120.0, help="Seconds before a run is hung."
+)
+@click.option(
+    "--upload_rate_limit",
+    multiple=True,
+    help="Rate limit rules for the upload (e.g. '2' or '08:00-18:00=2'), in MB/s.",
+)
+def main(
+    records: int,
+    mode: str,
+    profile_names: tuple[str, ...],
+    timeout: float,
+    upload_rate_limit: tuple[str, ...],
+) -> None:
+    logging.disable(logging.WARNING)
+    upload_rate_schedule = RateSchedule(upload_rate_limit) if upload_rate_limit else None
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_benchmark_engine(directory, article_count=records)
+        ftp_directory = os.path.join(directory, "ftp")
+        os.mkdir(ftp_directory)
+        for profile_name in profile_names:
+            profile = NETWORK_PROFILES[profile_name]
+            with run_proxied_ftps_server(ftp_directory, profile) as (port, proxy):
+                os.environ.update(
+                    FEED_TYPE="articles",
+                    SYMPLECTIC_FTP_PATH="/articles.xml",
+                    SYMPLECTIC_FTP_JSON=(
+                        f'{{"SYMPLECTIC_FTP_HOST": "{PROXY_HOST}", '
+                        f'"SYMPLECTIC_FTP_PORT": "{port}", '
+                        '"SYMPLECTIC_FTP_USER": "user", "SYMPLECTIC_FTP_PASS": "pass"}'
+                    ),
+                )
+                outcome, seconds, summary = run_pipe(
+                    engine, mode, timeout, upload_rate_schedule
+                )
+                uploaded_bytes = summary.get("uploaded_bytes", 0)
+                click.echo(
+                    f"{profile.name} ({mode}): {outcome}, {seconds:.2f}s, "
+                    f"{uploaded_bytes / seconds / 1024**2:.2f} MB/s, "
+                    f"feed write {metrics.gauges.get('write_seconds', 0):.2f}s, "
+                    f"upload {summary.get('upload_seconds', 0):.2f}s, "
+                    f"disconnects {proxy.disconnect_count}"
+                )
+                if upload_rate_schedule:
+                    click.echo(
+                        f"  rate limited: "
+                        f"{summary.get('upload_bytes_per_second', 0) / 1024**2:.2f} "
+                        f"MB/s effective, throttled "
+                        f"{summary.get('upload_throttled_seconds', 0):.2f}s"
+                    )
+                if outcome.startswith("failed"):
+                    outcome, recovery_seconds, _ = run_pipe(
+                        engine, mode, timeout, upload_rate_schedule
+                    )
+                    click.echo(
+                        f"{profile.name} ({mode}) retry: {outcome}, "
+                        f"recovered {seconds + recovery_seconds:.2f}s after the "
+                        "first run started"
+                    )
+
+
+if __name__ == "__main__":
+    main()
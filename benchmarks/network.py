@@ -0,0 +1,264 @@
+"""A local FTPS server behind a proxy that simulates a slow or lossy network link.
+
+The server listens on 127.0.0.2 and the proxy on 127.0.0.1, using the same port
+numbers for passive data connections. ftplib connects data connections to the
+host of the control connection (the proxy) and the port in the PASV reply, so the
+encrypted control connection never has to be rewritten. 127.0.0.2 is a loopback
+address on Linux; on macOS, add it first with 'sudo ifconfig lo0 alias 127.0.0.2'.
+"""
+
+import contextlib
+import os
+import socket
+import threading
+import time
+from collections import deque
+from collections.abc import Generator
+from contextlib import contextmanager
+
+from pyftpdlib.authorizers import DummyAuthorizer
+from pyftpdlib.handlers import TLS_FTPHandler
+from pyftpdlib.servers import FTPServer
+
+PROXY_HOST = "127.0.0.1"
+SERVER_HOST = "127.0.0.2"
+CHUNK_SIZE = 16 * 1024
+# the size of the proxy's socket buffers, which limits how much data the sender can
+# hand to the kernel on the loopback interface ahead of the simulated link
+SOCKET_BUFFER_SIZE = 64 * 1024
+FIXTURES_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "tests", "fixtures"
+)
+
+
+class NetworkProfile:
+    """The characteristics of a simulated network link.
+
+    Attributes:
+        name: The name of the profile, printed with the results.
+        latency: The one-way delay added to every chunk of data, in seconds.
+        bandwidth: The maximum number of bytes per second in each direction of each
+            connection, or None for no limit.
+        stall_interval: The number of seconds between stalls, or None for no stalls.
+        stall_seconds: The duration of each stall, during which no data is forwarded.
+        disconnect_after_bytes: The number of bytes uploaded after which the first
+            data connection is dropped, or None to never drop it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency: float = 0.0,
+        bandwidth: int | None = None,
+        stall_interval: float | None = None,
+        stall_seconds: float = 0.0,
+        disconnect_after_bytes: int | None = None,
+    ):
+        self.name = name
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.stall_interval = stall_interval
+        self.stall_seconds = stall_seconds
+        self.disconnect_after_bytes = disconnect_after_bytes
+
+
+class _Link:
+    """One direction of a proxied connection: delays, throttles, and stalls data."""
+
+    def __init__(
+        self,
+        proxy: "NetworkProxy",
+        source: socket.socket,
+        destination: socket.socket,
+        *,
+        upload: bool,
+    ):
+        self.proxy = proxy
+        self.source = source
+        self.destination = destination
+        self.upload = upload
+        self._chunks: deque[tuple[float, bytes]] = deque()
+        self._queued_bytes = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        # hold at most the data in flight on the link (its bandwidth-delay product),
+        # so a slow link pushes back on the sender as a real one does
+        bandwidth = proxy.profile.bandwidth or 64 * 1024**2
+        self._max_queued_bytes = max(CHUNK_SIZE, int(bandwidth * proxy.profile.latency))
+
+    def start(self) -> None:
+        threading.Thread(target=self._receive, daemon=True).start()
+        threading.Thread(target=self._send, daemon=True).start()
+
+    def _receive(self) -> None:
+        try:
+            while data := self.source.recv(CHUNK_SIZE):
+                with self._condition:
+                    while self._queued_bytes >= self._max_queued_bytes:
+                        self._condition.wait()
+                    self._chunks.append((time.monotonic(), data))
+                    self._queued_bytes += len(data)
+                    self._condition.notify_all()
+        except OSError:
+            pass
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _send(self) -> None:
+        profile = self.proxy.profile
+        try:
+            while True:
+                with self._condition:
+                    while not self._chunks and not self._closed:
+                        self._condition.wait()
+                    if not self._chunks:
+                        break
+                    received_time, data = self._chunks.popleft()
+                    self._queued_bytes -= len(data)
+                    self._condition.notify_all()
+                time.sleep(max(0.0, received_time + profile.latency - time.monotonic()))
+                self.proxy.wait_for_stall()
+                if profile.bandwidth:
+                    time.sleep(len(data) / profile.bandwidth)
+                if self.upload and self.proxy.should_disconnect(len(data)):
+                    break
+                self.destination.sendall(data)
+        except OSError:
+            pass
+        for connection in (self.source, self.destination):
+            with contextlib.suppress(OSError):
+                connection.shutdown(socket.SHUT_RDWR)
+            connection.close()
+
+
+class NetworkProxy:
+    """A TCP proxy that forwards connections through a simulated network link.
+
+    Attributes:
+        ports: The (proxy port, server port) pairs that are forwarded.
+        profile: The carbon.benchmarks.network.NetworkProfile of the link.
+        disconnect_count: The number of connections dropped by the proxy.
+    """
+
+    def __init__(self, ports: list[tuple[int, int]], profile: NetworkProfile):
+        self.ports = ports
+        self.profile = profile
+        self.disconnect_count = 0
+        self._uploaded_bytes = 0
+        self._lock = threading.Lock()
+        self._start_time = time.monotonic()
+        self._listeners: list[socket.socket] = []
+
+    def start(self) -> None:
+        for proxy_port, server_port in self.ports:
+            listener = socket.socket()
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+            listener.bind((PROXY_HOST, proxy_port))
+            listener.listen()
+            self._listeners.append(listener)
+            threading.Thread(
+                target=self._accept, args=(listener, server_port), daemon=True
+            ).start()
+
+    def stop(self) -> None:
+        for listener in self._listeners:
+            listener.close()
+
+    def _accept(self, listener: socket.socket, server_port: int) -> None:
+        while True:
+            try:
+                client, _ = listener.accept()
+            except OSError:
+                return
+            server = socket.socket()
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            server.connect((SERVER_HOST, server_port))
+            # the control connection carries commands; data connections carry files
+            is_data_connection = server_port != self.ports[0][1]
+            _Link(self, client, server, upload=is_data_connection).start()
+            _Link(self, server, client, upload=False).start()
+
+    def wait_for_stall(self) -> None:
+        """Wait while the link is stalled."""
+        if not self.profile.stall_interval:
+            return
+        period = self.profile.stall_interval + self.profile.stall_seconds
+        elapsed_in_period = (time.monotonic() - self._start_time) % period
+        if elapsed_in_period >= self.profile.stall_interval:
+            time.sleep(period - elapsed_in_period)
+
+    def should_disconnect(self, size: int) -> bool:
+        """Count uploaded bytes and check whether the connection is dropped."""
+        with self._lock:
+            self._uploaded_bytes += size
+            if (
+                self.profile.disconnect_after_bytes is None
+                or self.disconnect_count
+                or self._uploaded_bytes < self.profile.disconnect_after_bytes
+            ):
+                return False
+            self.disconnect_count += 1
+            return True
+
+
+@contextmanager
+def run_ftps_server(
+    directory: str, passive_port_count: int = 10
+) -> Generator[tuple[int, list[int]], None, None]:
+    """Run a pyftpdlib FTPS server in a background thread.
+
+    The server accepts the user 'user' with the password 'pass' and uses the
+    certificate of the test suite.
+
+    Yields:
+        tuple[int, list[int]]: The control port and the passive data ports.
+    """
+    passive_ports = []
+    for _ in range(passive_port_count):
+        # reserve ports that are free on both loopback addresses
+        with socket.create_server((PROXY_HOST, 0)) as probe:
+            passive_ports.append(probe.getsockname()[1])
+    authorizer = DummyAuthorizer()
+    authorizer.add_user("user", "pass", directory, perm="elradfmwMT")
+
+    class Handler(TLS_FTPHandler):
+        pass
+
+    Handler.certfile = os.path.join(FIXTURES_DIRECTORY, "server.crt")
+    Handler.keyfile = os.path.join(FIXTURES_DIRECTORY, "server.key")
+    Handler.authorizer = authorizer
+    Handler.passive_ports = passive_ports
+    server = FTPServer((SERVER_HOST, 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.socket.getsockname()[1], passive_ports
+    finally:
+        server.close_all()
+
+
+@contextmanager
+def run_proxied_ftps_server(
+    directory: str, profile: NetworkProfile
+) -> Generator[tuple[int, NetworkProxy], None, None]:
+    """Run an FTPS server behind a carbon.benchmarks.network.NetworkProxy.
+
+    Yields:
+        tuple[int, NetworkProxy]: The port of the proxy's control connection and the
+            proxy.
+    """
+    with run_ftps_server(directory) as (control_port, passive_ports):
+        with socket.create_server((PROXY_HOST, 0)) as probe:
+            proxy_control_port = probe.getsockname()[1]
+        proxy = NetworkProxy(
+            [(proxy_control_port, control_port)]
+            + [(port, port) for port in passive_ports],
+            profile,
+        )
+        proxy.start()
+        try:
+            yield proxy_control_port, proxy
+        finally:
+            proxy.stop()
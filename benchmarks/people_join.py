@@ -0,0 +1,44 @@
+"""Compare the 'server' and 'client' join modes for the 'people' feed.
+
+Usage: python -m benchmarks.people_join --records 100000
+"""
+
+import os
+import tempfile
+from functools import partial
+
+import click
+
+from benchmarks.common import create_benchmark_engine, time_call
+from carbon.feed import PeopleXmlFeed
+
+
+@click.command()
+@click.option("--records", type=int, default=100_000, help="Number of people records.")
+def main(records: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_benchmark_engine(directory, people_count=records)
+        cache_path = os.path.join(directory, "dimensions.json")
+        for join_mode, dimension_cache_path in (
+            ("server", None),
+            ("client", None),
+            ("client", cache_path),
+            ("client", cache_path),
+        ):
+            with open(os.devnull, "wb") as output_file:
+                feed = PeopleXmlFeed(
+                    engine=engine,
+                    output_file=output_file,
+                    join_mode=join_mode,
+                    dimension_cache_path=dimension_cache_path,
+                )
+                seconds = time_call(partial(feed.run, nsmap=feed.namespace_mapping))
+            click.echo(
+                f"join_mode={join_mode}: {seconds:.2f}s, "
+                f"{feed.processed_record_count / seconds:,.0f} records/s, "
+                f"dimension_cache={feed.summary.get('dimension_cache', '-')}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Compare the 'query' and 'external' sort strategies for the 'articles' feed.
+
+Usage: python -m benchmarks.sort_strategies --records 100000
+"""
+
+import os
+import tempfile
+
+import click
+
+from benchmarks.common import create_benchmark_engine, time_call
+from carbon.feed import ArticlesXmlFeed
+
+
+@click.command()
+@click.option("--records", type=int, default=100_000, help="Number of article records.")
+@click.option(
+    "--memory_budget",
+    type=int,
+    default=4,
+    help="Memory budget of the external sort, in megabytes.",
+)
+def main(records: int, memory_budget: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_benchmark_engine(directory, article_count=records)
+        for sort_strategy in (None, "query", "external"):
+            with open(os.devnull, "wb") as output_file:
+                feed = ArticlesXmlFeed(
+                    engine=engine,
+                    output_file=output_file,
+                    sort_strategy=sort_strategy,
+                    sort_memory_budget=memory_budget * 1024**2,
+                )
+                seconds = time_call(feed.run)
+            click.echo(
+                f"sort_strategy={sort_strategy}: {seconds:.2f}s, "
+                f"{feed.processed_record_count / seconds:,.0f} records/s, "
+                f"sort_runs={feed.sorter.run_count if feed.sorter else 0}"
+            )
+
+
+if __name__ == "__main__":
+    main()
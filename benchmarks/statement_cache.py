@@ -0,0 +1,68 @@
+"""Compare executing the 'people' page query with and without the statement cache.
+
+Usage: python -m benchmarks.statement_cache --records 10000 --page_size 100
+"""
+
+import os
+import tempfile
+from contextlib import closing
+from functools import partial
+from io import BytesIO
+
+import click
+from sqlalchemy.sql.selectable import Select
+
+from benchmarks.common import create_benchmark_engine, time_call
+from carbon.feed import PeopleXmlFeed
+from carbon.statements import StatementCache
+
+
+@click.command()
+@click.option("--records", type=int, default=10_000, help="Number of people records.")
+@click.option("--page_size", type=int, default=100, help="Number of rows per page.")
+def main(records: int, page_size: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_benchmark_engine(directory, people_count=records)
+        feed = PeopleXmlFeed(engine=engine, output_file=BytesIO(), page_size=page_size)
+        after_keys = [
+            (record["MIT_ID"],)
+            for index, record in enumerate(feed.records)
+            if index % page_size == page_size - 1
+        ]
+
+        def build_statement() -> Select:
+            query, key_columns = feed._build_key_ordered_query()  # noqa: SLF001
+            query = query.where(feed._after_key_clause(key_columns))  # noqa: SLF001
+            return query.limit(page_size)
+
+        def fetch_pages(cache: StatementCache | None) -> None:
+            with closing(engine().connect()) as connection:
+                for after_key in after_keys:
+                    parameters = {"after_key_0": after_key[0]}
+                    if cache is None:
+                        connection.execute(build_statement(), parameters).fetchall()
+                    else:
+                        cache.execute(
+                            connection, "page", build_statement, parameters
+                        ).fetchall()
+
+        for name, cache in (("uncached", None), ("cached", StatementCache())):
+            seconds = time_call(partial(fetch_pages, cache))
+            click.echo(
+                f"{name}: {len(after_keys)} pages in {seconds:.2f}s, "
+                f"{seconds / max(len(after_keys), 1) * 1000:.3f}ms per page"
+                + (f", compiled {cache.miss_count} time(s)" if cache else "")
+            )
+        with open(os.devnull, "wb") as output_file:
+            feed = PeopleXmlFeed(
+                engine=engine, output_file=output_file, page_size=page_size
+            )
+            seconds = time_call(partial(feed.run, nsmap=feed.namespace_mapping))
+        click.echo(
+            f"feed run with page_size={page_size}: {seconds:.2f}s, "
+            f"{feed.processed_record_count / seconds:,.0f} records/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
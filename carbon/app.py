@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import contextlib
+import hashlib
 import logging
 import os
+import tempfile
 import threading
-from ftplib import FTP, FTP_TLS, error_perm  # nosec
-from typing import IO, TYPE_CHECKING
+import time
+from ftplib import FTP, FTP_TLS, all_errors, error_perm, error_reply  # nosec
+from typing import IO, TYPE_CHECKING, Any
 
+from carbon.buffer import SpillBuffer
 from carbon.feed import ArticlesXmlFeed, PeopleXmlFeed
+from carbon.metrics import metrics
+from carbon.ratelimit import RateLimiter
+from carbon.tracing import tracer
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -14,10 +22,16 @@ if TYPE_CHECKING:
 
     from carbon.config import Config
     from carbon.database import DatabaseEngine
+    from carbon.ratelimit import RateSchedule
+    from carbon.sinks import DatabaseToSinksPipe
 
 logger = logging.getLogger(__name__)
 
 
+class FtpVerificationError(Exception):
+    """Raised when a file uploaded to the FTP server does not match the data sent."""
+
+
 class CarbonFtpsTls(FTP_TLS):
     """FTP_TLS subclass with support for SSL session reuse.
 
@@ -49,6 +63,65 @@ class CarbonFtpsTls(FTP_TLS):
             )
         return conn, size
 
+    def sha256(self, filename: str) -> str | None:
+        """Retrieve the SHA-256 digest of a file on the server, if supported.
+
+        Servers advertise support for the draft 'HASH' command or the 'XSHA256'
+        command in their response to 'FEAT'.
+
+        Args:
+            filename (str): The path to the file on the server.
+
+        Returns:
+            str | None: The hex digest of the file or None if the server does not
+                support a SHA-256 hash command.
+        """
+        features = [line.strip().upper() for line in self.sendcmd("FEAT").splitlines()]
+        if any(
+            feature.startswith("HASH") and "SHA-256" in feature for feature in features
+        ):
+            self.sendcmd("OPTS HASH SHA-256")
+            response = self.sendcmd(f"HASH {filename}")
+        elif "XSHA256" in features:
+            response = self.sendcmd(f"XSHA256 {filename}")
+        else:
+            return None
+        for token in response.split():
+            if len(token) == 64 and all(  # noqa: PLR2004
+                character in "0123456789abcdef" for character in token.lower()
+            ):
+                return token.lower()
+        return None
+
+
+class ChecksumReader:
+    """A file-like wrapper that computes the SHA-256 digest of the data read from it.
+
+    Attributes:
+        file: The file-like object (stream) that data is read from.
+        byte_count: The number of bytes read.
+        at_eof: Whether the end of the file has been reached.
+    """
+
+    def __init__(self, file: IO[bytes]):
+        self.file = file
+        self.byte_count = 0
+        self.at_eof = False
+        self._sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.file.read(size)
+        if not data:
+            self.at_eof = True
+        self._sha256.update(data)
+        self.byte_count += len(data)
+        return data
+
+    @property
+    def hexdigest(self) -> str:
+        """The SHA-256 hex digest of the data read so far."""
+        return self._sha256.hexdigest()
+
 
 class FileWriter:
     """A writer that outputs normalized XML strings to a specified file.
@@ -61,27 +134,56 @@ class FileWriter:
             strings are written.
         engine: A configured carbon.database.DatabaseEngine that can connect to the
             Data Warehouse.
+        feed_options: Keyword arguments passed to the carbon.feed.BaseXmlFeed
+            subclass for the feed type (e.g. {"validation_sample_rate": 0.1}).
+        summary: Statistics collected by the feed during the last call to 'write'.
     """
 
-    def __init__(self, engine: DatabaseEngine, output_file: IO):
+    def __init__(
+        self,
+        engine: DatabaseEngine,
+        output_file: IO,
+        *,
+        feed_options: dict[str, Any] | None = None,
+    ):
         self.output_file = output_file
         self.engine = engine
+        self.feed_options = feed_options or {}
+        self.summary: dict[str, Any] = {}
 
     def write(self, feed_type: str) -> None:
         """Write the specified feed type to the configured output."""
         xml_feed: PeopleXmlFeed | ArticlesXmlFeed
         if feed_type == "people":
-            xml_feed = PeopleXmlFeed(engine=self.engine, output_file=self.output_file)
+            xml_feed = PeopleXmlFeed(
+                engine=self.engine, output_file=self.output_file, **self.feed_options
+            )
             xml_feed.run(nsmap=xml_feed.namespace_mapping)
         elif feed_type == "articles":
-            xml_feed = ArticlesXmlFeed(engine=self.engine, output_file=self.output_file)
+            xml_feed = ArticlesXmlFeed(
+                engine=self.engine, output_file=self.output_file, **self.feed_options
+            )
             xml_feed.run()
 
+        self.summary = xml_feed.summary
         logger.info(
             "The '%s' feed has processed %s records.",
             feed_type,
             xml_feed.processed_record_count,
         )
+        if xml_feed.validator:
+            logger.info(
+                "The '%s' feed validated %s records in %.3f seconds.",
+                feed_type,
+                xml_feed.validator.validated_record_count,
+                xml_feed.validator.validation_seconds,
+            )
+        if xml_feed.deduplicator:
+            logger.info(
+                "The '%s' feed dropped %s duplicate records.",
+                feed_type,
+                xml_feed.deduplicator.dropped_record_count,
+            )
 
 
 class ConcurrentFtpFileWriter(FileWriter):
@@ -99,20 +201,129 @@ class ConcurrentFtpFileWriter(FileWriter):
             on the Symplectic Elements FTP server.
     """
 
-    def __init__(self, engine: DatabaseEngine, input_file: IO, ftp_output_file: Callable):
-        super().__init__(engine, input_file)
+    def __init__(
+        self,
+        engine: DatabaseEngine,
+        input_file: IO,
+        ftp_output_file: Callable,
+        *,
+        feed_options: dict[str, Any] | None = None,
+    ):
+        super().__init__(engine, input_file, feed_options=feed_options)
         self.ftp_output_file = ftp_output_file
 
     def write(self, feed_type: str) -> None:
         """Concurrently read/write from the configured inputs and outputs.
 
         This method will block until both the reader and writer are finished.
+        An exception raised by the reader is raised again once it is finished.
+
+        If the reader fails, it closes the stream it reads from, so the writer fails
+        on its next write instead of blocking on a full pipe, and the exception of
+        the reader is raised. If the writer fails, the stream it writes to is closed
+        before waiting for the reader, so the reader reaches the end of the stream
+        instead of waiting for more data, and the exception of the writer is raised.
         """
-        thread = threading.Thread(target=self.ftp_output_file)
+        errors: list[Exception] = []
+
+        def read() -> None:
+            try:
+                self.ftp_output_file()
+            except Exception as error:  # noqa: BLE001
+                errors.append(error)
+                content_feed = getattr(self.ftp_output_file, "content_feed", None)
+                if content_feed is not None:
+                    content_feed.close()
+
+        thread = threading.Thread(target=read, name="carbon-ftp-upload")
         thread.start()
-        super().write(feed_type)
-        self.output_file.close()
+        try:
+            super().write(feed_type)
+            self.output_file.close()
+        except Exception:
+            # a reader that already failed has closed its end of the pipe
+            with contextlib.suppress(OSError):
+                self.output_file.close()
+            thread.join()
+            if not errors:
+                raise
+            raise errors[0] from None
         thread.join()
+        if errors:
+            raise errors[0]
+
+
+class FtpSession:
+    """A logged in connection to an FTP server that is reused across uploads.
+
+    A long-running process (see carbon.daemon.CarbonDaemon) keeps the session warm
+    by calling 'keep_alive' between runs, so an upload does not pay for a new TCP
+    connection, TLS handshake, and login. Before the connection is reused, it is
+    checked with a NOOP command; a stale connection is replaced with a new one.
+
+    Attributes:
+        user: The username for accessing the FTP server.
+        password: The password for accessing the FTP server.
+        host: The hostname of the FTP server.
+        port: The port of the FTP server.
+        connect_count: The number of connections opened by the session.
+    """
+
+    def __init__(self, user: str, password: str, host: str = "localhost", port: int = 21):
+        self.user = user
+        self.password = password
+        self.host = host
+        self.port = port
+        self.connect_count = 0
+        self._ftps: CarbonFtpsTls | None = None
+        self._lock = threading.Lock()
+
+    def connect(self) -> CarbonFtpsTls:
+        """Get the open connection if it responds to NOOP, or open a new connection."""
+        with self._lock:
+            if self._ftps is not None and self._ftps.sock is None:
+                self._ftps = None
+            if self._ftps is not None:
+                try:
+                    self._ftps.voidcmd("NOOP")
+                except all_errors as error:
+                    logger.info("Reconnecting stale FTP session (%s)", error)
+                    self._discard()
+                else:
+                    return self._ftps
+            self._ftps = FtpFile.open_connection(
+                self.user, self.password, self.host, self.port
+            )
+            self.connect_count += 1
+            return self._ftps
+
+    def keep_alive(self) -> None:
+        """Send a NOOP command so the server does not close an idle connection."""
+        self.connect()
+
+    def discard(self) -> None:
+        """Close the connection without logging out, so 'connect' opens a new one.
+
+        Use this when the control connection is out of sync with the server (e.g.
+        after a timeout), so its replies cannot be trusted.
+        """
+        with self._lock:
+            self._discard()
+
+    def close(self) -> None:
+        """Log out and close the connection."""
+        with self._lock:
+            if self._ftps is not None:
+                try:
+                    self._ftps.quit()
+                except all_errors:
+                    self._ftps.close()
+                self._ftps = None
+
+    def _discard(self) -> None:
+        if self._ftps is not None:
+            self._ftps.close()
+            self._ftps = None
 
 
 class FtpFile:
@@ -121,6 +332,16 @@ class FtpFile:
     The FtpFileWriter will read data from a provided feed and write the contents
     from the feed to a file on the Symplectic Elements FTP server.
 
+    The SHA-256 digest and size of the data are computed as it is sent. Once the
+    transfer is finished, the size of the file reported by the server (and its
+    SHA-256 digest, if the server supports a hash command) is compared with the
+    data that was sent. If the transfer times out after all data was sent, the
+    file is verified over a new connection.
+
+    If a rate limiter is set, the data connection reads through it, so the
+    upload is paced to the rate limit in effect; a spooled feed is extracted at
+    full speed before the paced upload starts.
+
     Attributes:
         content_feed: A file-like object (stream) that contains the records
             from the Data Warehouse.
@@ -130,16 +351,31 @@ class FtpFile:
             uploaded to the Symplectic FTP server.
         host: The hostname of the Symplectic FTP server.
         port: The port of the Symplectic FTP server.
+        summary: The number of bytes uploaded, their SHA-256 digest, and the results
+            of verifying the uploaded file.
+        atomic: Whether the file is uploaded to a temporary path (the path followed
+            by 'temporary_suffix') and renamed to 'path' once it is verified, so
+            a partial file never appears at 'path'.
+        session: A carbon.app.FtpSession whose connection is used instead of a new
+            connection. The connection is left open after the upload.
+        rate_limiter: A carbon.ratelimit.RateLimiter that paces the upload, or None
+            to upload at the rate the link allows.
     """
 
+    temporary_suffix: str = ".part"
+
     def __init__(
         self,
         content_feed: IO,
         user: str,
         password: str,
         path: str,
+        *,
         host: str = "localhost",
         port: int = 21,
+        atomic: bool = False,
+        session: FtpSession | None = None,
+        rate_limiter: RateLimiter | None = None,
     ):
         self.content_feed = content_feed
         self.user = user
@@ -147,24 +383,197 @@ class FtpFile:
         self.path = path
         self.host = host
         self.port = port
+        self.atomic = atomic
+        self.session = session
+        self.rate_limiter = rate_limiter
+        self.summary: dict[str, Any] = {}
+
+    @staticmethod
+    def open_connection(user: str, password: str, host: str, port: int) -> CarbonFtpsTls:
+        """Connect and log in to an FTP server over TLS."""
+        ftps = CarbonFtpsTls(timeout=30)
+        with tracer.span("ftps.connect", host=host, port=port):
+            ftps.connect(host=host, port=port)
+        with tracer.span("ftps.login"):
+            ftps.login(user=user, passwd=password)
+            ftps.prot_p()
+        return ftps
+
+    def connect(self) -> CarbonFtpsTls:
+        """Connect and log in to the Symplectic Elements FTP server."""
+        if self.session:
+            return self.session.connect()
+        return self.open_connection(self.user, self.password, self.host, self.port)
+
+    @property
+    def upload_path(self) -> str:
+        """The path the file is uploaded to before it is moved to 'path', if atomic."""
+        return f"{self.path}{self.temporary_suffix}" if self.atomic else self.path
 
     def __call__(self) -> None:
         """Transfer a file using FTP over TLS."""
-        ftps = CarbonFtpsTls(timeout=30)
-        ftps.connect(host=self.host, port=self.port)
-        ftps.login(user=self.user, passwd=self.password)
-        ftps.prot_p()
+        ftps = self.connect()
+        start_time = time.perf_counter()
+        content_feed, ftps = self._upload_stream(ftps)
+        transfer_seconds = time.perf_counter() - start_time
+        metrics.increment("ftp_uploaded_bytes_total", content_feed.byte_count)
+        metrics.observe("ftp_transfer_seconds", transfer_seconds)
+        if transfer_seconds:
+            metrics.set_gauge(
+                "ftp_transfer_bytes_per_second",
+                content_feed.byte_count / transfer_seconds,
+            )
+        with tracer.span("ftps.verify"):
+            self.verify(ftps, content_feed)
+        if self.rate_limiter:
+            self._report_rate_limit(content_feed.byte_count, transfer_seconds)
+        if self.atomic:
+            with tracer.span("ftps.rename"):
+                self.move_into_place(ftps)
+        if not self.session:
+            ftps.quit()
+
+    def _upload_stream(self, ftps: CarbonFtpsTls) -> tuple[ChecksumReader, CarbonFtpsTls]:
+        """Send the feed over the data connection.
+
+        Returns:
+            tuple[ChecksumReader, CarbonFtpsTls]: The reader that data was sent from
+                and the connection used to verify the uploaded file.
+        """
+        content_feed = ChecksumReader(
+            self.rate_limiter.reader(self.content_feed)  # type: ignore[arg-type]
+            if self.rate_limiter
+            else self.content_feed
+        )
         try:
-            ftps.storbinary(cmd=f"STOR {self.path}", fp=self.content_feed)
+            with tracer.span("ftps.stor", path=self.upload_path):
+                ftps.storbinary(cmd=f"STOR {self.upload_path}", fp=content_feed)
         except TimeoutError:
+            if not content_feed.at_eof:
+                raise
             logger.warning(
-                "Timeout occurred but XML file may have been uploaded anyway. \
-                        Please check the Elements FTP server to confirm."
+                "Timeout occurred after the XML file was sent. "
+                "Verifying the uploaded file over a new connection."
             )
-        except Exception:
-            raise
-        else:
-            ftps.quit()
+            # the reply to STOR may still arrive on the old control connection
+            if self.session:
+                self.session.discard()
+            else:
+                ftps.close()
+            ftps = self.connect()
+        return content_feed, ftps
+
+    def _report_rate_limit(self, byte_count: int, transfer_seconds: float) -> None:
+        throttled_seconds = self.rate_limiter.throttled_seconds  # type: ignore[union-attr]
+        bytes_per_second = byte_count / transfer_seconds if transfer_seconds else 0.0
+        metrics.set_gauge("ftp_throttled_seconds", throttled_seconds)
+        self.summary["upload_bytes_per_second"] = round(bytes_per_second)
+        self.summary["upload_throttled_seconds"] = round(throttled_seconds, 3)
+        logger.info(
+            "The upload was paced by the rate limit for %.3f seconds, "
+            "at an effective %.0f bytes per second",
+            throttled_seconds,
+            bytes_per_second,
+        )
+
+    def move_into_place(self, ftps: CarbonFtpsTls) -> None:
+        """Rename the uploaded file from 'upload_path' to 'path'.
+
+        RNFR/RNTO replaces the file at 'path' in a single step, so readers never
+        see a partial file. Servers that refuse to rename over an existing file
+        have the existing file deleted first. The existing file is only deleted if
+        the server accepted RNFR, refused RNTO, and the file exists; any other
+        failure is raised, leaving the existing file in place.
+
+        Args:
+            ftps (CarbonFtpsTls): A logged in connection to the FTP server.
+        """
+        start_time = time.perf_counter()
+        response = ftps.sendcmd(f"RNFR {self.upload_path}")
+        if not response.startswith("3"):
+            raise error_reply(response)
+        try:
+            ftps.voidcmd(f"RNTO {self.path}")
+        except error_perm as error:
+            if not self._path_exists(ftps):
+                raise
+            logger.warning(
+                "Failed to rename '%s' to '%s' (%s), deleting '%s' and retrying",
+                self.upload_path,
+                self.path,
+                error,
+                self.path,
+            )
+            ftps.delete(self.path)
+            ftps.rename(self.upload_path, self.path)
+        self.summary["rename_seconds"] = round(time.perf_counter() - start_time, 3)
+
+    def _path_exists(self, ftps: CarbonFtpsTls) -> bool:
+        try:
+            ftps.size(self.path)
+        except error_perm as error:
+            # 500/502: SIZE is not supported, so the file is looked up with NLST
+            if not str(error).startswith(("500", "502")):
+                return False
+            try:
+                return bool(ftps.nlst(self.path))
+            except error_perm:
+                return False
+        return True
+
+    def verify(self, ftps: CarbonFtpsTls, content_feed: ChecksumReader) -> None:
+        """Compare the uploaded file with the data that was sent.
+
+        Args:
+            ftps (CarbonFtpsTls): A logged in connection to the FTP server.
+            content_feed (ChecksumReader): The reader that data was sent from.
+
+        If the server does not support the SIZE command, the size is not compared
+        and a warning is logged.
+
+        Raises:
+            FtpVerificationError: If the size or SHA-256 digest of the uploaded file
+                does not match the data that was sent.
+        """
+        ftps.voidcmd("TYPE I")
+        try:
+            remote_size = ftps.size(self.upload_path)
+        except error_perm as error:
+            # 500/502: the command is not recognized or not implemented
+            if not str(error).startswith(("500", "502")):
+                raise
+            logger.warning(
+                "The FTP server does not support SIZE (%s); skipping the size check "
+                "of '%s'",
+                error,
+                self.upload_path,
+            )
+            remote_size = None
+        remote_sha256 = ftps.sha256(self.upload_path)
+        self.summary = {
+            "uploaded_bytes": content_feed.byte_count,
+            "sha256": content_feed.hexdigest,
+            "remote_size": remote_size,
+            "remote_sha256_verified": remote_sha256 is not None,
+        }
+        if remote_size is not None and remote_size != content_feed.byte_count:
+            msg = (
+                f"Uploaded file '{self.upload_path}' has {remote_size} bytes, "
+                f"but {content_feed.byte_count} bytes were sent"
+            )
+            raise FtpVerificationError(msg)
+        if remote_sha256 is not None and remote_sha256 != content_feed.hexdigest:
+            msg = (
+                f"Uploaded file '{self.upload_path}' has SHA-256 {remote_sha256}, "
+                f"but data with SHA-256 {content_feed.hexdigest} was sent"
+            )
+            raise FtpVerificationError(msg)
+        logger.info(
+            "Verified upload of '%s': %s bytes, SHA-256 %s",
+            self.upload_path,
+            content_feed.byte_count,
+            content_feed.hexdigest,
+        )
 
 
 class DatabaseToFilePipe:
@@ -177,17 +586,36 @@ class DatabaseToFilePipe:
             Data Warehouse.
         output_file: The full file path to the generated XML file into which normalized
             XML strings are written (e.g. "output/people.xml").
+        feed_options: Keyword arguments passed to the feed (see carbon.app.FileWriter).
+        summary: Statistics collected during the last call to 'run'.
     """
 
-    def __init__(self, config: Config, engine: DatabaseEngine, output_file: IO):
+    def __init__(
+        self,
+        config: Config,
+        engine: DatabaseEngine,
+        output_file: IO,
+        *,
+        feed_options: dict[str, Any] | None = None,
+    ):
         self.config = config
         self.engine = engine
         self.output_file = output_file
+        self.feed_options = feed_options
+        self.summary: dict[str, Any] = {}
 
     def run(self) -> None:
-        FileWriter(engine=self.engine, output_file=self.output_file).write(
-            feed_type=self.config.FEED_TYPE
+        start_time = time.perf_counter()
+        file_writer = FileWriter(
+            engine=self.engine,
+            output_file=self.output_file,
+            feed_options=self.feed_options,
         )
+        file_writer.write(feed_type=self.config.FEED_TYPE)
+        self.summary = {
+            **file_writer.summary,
+            "elapsed_seconds": round(time.perf_counter() - start_time, 3),
+        }
 
 
 class DatabaseToFtpPipe:
@@ -204,52 +632,172 @@ class DatabaseToFtpPipe:
         2. The connected 'read' file stream concurrently transfers data from the
            'write' file stream into an XML file on the Elements FTP server.
 
+    If a buffer memory limit is set, the pipe is replaced by a
+    carbon.buffer.SpillBuffer, so the feed never waits for a slow upload: data is
+    kept in memory up to the limit and spilled to a temporary file beyond it.
+
+    In spool mode, the feed is instead written to a local temporary file at the speed
+    of the Data Warehouse, releasing the database cursor before the upload starts.
+    The file is then uploaded to a temporary path on the FTP server and renamed to
+    the final path once it is verified.
+
     Attributes:
         config: A carbon.config.Config instance with the required environment variables
           for running the feed.
         engine: A configured carbon.database.DatabaseEngine that can connect to the
             Data Warehouse.
+        feed_options: Keyword arguments passed to the feed (see carbon.app.FileWriter).
+        spool: Whether the feed is spooled to a local file before it is uploaded.
+        buffer_memory_limit: The number of bytes held in memory by the buffer between
+            the feed and the upload. If None, an OS pipe is used.
+        ftp_session: A carbon.app.FtpSession reused for uploads. If None, each upload
+            opens a new connection.
+        upload_rate_schedule: A carbon.ratelimit.RateSchedule of rate limits for the
+            upload. Use spool mode (or a buffer memory limit) so the rate limit does
+            not also slow down the feed. If None, the upload is not paced.
+        summary: Statistics collected during the last call to 'run'.
     """
 
-    def __init__(self, config: Config, engine: DatabaseEngine):
+    def __init__(
+        self,
+        config: Config,
+        engine: DatabaseEngine,
+        *,
+        feed_options: dict[str, Any] | None = None,
+        spool: bool = False,
+        buffer_memory_limit: int | None = None,
+        ftp_session: FtpSession | None = None,
+        upload_rate_schedule: RateSchedule | None = None,
+    ):
         self.config = config
         self.engine = engine
+        self.feed_options = feed_options
+        self.spool = spool
+        self.buffer_memory_limit = buffer_memory_limit
+        self.ftp_session = ftp_session
+        self.upload_rate_schedule = upload_rate_schedule
+        self.summary: dict[str, Any] = {}
+
+    def _create_ftp_file(self, content_feed: IO, *, atomic: bool = False) -> FtpFile:
+        return FtpFile(
+            content_feed=content_feed,
+            user=self.config.SYMPLECTIC_FTP_USER,
+            password=self.config.SYMPLECTIC_FTP_PASS,
+            path=self.config.SYMPLECTIC_FTP_PATH,
+            host=self.config.SYMPLECTIC_FTP_HOST,
+            port=int(self.config.SYMPLECTIC_FTP_PORT),
+            atomic=atomic,
+            session=self.ftp_session,
+            rate_limiter=(
+                RateLimiter(self.upload_rate_schedule)
+                if self.upload_rate_schedule
+                else None
+            ),
+        )
 
     def run(self) -> None:
+        start_time = time.perf_counter()
+        summary = self._run_spooled() if self.spool else self._run_streamed()
+        self.summary = {
+            **summary,
+            "elapsed_seconds": round(time.perf_counter() - start_time, 3),
+        }
+
+    def _run_streamed(self) -> dict[str, Any]:
+        if self.buffer_memory_limit:
+            return self._run_buffered(self.buffer_memory_limit)
         read_file, write_file = os.pipe()
 
         with open(read_file, "rb") as buffered_reader, open(
             write_file, "wb"
         ) as buffered_writer:
-            ftp_file = FtpFile(
-                content_feed=buffered_reader,
-                user=self.config.SYMPLECTIC_FTP_USER,
-                password=self.config.SYMPLECTIC_FTP_PASS,
-                path=self.config.SYMPLECTIC_FTP_PATH,
-                host=self.config.SYMPLECTIC_FTP_HOST,
-                port=int(self.config.SYMPLECTIC_FTP_PORT),
+            ftp_file = self._create_ftp_file(buffered_reader)
+            ftp_file_writer = ConcurrentFtpFileWriter(
+                engine=self.engine,
+                input_file=buffered_writer,
+                ftp_output_file=ftp_file,
+                feed_options=self.feed_options,
             )
-            ConcurrentFtpFileWriter(
-                engine=self.engine, input_file=buffered_writer, ftp_output_file=ftp_file
-            ).write(feed_type=self.config.FEED_TYPE)
+            ftp_file_writer.write(feed_type=self.config.FEED_TYPE)
+        return {**ftp_file_writer.summary, **ftp_file.summary}
+
+    def _run_buffered(self, memory_limit: int) -> dict[str, Any]:
+        spill_buffer = SpillBuffer(memory_limit=memory_limit)
+        try:
+            ftp_file = self._create_ftp_file(spill_buffer)  # type: ignore[arg-type]
+            ftp_file_writer = ConcurrentFtpFileWriter(
+                engine=self.engine,
+                input_file=spill_buffer,  # type: ignore[arg-type]
+                ftp_output_file=ftp_file,
+                feed_options=self.feed_options,
+            )
+            ftp_file_writer.write(feed_type=self.config.FEED_TYPE)
+        finally:
+            spill_buffer.dispose()
+        if spill_buffer.spill_count:
+            logger.info(
+                "The upload fell behind the feed %s times: %s bytes were spilled "
+                "to disk and took up to %.3f seconds to drain",
+                spill_buffer.spill_count,
+                spill_buffer.spilled_bytes,
+                spill_buffer.max_drain_lag_seconds,
+            )
+        return {**ftp_file_writer.summary, **ftp_file.summary, **spill_buffer.summary}
+
+    def _run_spooled(self) -> dict[str, Any]:
+        with tempfile.TemporaryFile() as spool_file:
+            start_time = time.perf_counter()
+            file_writer = FileWriter(
+                engine=self.engine,
+                output_file=spool_file,
+                feed_options=self.feed_options,
+            )
+            file_writer.write(feed_type=self.config.FEED_TYPE)
+            spool_seconds = time.perf_counter() - start_time
+            spool_bytes = spool_file.tell()
+            logger.info(
+                "Spooled %s bytes to a temporary file in %.3f seconds",
+                spool_bytes,
+                spool_seconds,
+            )
+
+            # the spool file is uploaded as a single stream: FTP has no command to
+            # join files on the server, and servers refuse a REST offset past the
+            # end of a file, so the upload cannot be split over several connections
+            spool_file.seek(0)
+            start_time = time.perf_counter()
+            ftp_file = self._create_ftp_file(spool_file, atomic=True)
+            ftp_file()
+            upload_seconds = time.perf_counter() - start_time
+        return {
+            **file_writer.summary,
+            **ftp_file.summary,
+            "spool_bytes": spool_bytes,
+            "spool_seconds": round(spool_seconds, 3),
+            "upload_seconds": round(upload_seconds, 3),
+        }
 
     def run_connection_test(self) -> None:
         """Test connection to the Symplectic Elements FTP server.
 
         Verify that the provided FTP credentials can be used
         to successfully connect to the Symplectic Elements FTP server.
+
+        If an FTP session is set, the connection is opened by the session and left
+        open, so the upload that follows reuses the logged in connection (after
+        checking it with NOOP) instead of connecting and logging in again.
         """
         logger.info("Testing connection to the Symplectic Elements FTP server")
         try:
-            ftps = CarbonFtpsTls(timeout=30)
-            ftps.connect(
-                host=self.config.SYMPLECTIC_FTP_HOST,
-                port=int(self.config.SYMPLECTIC_FTP_PORT),
-            )
-            ftps.login(
-                user=self.config.SYMPLECTIC_FTP_USER,
-                passwd=self.config.SYMPLECTIC_FTP_PASS,
-            )
+            if self.ftp_session:
+                self.ftp_session.connect()
+            else:
+                FtpFile.open_connection(
+                    user=self.config.SYMPLECTIC_FTP_USER,
+                    password=self.config.SYMPLECTIC_FTP_PASS,
+                    host=self.config.SYMPLECTIC_FTP_HOST,
+                    port=int(self.config.SYMPLECTIC_FTP_PORT),
+                ).quit()
         except error_perm as error:
             error_message = (
                 f"Failed to connect to the Symplectic Elements FTP server: {error}"
@@ -264,20 +812,21 @@ class DatabaseToFtpPipe:
             raise
         else:
             logger.info("Successfully connected to the Symplectic Elements FTP server")
-            ftps.quit()
 
 
 def run_all_connection_tests(
-    engine: DatabaseEngine, pipe: DatabaseToFilePipe | DatabaseToFtpPipe
+    engine: DatabaseEngine,
+    pipe: DatabaseToFilePipe | DatabaseToFtpPipe | DatabaseToSinksPipe,
 ) -> None:
     """Run connection tests for the Data Warehouse and Elements FTP server.
 
     Args:
         engine (DatabaseEngine): A configured carbon.database.DatabaseEngine that can
             connect to the Data Warehouse.
-        pipe (DatabaseToFilePipe | DatabaseToFtpPipe): The pipe used to run the
-            data feed. If the pipe is an instance of carbon.app.DatabaseToFtpPipe,
-            a connection test for the Elements FTP server is run.
+        pipe (DatabaseToFilePipe | DatabaseToFtpPipe | DatabaseToSinksPipe): The pipe
+            used to run the data feed. If the pipe writes to FTP servers (i.e. it is
+            not an instance of carbon.app.DatabaseToFilePipe), a connection test for
+            each FTP server is run.
     """
     # test connection to the Data Warehouse
     try:
@@ -289,7 +838,7 @@ def run_all_connection_tests(
         return
 
     # test connection to the Symplectic Elements FTP server
-    if isinstance(pipe, DatabaseToFtpPipe):
+    if not isinstance(pipe, DatabaseToFilePipe):
         try:
             pipe.run_connection_test()
         except Exception:  # noqa: BLE001
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import mmap
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import IO, Any
+
+
+class SpillBuffer:
+    """A FIFO byte buffer that keeps data in memory up to a limit, then spills to disk.
+
+    The buffer connects a producer (the feed) and a consumer (the FTP upload) that
+    run in separate threads. Writes never wait for the consumer: data is kept in
+    memory until 'memory_limit' bytes are buffered, after which it is appended to
+    a temporary file. Data is read in the order it was written; the consumer reads
+    the spill file through a memory map. Once the spill file is drained, the buffer
+    returns to memory and the file is truncated, so disk use is also released.
+
+    Attributes:
+        memory_limit: The maximum number of bytes held in memory.
+        spill_count: The number of times the buffer spilled to disk.
+        spilled_bytes: The number of bytes written to the spill file.
+        max_memory_bytes: The largest number of bytes held in memory.
+        max_spill_backlog_bytes: The largest number of unread bytes in the spill file.
+        max_drain_lag_seconds: The longest time between the start of a spill and
+            the moment the spill file was fully drained.
+    """
+
+    def __init__(self, memory_limit: int = 64 * 1024**2):
+        self.memory_limit = memory_limit
+        self.spill_count = 0
+        self.spilled_bytes = 0
+        self.max_memory_bytes = 0
+        self.max_spill_backlog_bytes = 0
+        self.max_drain_lag_seconds = 0.0
+        self._condition = threading.Condition()
+        self._chunks: deque[bytes] = deque()
+        self._memory_bytes = 0
+        self._spill_file: IO[bytes] | None = None
+        self._spill_map: mmap.mmap | None = None
+        self._spill_write_offset = 0
+        self._spill_read_offset = 0
+        self._spill_start_time: float | None = None
+        self._closed = False
+
+    def write(self, data: bytes) -> int:
+        """Add data to the buffer without waiting for the consumer.
+
+        Raises:
+            ValueError: If the buffer was closed, for example by a consumer that
+                failed and will not read the data.
+        """
+        with self._condition:
+            if self._closed:
+                msg = "write to closed buffer"
+                raise ValueError(msg)
+            if not data:
+                return 0
+            if (
+                self._spill_start_time is None
+                and self._memory_bytes + len(data) <= self.memory_limit
+            ):
+                self._chunks.append(bytes(data))
+                self._memory_bytes += len(data)
+                self.max_memory_bytes = max(self.max_memory_bytes, self._memory_bytes)
+            else:
+                self._spill(data)
+            self._condition.notify()
+        return len(data)
+
+    def _spill(self, data: bytes) -> None:
+        if self._spill_start_time is None:
+            self._spill_start_time = time.perf_counter()
+            self.spill_count += 1
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(buffering=0)  # noqa: SIM115
+        self._spill_file.seek(self._spill_write_offset)
+        self._spill_file.write(data)
+        self._spill_write_offset += len(data)
+        self.spilled_bytes += len(data)
+        self.max_spill_backlog_bytes = max(
+            self.max_spill_backlog_bytes,
+            self._spill_write_offset - self._spill_read_offset,
+        )
+
+    def close(self) -> None:
+        """Mark the end of the data; the consumer reads what is left, then EOF.
+
+        A consumer that fails closes the buffer too, so later writes fail instead
+        of buffering data that will never be read.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to 'size' bytes, waiting until data is available or EOF."""
+        with self._condition:
+            while (
+                not self._chunks
+                and self._spill_read_offset == self._spill_write_offset
+                and not self._closed
+            ):
+                self._condition.wait()
+            if self._chunks:
+                return self._read_memory(size)
+            if self._spill_read_offset < self._spill_write_offset:
+                return self._read_spill(size)
+            return b""
+
+    def _read_memory(self, size: int) -> bytes:
+        parts = []
+        remaining_size = self._memory_bytes if size < 0 else size
+        while self._chunks and remaining_size > 0:
+            chunk = self._chunks.popleft()
+            if len(chunk) > remaining_size:
+                self._chunks.appendleft(chunk[remaining_size:])
+                chunk = chunk[:remaining_size]
+            parts.append(chunk)
+            remaining_size -= len(chunk)
+            self._memory_bytes -= len(chunk)
+        return b"".join(parts)
+
+    def _read_spill(self, size: int) -> bytes:
+        if self._spill_map is None or len(self._spill_map) < self._spill_write_offset:
+            if self._spill_map is not None:
+                self._spill_map.close()
+            self._spill_map = mmap.mmap(
+                self._spill_file.fileno(), 0, access=mmap.ACCESS_READ  # type: ignore[union-attr]
+            )
+        end_offset = (
+            self._spill_write_offset
+            if size < 0
+            else min(self._spill_read_offset + size, self._spill_write_offset)
+        )
+        data = self._spill_map[self._spill_read_offset : end_offset]
+        self._spill_read_offset = end_offset
+        if self._spill_read_offset == self._spill_write_offset:
+            self.max_drain_lag_seconds = max(
+                self.max_drain_lag_seconds,
+                time.perf_counter() - self._spill_start_time,  # type: ignore[operator]
+            )
+            self._spill_map.close()
+            self._spill_map = None
+            self._spill_file.truncate(0)  # type: ignore[union-attr]
+            self._spill_read_offset = self._spill_write_offset = 0
+            self._spill_start_time = None
+        return data
+
+    def dispose(self) -> None:
+        """Remove the spill file."""
+        with self._condition:
+            if self._spill_map is not None:
+                self._spill_map.close()
+                self._spill_map = None
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+
+    @property
+    def summary(self) -> dict[str, Any]:
+        """Statistics describing how much data was spilled and how fast it drained."""
+        return {
+            "buffer_max_memory_bytes": self.max_memory_bytes,
+            "buffer_spill_count": self.spill_count,
+            "buffer_spilled_bytes": self.spilled_bytes,
+            "buffer_max_spill_backlog_bytes": self.max_spill_backlog_bytes,
+            "buffer_max_drain_lag_seconds": round(self.max_drain_lag_seconds, 3),
+        }
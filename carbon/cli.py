@@ -1,19 +1,42 @@
 import logging
 import os
-from typing import IO
+import signal
+import time
+from contextlib import nullcontext
+from datetime import UTC, datetime
+from typing import IO, Any
 
 import click
 
-from carbon.app import DatabaseToFilePipe, DatabaseToFtpPipe, run_all_connection_tests
+from carbon.app import (
+    DatabaseToFilePipe,
+    DatabaseToFtpPipe,
+    FtpSession,
+    run_all_connection_tests,
+)
+from carbon.columnar import ColumnarUnavailableError, check_columnar_available
 from carbon.config import Config
+from carbon.daemon import CarbonDaemon, CronSchedule
 from carbon.database import DatabaseEngine
-from carbon.helpers import sns_log
+from carbon.dedup import DUPLICATE_RULES
+from carbon.diff import FeedDiff, FeedDiffError
+from carbon.dimensions import JOIN_MODES
+from carbon.helpers import SnsNotifier
+from carbon.history import RunLedger, get_query_fingerprint
+from carbon.metrics import export_metrics, metrics
+from carbon.profiling import PROFILE_MODES, RunProfiler
+from carbon.progress import PROGRESS_TOTALS
+from carbon.ratelimit import RateSchedule
+from carbon.sinks import ArchiveSink, DatabaseToSinksPipe, FileSink, FtpSink, Sink
+from carbon.sort import SORT_STRATEGIES
+from carbon.statements import ORACLE_STATEMENT_CACHE_SIZE
+from carbon.tracing import tracer
 
 root_logger = logging.getLogger()
 logger = logging.getLogger(__name__)
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.version_option()
 @click.option(
     "-o",
@@ -36,11 +59,336 @@ logger = logging.getLogger(__name__)
     help=(
         "Turn on SNS logging. If SNS logging is used, notification emails "
         "indicating the start and result of a Carbon run will be sent to subscribers "
-        "for the Carbon topic. Defaults to True."
+        "for the Carbon topic. Messages are published in the background and the "
+        "message for a successful run includes a summary of the run. Defaults to True."
     ),
     default=True,
 )
-def main(*, output_file: IO, run_connection_tests: bool, use_sns_logging: bool) -> None:
+@click.option(
+    "--validation_sample_rate",
+    help=(
+        "Validate record XML elements against the schema for the feed as the feed "
+        "is generated. A value of 1.0 validates every record; lower values validate "
+        "records at a fixed interval (e.g. 0.1 validates every tenth record). "
+        "Defaults to None, which turns off validation."
+    ),
+    type=click.FloatRange(min=0, max=1, min_open=True),
+    default=None,
+)
+@click.option(
+    "--quarantine_file",
+    help=(
+        "Write records that cannot be transformed or fail validation to the given "
+        "JSON Lines file, with the error, and continue the run without them. "
+        "Defaults to None, which fails the run on the first such record."
+    ),
+    type=click.Path(dir_okay=False),
+    default=None,
+)
+@click.option(
+    "--error_budget",
+    help=(
+        "The number of records that can be quarantined before the run fails. "
+        "Only used with --quarantine_file."
+    ),
+    type=click.IntRange(min=0),
+    default=100,
+)
+@click.option(
+    "--limit",
+    help=(
+        "Fetch at most the given number of records, for a quick smoke run. The limit "
+        "is added to the feed query; use it with '--sort_strategy query' to fetch "
+        "the same records in every run. Defaults to None, which fetches all records."
+    ),
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.option(
+    "--sample",
+    "sample_percent",
+    help=(
+        "Include a deterministic sample of the given percentage of people (e.g. 1 "
+        "for 1%), selected in the feed query by a hash of the MIT ID. The same "
+        "people are sampled in every run and in both feeds. Must be greater than 0 "
+        "and at most 100; the percentage is rounded up to the next multiple of "
+        "0.01%. Defaults to None, which includes all records."
+    ),
+    type=click.FloatRange(min=0, max=100, min_open=True),
+    default=None,
+)
+@click.option(
+    "--duplicate_rule",
+    help=(
+        "Drop records with a duplicate record key (MIT_ID for 'people', "
+        "ARTICLE_ID and MIT_ID for 'articles'). The rule decides which of the "
+        "consecutive duplicates is kept, so 'last' and 'most_complete' require "
+        "--sort_strategy or --page_size, which return records ordered by the key. "
+        "Defaults to None, which keeps duplicates."
+    ),
+    type=click.Choice(DUPLICATE_RULES),
+    default=None,
+)
+@click.option(
+    "--duplicate_filter_capacity",
+    help=(
+        "Track record keys with a Bloom filter sized for the given number of records "
+        "instead of an exact set, bounding the memory used to drop duplicates. "
+        "Only used with --duplicate_rule."
+    ),
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.option(
+    "--sort_strategy",
+    help=(
+        "Sort records by the record key so the output is deterministic. 'query' adds "
+        "an ORDER BY clause to the feed query, 'external' sorts records with a "
+        "disk-backed merge sort, and 'auto' picks the strategy for the feed type. "
+        "Defaults to None, which keeps the order returned by the Data Warehouse."
+    ),
+    type=click.Choice(SORT_STRATEGIES),
+    default=None,
+)
+@click.option(
+    "--sort_memory_budget",
+    help=(
+        "The maximum number of megabytes of records held in memory by the 'external' "
+        "sort strategy before sorted runs are written to temporary files."
+    ),
+    type=click.IntRange(min=1),
+    default=64,
+)
+@click.option(
+    "--page_size",
+    help=(
+        "Extract records with keyset pagination, fetching the given number of rows "
+        "per query in record key order. A failed page query is retried on a new "
+        "connection, resuming after the last record extracted. Defaults to None, "
+        "which fetches all records with a single query."
+    ),
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.option(
+    "--max_retries",
+    help=(
+        "The number of consecutive failed page queries retried before the run fails. "
+        "Only used with --page_size."
+    ),
+    type=click.IntRange(min=0),
+    default=3,
+)
+@click.option(
+    "--progress_interval",
+    help=(
+        "Log the number of records processed, the current and average rate, and, "
+        "if the total is known, the percentage done and an ETA at the given "
+        "interval in seconds. Defaults to None, which turns off progress logs."
+    ),
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+)
+@click.option(
+    "--progress_total",
+    help=(
+        "Retrieve the total number of records for progress logs while the feed runs: "
+        "'count' runs a concurrent COUNT(*) over the feed query and 'estimate' reads "
+        "the table statistics (Oracle only). Only used with --progress_interval."
+    ),
+    type=click.Choice(PROGRESS_TOTALS),
+    default=None,
+)
+@click.option(
+    "--join_mode",
+    help=(
+        "Where the 'people' query joins the person table to the org unit and ORCID "
+        "tables. 'client' runs a person-only query and joins the records to the "
+        "small dimension tables in memory. Only used for the 'people' feed."
+    ),
+    type=click.Choice(JOIN_MODES),
+    default="server",
+)
+@click.option(
+    "--dimension_cache",
+    help=(
+        "Save the dimension tables loaded by the 'client' join mode to the given "
+        "JSON file and reuse them in later runs while the tables are unchanged."
+    ),
+    type=click.Path(dir_okay=False),
+    default=None,
+)
+@click.option(
+    "--columnar_batch_size",
+    help=(
+        "Transform records in columnar mode: fetch them as Apache Arrow tables of "
+        "the given number of rows and apply the transforms as vectorized column "
+        "operations. Requires pyarrow. Defaults to None, which transforms records "
+        "one at a time."
+    ),
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.option(
+    "--spool",
+    help=(
+        "Write the feed to a local temporary file before uploading it, releasing the "
+        "Data Warehouse cursor as soon as the records are read. The file is uploaded "
+        "to a temporary path on the FTP server and renamed into place once verified."
+    ),
+    is_flag=True,
+)
+@click.option(
+    "--upload_rate_limit",
+    help=(
+        "Limit the rate of the FTP upload to the given number of megabytes per "
+        "second. Prefix the rate with a time window to apply it only during that "
+        "time of day (e.g. '08:00-18:00=2'). Can be used more than once; a rate "
+        "without a window applies at any other time. Use with --spool so the feed "
+        "is still extracted at full speed."
+    ),
+    multiple=True,
+)
+@click.option(
+    "--buffer_memory_limit",
+    help=(
+        "Buffer the feed between the Data Warehouse and the FTP upload in memory up "
+        "to the given number of megabytes, spilling to a temporary file beyond it, "
+        "so the feed never waits for a slow upload. Defaults to None, which uses "
+        "an OS pipe."
+    ),
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.option(
+    "--archive_file",
+    help=(
+        "Also write a gzip-compressed copy of the feed to the given file. Can be used "
+        "more than once. The feed is queried once and written to every destination "
+        "concurrently."
+    ),
+    type=click.Path(dir_okay=False),
+    multiple=True,
+)
+@click.option(
+    "--metrics_textfile",
+    help=(
+        "Write run metrics (records processed, stage durations, database fetch "
+        "latency, and FTP transfer rate) to the given file in the Prometheus text "
+        "format, for the node exporter textfile collector."
+    ),
+    type=click.Path(dir_okay=False),
+    default=None,
+)
+@click.option(
+    "--statsd_address",
+    help="Send run metrics to the StatsD server at the given 'host:port' over UDP.",
+    default=None,
+)
+@click.option(
+    "--history_file",
+    help=(
+        "Append a record of the run (record and byte counts, stage timings, query "
+        "fingerprint, and exit status) to the given SQLite file, and flag a "
+        "successful run whose duration or throughput falls outside a band around "
+        "the rolling baseline of earlier runs. See 'carbon history'."
+    ),
+    type=click.Path(dir_okay=False),
+    default=None,
+)
+@click.option(
+    "--history_tolerance",
+    help=(
+        "The relative width of the band around the baseline (e.g. 0.5 accepts values "
+        "between half and one and a half times the baseline). Only used with "
+        "--history_file."
+    ),
+    type=click.FloatRange(min=0, min_open=True),
+    default=0.5,
+)
+@click.option(
+    "--history_baseline_runs",
+    help=(
+        "The number of earlier successful runs of the same query included in the "
+        "baseline. Only used with --history_file."
+    ),
+    type=click.IntRange(min=1),
+    default=10,
+)
+@click.option(
+    "--profile",
+    help=(
+        "Profile the run. 'cprofile' traces every function call in the main thread "
+        "and writes a pstats file; 'sample' periodically samples the stacks of all "
+        "threads, including the FTP upload, and writes a collapsed-stack file for "
+        "flamegraph tools. 'sample' has a low overhead and can be used in "
+        "production runs. Defaults to None, which turns off profiling."
+    ),
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+)
+@click.option(
+    "--profile_directory",
+    help=(
+        "The directory into which profile files are written, named with the feed "
+        "type and a timestamp. Only used with --profile."
+    ),
+    type=click.Path(file_okay=False, exists=True),
+    default=".",
+)
+@click.option(
+    "--trace",
+    help=(
+        "Trace database, transform, and FTP operations as spans. If a Sentry DSN is "
+        "set, spans are sent to Sentry performance monitoring; otherwise they are "
+        "written to a JSON file in the OpenTelemetry (OTLP) format in "
+        "--trace_directory, named with the feed type and a timestamp."
+    ),
+    is_flag=True,
+)
+@click.option(
+    "--trace_directory",
+    help="The directory into which trace files are written. Only used with --trace.",
+    type=click.Path(file_okay=False, exists=True),
+    default=".",
+)
+@click.pass_context
+def main(
+    ctx: click.Context,
+    *,
+    output_file: IO,
+    run_connection_tests: bool,
+    use_sns_logging: bool,
+    validation_sample_rate: float | None,
+    quarantine_file: str | None,
+    error_budget: int,
+    limit: int | None,
+    sample_percent: float | None,
+    duplicate_rule: str | None,
+    duplicate_filter_capacity: int | None,
+    sort_strategy: str | None,
+    sort_memory_budget: int,
+    page_size: int | None,
+    max_retries: int,
+    progress_interval: float | None,
+    progress_total: str | None,
+    join_mode: str,
+    dimension_cache: str | None,
+    columnar_batch_size: int | None,
+    spool: bool,
+    upload_rate_limit: tuple[str, ...],
+    buffer_memory_limit: int | None,
+    archive_file: tuple[str, ...],
+    metrics_textfile: str | None,
+    statsd_address: str | None,
+    history_file: str | None,
+    history_tolerance: float,
+    history_baseline_runs: int,
+    profile: str | None,
+    profile_directory: str,
+    trace: bool,
+    trace_directory: str,
+) -> None:
     """Generate a data feed that uploads XML files to the Symplectic Elements FTP server.
 
     The feed uses a SQLAlchemy engine to connect to the Data Warehouse. A query is
@@ -54,7 +402,101 @@ def main(*, output_file: IO, run_connection_tests: bool, use_sns_logging: bool)
     [wip] By default, the feed will write to an XML file on the Elements FTP server.
     If the -o/--out argument is used, the output will be written to the specified
     file instead. This latter option is recommended for testing purposes.
+
+    Additional destinations can be added with the --archive_file option and the
+    optional 'SYMPLECTIC_FTP_EXTRA_TARGETS_JSON' environment variable. The feed is
+    then generated once and written to every destination concurrently.
+
+    If the --history_file option is used, each run is recorded in a local ledger,
+    and runs that are much slower or faster than the rolling baseline are flagged
+    in the logs and in the SNS message for a successful run.
+
+    The Data Warehouse connection and the logged in FTP session opened by the
+    connection tests are reused by the feed; both are checked first (with a
+    ping and a NOOP command) and reconnected if they went stale.
+
+    The feed is only run if no command is provided. The options also apply to the
+    feeds run by 'carbon daemon'.
     """
+    if ctx.invoked_subcommand:
+        return
+
+    config = load_config()
+    # connections are checked before they are reused, so the connection opened by
+    # the connection test can be reused by the feed
+    engine = create_database_engine(config, pool_pre_ping=True)
+    feed_options = get_feed_options(
+        config,
+        validation_sample_rate=validation_sample_rate,
+        quarantine_file=quarantine_file,
+        error_budget=error_budget,
+        limit=limit,
+        sample_percent=sample_percent,
+        duplicate_rule=duplicate_rule,
+        duplicate_filter_capacity=duplicate_filter_capacity,
+        sort_strategy=sort_strategy,
+        sort_memory_budget=sort_memory_budget,
+        page_size=page_size,
+        max_retries=max_retries,
+        progress_interval=progress_interval,
+        progress_total=progress_total,
+        join_mode=join_mode,
+        dimension_cache=dimension_cache,
+        columnar_batch_size=columnar_batch_size,
+    )
+    # the session logged in by the connection test is reused for the upload
+    ftp_session = (
+        None
+        if output_file
+        else FtpSession(
+            user=config.SYMPLECTIC_FTP_USER,
+            password=config.SYMPLECTIC_FTP_PASS,
+            host=config.SYMPLECTIC_FTP_HOST,
+            port=int(config.SYMPLECTIC_FTP_PORT),
+        )
+    )
+    pipe = create_pipe(
+        config,
+        engine,
+        feed_options,
+        output_file=output_file,
+        spool=spool,
+        upload_rate_limit=upload_rate_limit,
+        buffer_memory_limit=buffer_memory_limit,
+        archive_file=archive_file,
+        ftp_session=ftp_session,
+    )
+
+    try:
+        run_all_connection_tests(engine=engine, pipe=pipe)
+
+        if not run_connection_tests:
+            with (
+                SnsNotifier(config=config) if use_sns_logging else nullcontext()
+            ) as notifier:
+                run_pipe(
+                    config,
+                    engine,
+                    pipe,
+                    feed_options,
+                    notifier=notifier,
+                    metrics_textfile=metrics_textfile,
+                    statsd_address=statsd_address,
+                    history_file=history_file,
+                    history_tolerance=history_tolerance,
+                    history_baseline_runs=history_baseline_runs,
+                    profile=profile,
+                    profile_directory=profile_directory,
+                    trace=trace,
+                    trace_directory=trace_directory,
+                )
+    finally:
+        if ftp_session:
+            ftp_session.close()
+
+
+def load_config() -> Config:
+    """Load the Carbon config settings from environment variables."""
     config = Config(log_level=os.getenv("LOG_LEVEL", "INFO"))
 
     # [TEMP]: The connection string must use 'oracle+oracledb' to differentiate
@@ -67,29 +509,604 @@ def main(*, output_file: IO, run_connection_tests: bool, use_sns_logging: bool)
         "Carbon config settings loaded for environment: %s",
         config.WORKSPACE,
     )
+    return config
+
+
+def create_database_engine(
+    config: Config, **kwargs: Any  # noqa: ANN401
+) -> DatabaseEngine:
+    """Create a carbon.database.DatabaseEngine for the Data Warehouse.
+
+    Args:
+        config (Config): The Carbon config settings.
+        **kwargs: Keyword arguments passed to sqlalchemy.create_engine.
 
+    Each Oracle connection keeps a statement cache of ORACLE_STATEMENT_CACHE_SIZE
+    parsed statements, which are reused by the statements compiled once by
+    carbon.statements.StatementCache.
+    """
     engine = DatabaseEngine()
-    engine.configure(config.CONNECTION_STRING, thick_mode=True)
+    engine.configure(
+        config.CONNECTION_STRING,
+        thick_mode=True,
+        connect_args={"stmtcachesize": ORACLE_STATEMENT_CACHE_SIZE},
+        **kwargs,
+    )
+    return engine
+
+
+def get_feed_options(
+    config: Config,
+    *,
+    validation_sample_rate: float | None,
+    quarantine_file: str | None,
+    error_budget: int,
+    limit: int | None,
+    sample_percent: float | None,
+    duplicate_rule: str | None,
+    duplicate_filter_capacity: int | None,
+    sort_strategy: str | None,
+    sort_memory_budget: int,
+    page_size: int | None,
+    max_retries: int,
+    progress_interval: float | None,
+    progress_total: str | None,
+    join_mode: str,
+    dimension_cache: str | None,
+    columnar_batch_size: int | None,
+) -> dict[str, Any]:
+    """Get the keyword arguments passed to the feed from the CLI options."""
+    if duplicate_rule not in (None, "first") and not (sort_strategy or page_size):
+        msg = (
+            f"--duplicate_rule {duplicate_rule} requires --sort_strategy or "
+            "--page_size: the rule only applies to consecutive duplicates"
+        )
+        raise click.UsageError(msg)
+    if columnar_batch_size:
+        try:
+            check_columnar_available()
+        except ColumnarUnavailableError as error:
+            raise click.BadParameter(
+                str(error), param_hint="--columnar_batch_size"
+            ) from error
+    feed_options = {
+        "validation_sample_rate": validation_sample_rate,
+        "quarantine_path": quarantine_file,
+        "error_budget": error_budget,
+        "limit": limit,
+        "sample_percent": sample_percent,
+        "duplicate_rule": duplicate_rule,
+        "duplicate_filter_capacity": duplicate_filter_capacity,
+        "sort_strategy": sort_strategy,
+        "sort_memory_budget": sort_memory_budget * 1024**2,
+        "page_size": page_size,
+        "max_retries": max_retries,
+        "progress_interval": progress_interval,
+        "progress_total": progress_total,
+        "columnar_batch_size": columnar_batch_size,
+    }
+    if config.FEED_TYPE == "people":
+        feed_options["join_mode"] = join_mode
+        feed_options["dimension_cache_path"] = dimension_cache
+    return feed_options
+
+
+def check_multiple_destination_options(
+    config: Config,
+    *,
+    archive_file: tuple[str, ...],
+    spool: bool,
+    buffer_memory_limit: int | None,
+    upload_rate_limit: tuple[str, ...],
+) -> None:
+    """Reject options that do not apply when the feed is written to several sinks.
+
+    With --archive_file or extra FTP targets, the feed is written to every
+    destination as it is generated (see carbon.sinks.DatabaseToSinksPipe), so the
+    upload cannot be spooled, buffered or rate limited.
 
-    pipe: DatabaseToFtpPipe | DatabaseToFilePipe
+    Raises:
+        click.UsageError: If such an option is used with several destinations.
+    """
+    if not (archive_file or config.SYMPLECTIC_FTP_EXTRA_TARGETS):
+        return
+    if unsupported_options := [
+        option
+        for option, value in (
+            ("--spool", spool),
+            ("--buffer_memory_limit", buffer_memory_limit),
+            ("--upload_rate_limit", upload_rate_limit),
+        )
+        if value
+    ]:
+        msg = (
+            f"{', '.join(unsupported_options)} cannot be used with --archive_file or "
+            "extra FTP targets (SYMPLECTIC_FTP_EXTRA_TARGETS_JSON)"
+        )
+        raise click.UsageError(msg)
+
+
+def create_pipe(
+    config: Config,
+    engine: DatabaseEngine,
+    feed_options: dict[str, Any],
+    *,
+    output_file: IO | None,
+    spool: bool,
+    buffer_memory_limit: int | None,
+    archive_file: tuple[str, ...],
+    upload_rate_limit: tuple[str, ...] = (),
+    ftp_session: FtpSession | None = None,
+) -> DatabaseToFtpPipe | DatabaseToFilePipe | DatabaseToSinksPipe:
+    """Create the pipe that writes the feed to its destinations.
+
+    Args:
+        config (Config): The Carbon config settings.
+        engine (DatabaseEngine): A configured carbon.database.DatabaseEngine.
+        feed_options (dict[str, Any]): Keyword arguments passed to the feed.
+        output_file (IO | None): The file the feed is written to, or None to upload
+            the feed to the Symplectic Elements FTP server.
+        spool (bool): Whether the feed is spooled to a local file before it is
+            uploaded.
+        buffer_memory_limit (int | None): The number of megabytes held in memory
+            between the feed and the upload, or None to use an OS pipe.
+        archive_file (tuple[str, ...]): Paths to gzip-compressed copies of the feed.
+        upload_rate_limit (tuple[str, ...], optional): The rules of the
+            carbon.ratelimit.RateSchedule for the upload. Defaults to ().
+        ftp_session (FtpSession | None, optional): A carbon.app.FtpSession reused for
+            uploads to the Symplectic Elements FTP server. Defaults to None.
+    """
+    try:
+        upload_rate_schedule = (
+            RateSchedule(upload_rate_limit) if upload_rate_limit else None
+        )
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="--upload_rate_limit") from error
+    check_multiple_destination_options(
+        config,
+        archive_file=archive_file,
+        spool=spool,
+        buffer_memory_limit=buffer_memory_limit,
+        upload_rate_limit=upload_rate_limit,
+    )
+    extra_sinks: list[Sink] = [
+        ArchiveSink(f"archive_{index}", path)
+        for index, path in enumerate(archive_file, start=1)
+    ]
+    extra_sinks.extend(
+        FtpSink(
+            f"ftp_target_{index}",
+            user=target["SYMPLECTIC_FTP_USER"],
+            password=target["SYMPLECTIC_FTP_PASS"],
+            path=target["SYMPLECTIC_FTP_PATH"],
+            host=target["SYMPLECTIC_FTP_HOST"],
+            port=int(target["SYMPLECTIC_FTP_PORT"]),
+        )
+        for index, target in enumerate(config.SYMPLECTIC_FTP_EXTRA_TARGETS, start=1)
+    )
+
+    if extra_sinks:
+        primary_sink = (
+            FileSink("file", output_file)
+            if output_file
+            else FtpSink(
+                "ftp",
+                user=config.SYMPLECTIC_FTP_USER,
+                password=config.SYMPLECTIC_FTP_PASS,
+                path=config.SYMPLECTIC_FTP_PATH,
+                host=config.SYMPLECTIC_FTP_HOST,
+                port=int(config.SYMPLECTIC_FTP_PORT),
+                session=ftp_session,
+            )
+        )
+        return DatabaseToSinksPipe(
+            config=config,
+            engine=engine,
+            sinks=[primary_sink, *extra_sinks],
+            feed_options=feed_options,
+        )
     if output_file:
-        pipe = DatabaseToFilePipe(config=config, engine=engine, output_file=output_file)
-    else:
-        pipe = DatabaseToFtpPipe(config=config, engine=engine)
+        return DatabaseToFilePipe(
+            config=config,
+            engine=engine,
+            output_file=output_file,
+            feed_options=feed_options,
+        )
+    return DatabaseToFtpPipe(
+        config=config,
+        engine=engine,
+        feed_options=feed_options,
+        spool=spool,
+        buffer_memory_limit=(
+            buffer_memory_limit * 1024**2 if buffer_memory_limit else None
+        ),
+        ftp_session=ftp_session,
+        upload_rate_schedule=upload_rate_schedule,
+    )
 
-    run_all_connection_tests(engine=engine, pipe=pipe)
 
-    if not run_connection_tests:
-        logger.info("Carbon run for the '%s' feed has started.", config.FEED_TYPE)
-        if use_sns_logging:
-            sns_log(config=config, status="start")
-        try:
+def run_pipe(
+    config: Config,
+    engine: DatabaseEngine,
+    pipe: DatabaseToFtpPipe | DatabaseToFilePipe | DatabaseToSinksPipe,
+    feed_options: dict[str, Any],
+    *,
+    notifier: SnsNotifier | None,
+    metrics_textfile: str | None,
+    statsd_address: str | None,
+    history_file: str | None,
+    history_tolerance: float,
+    history_baseline_runs: int,
+    profile: str | None,
+    profile_directory: str,
+    trace: bool,
+    trace_directory: str,
+) -> bool:
+    """Run a pipe with notifications, metrics, run history, profiling, and tracing.
+
+    Errors raised by the pipe are logged and reported to SNS rather than raised.
+    The 'notifier' is a carbon.helpers.SnsNotifier created once per process (or None
+    if SNS logging is ignored), so its worker thread and SNS client are reused by
+    every run. See carbon.cli.main for a description of the other keyword arguments.
+
+    Returns:
+        bool: Whether the run succeeded.
+    """
+    logger.info("Carbon run for the '%s' feed has started.", config.FEED_TYPE)
+    if notifier:
+        notifier.notify(status="start")
+    metrics.reset()
+    ledger = (
+        RunLedger(
+            history_file,
+            baseline_size=history_baseline_runs,
+            tolerance=history_tolerance,
+        )
+        if history_file
+        else None
+    )
+    run_record = {
+        "started_at": datetime.now(tz=UTC).isoformat(timespec="seconds"),
+        "feed_type": config.FEED_TYPE,
+        "status": "fail",
+        "query_fingerprint": (
+            get_query_fingerprint(engine, config.FEED_TYPE, feed_options)
+            if ledger
+            else None
+        ),
+    }
+    profiler = (
+        RunProfiler(profile, config.FEED_TYPE, directory=profile_directory)
+        if profile
+        else nullcontext()
+    )
+    if trace:
+        timestamp = datetime.now(tz=UTC).strftime("%Y%m%dT%H%M%SZ")
+        tracer.start(
+            f"carbon.{config.FEED_TYPE}",
+            output_path=os.path.join(
+                trace_directory,
+                f"carbon-{config.FEED_TYPE}-{timestamp}.trace.json",
+            ),
+        )
+    succeeded = False
+    try:
+        with profiler:
             pipe.run()
-        except Exception as error:  # noqa: BLE001
-            logger.error("Carbon run has failed.")  # noqa: TRY400
-            if use_sns_logging:
-                sns_log(config=config, status="fail", error=error)
-        else:
-            logger.info("Carbon run has successfully completed.")
-            if use_sns_logging:
-                sns_log(config=config, status="success")
+    except Exception as error:  # noqa: BLE001
+        logger.error("Carbon run has failed.")  # noqa: TRY400
+        metrics.set_gauge("last_run_success", 0)
+        if notifier:
+            notifier.notify(status="fail", error=error)
+    else:
+        succeeded = True
+        logger.info("Carbon run has successfully completed.")
+        metrics.set_gauge("last_run_success", 1)
+        run_record.update(get_run_values(pipe.summary), status="success")
+        if ledger:
+            check_run_history(ledger, run_record, pipe.summary)
+        if notifier:
+            notifier.notify(status="success", run_summary=pipe.summary)
+    finally:
+        tracer.finish()
+        if ledger:
+            record_run_history(ledger, run_record)
+        metrics.set_gauge("last_run_timestamp_seconds", time.time())
+        export_metrics(
+            metrics,
+            config.FEED_TYPE,
+            textfile_path=metrics_textfile,
+            statsd_address=statsd_address,
+        )
+    return succeeded
+
+
+def get_run_values(run_summary: dict[str, Any]) -> dict[str, Any]:
+    """Get the values recorded in the run ledger from a run summary and metrics."""
+    return {
+        "records": run_summary.get("records"),
+        "bytes": run_summary.get("uploaded_bytes", run_summary.get("spool_bytes")),
+        "elapsed_seconds": run_summary.get("elapsed_seconds"),
+        **{
+            name: metrics.gauges.get(name)
+            for name in ("extract_seconds", "transform_seconds", "write_seconds")
+        },
+    }
+
+
+def check_run_history(
+    ledger: RunLedger, run_record: dict[str, Any], run_summary: dict[str, Any]
+) -> None:
+    """Log performance regressions and add them to the run summary."""
+    try:
+        regressions = ledger.check(run_record)
+    except Exception:
+        logger.exception("Failed to read the run history from '%s'", ledger.path)
+        return
+    for regression in regressions:
+        logger.warning("Performance regression: %s", regression)
+    if regressions:
+        run_summary["performance_regressions"] = "; ".join(regressions)
+
+
+def record_run_history(ledger: RunLedger, run_record: dict[str, Any]) -> None:
+    """Append a run to the ledger, logging rather than raising errors."""
+    try:
+        ledger.record(run_record)
+    except Exception:
+        logger.exception("Failed to record the run in '%s'", ledger.path)
+
+
+@main.command()
+@click.argument("old_file", type=click.Path(exists=True, dir_okay=False))
+@click.argument("new_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-o",
+    "--output_file",
+    help="Name of file into which the delta XML document is written. Defaults to stdout.",
+    type=click.File("wb"),
+    default="-",
+)
+def diff(old_file: str, new_file: str, output_file: IO) -> None:
+    """Compare two feed files and write the changed records as a delta XML document.
+
+    Both feed files must be of the same feed type and sorted by record key (see
+    --sort_strategy). The files are memory-mapped and walked record by record, so
+    memory use does not depend on file size. The number of added, removed, changed,
+    and unchanged records is printed to stderr.
+    """
+    try:
+        counts = FeedDiff(old_file, new_file, output_file).run()
+    except FeedDiffError as error:
+        raise click.ClickException(str(error)) from error
+    click.echo(
+        ", ".join(f"{category}={count}" for category, count in counts.items()),
+        err=True,
+    )
+
+
+@main.command()
+@click.argument("history_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--feed_type",
+    help="Only show runs of the feed type.",
+    type=click.Choice(["people", "articles"]),
+    default=None,
+)
+@click.option(
+    "--limit",
+    help="The maximum number of runs shown.",
+    type=click.IntRange(min=1),
+    default=20,
+)
+def history(history_file: str, feed_type: str | None, limit: int) -> None:
+    """Show the most recent runs recorded with the --history_file option.
+
+    Runs are listed oldest first with their duration and throughput, followed by
+    the rolling baseline for the query of the latest run of each feed type.
+    """
+    ledger = RunLedger(history_file)
+    runs = ledger.history(feed_type=feed_type, limit=limit)
+    click.echo(
+        f"{'started_at':<25} {'feed':<8} {'status':<7} {'records':>9} "
+        f"{'megabytes':>9} {'seconds':>9} {'records/s':>9} query"
+    )
+    for run in runs:
+        megabytes = f"{run['bytes'] / 1024**2:.1f}" if run["bytes"] else "-"
+        seconds = run["elapsed_seconds"]
+        records_per_second = (
+            f"{run['records'] / seconds:,.0f}" if run["records"] and seconds else "-"
+        )
+        click.echo(
+            f"{run['started_at']:<25} {run['feed_type']:<8} {run['status']:<7} "
+            f"{run['records'] or '-':>9} {megabytes:>9} "
+            f"{f'{seconds:.1f}' if seconds else '-':>9} {records_per_second:>9} "
+            f"{run['query_fingerprint'] or '-'}"
+        )
+    latest_runs = {run["feed_type"]: run for run in runs}
+    for latest_run in latest_runs.values():
+        baseline = ledger.baseline(
+            latest_run["feed_type"], latest_run["query_fingerprint"]
+        )
+        if baseline:
+            click.echo(
+                f"Baseline for '{latest_run['feed_type']}' over {baseline['runs']} "
+                f"runs: {baseline['elapsed_seconds']:.1f} seconds, "
+                f"{baseline['records_per_second']:,.0f} records/s"
+            )
+
+
+@main.command()
+@click.option(
+    "--schedule",
+    help=(
+        "Run the feed on a cron schedule in local time, e.g. '0 */4 * * *' for every "
+        "four hours."
+    ),
+    default=None,
+)
+@click.option(
+    "--trigger_file",
+    help=(
+        "Run the feed whenever the given file is created. The file is removed when "
+        "the run starts."
+    ),
+    type=click.Path(dir_okay=False),
+    default=None,
+)
+@click.option(
+    "--status_file",
+    help=(
+        "Write the state of the daemon and the statistics of recent runs to the "
+        "given JSON file."
+    ),
+    type=click.Path(dir_okay=False),
+    default=None,
+)
+@click.option(
+    "--poll_interval",
+    help="The number of seconds between checks of the schedule and trigger file.",
+    type=click.FloatRange(min=0, min_open=True),
+    default=5.0,
+)
+@click.option(
+    "--keepalive_interval",
+    help=(
+        "The number of seconds between checks that keep the Data Warehouse "
+        "connection pool and the FTP session warm between runs."
+    ),
+    type=click.FloatRange(min=0, min_open=True),
+    default=60.0,
+)
+@click.option(
+    "--max_runs",
+    help="Stop after the given number of runs. Defaults to None, which runs until "
+    "the process receives SIGTERM or SIGINT.",
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.pass_context
+def daemon(
+    ctx: click.Context,
+    *,
+    schedule: str | None,
+    trigger_file: str | None,
+    status_file: str | None,
+    poll_interval: float,
+    keepalive_interval: float,
+    max_runs: int | None,
+) -> None:
+    """Stay resident and run the feed on a schedule or when a trigger file is created.
+
+    The config, the Oracle client, the Data Warehouse connection pool, and the FTP
+    session are set up once and kept warm between runs, so each run only pays for
+    the feed itself. Options given before 'daemon' (e.g. 'carbon --page_size 5000
+    daemon --schedule "0 * * * *"') apply to every run.
+    """
+    options = ctx.parent.params  # type: ignore[union-attr]
+    if options["output_file"]:
+        msg = "The -o/--output_file option cannot be used with 'carbon daemon'"
+        raise click.UsageError(msg)
+    if not schedule and not trigger_file:
+        msg = "'carbon daemon' requires --schedule or --trigger_file"
+        raise click.UsageError(msg)
+    try:
+        cron_schedule = CronSchedule(schedule) if schedule else None
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="--schedule") from error
+
+    config = load_config()
+    engine = create_database_engine(config, pool_pre_ping=True)
+    feed_options = get_feed_options(
+        config,
+        validation_sample_rate=options["validation_sample_rate"],
+        quarantine_file=options["quarantine_file"],
+        error_budget=options["error_budget"],
+        limit=options["limit"],
+        sample_percent=options["sample_percent"],
+        duplicate_rule=options["duplicate_rule"],
+        duplicate_filter_capacity=options["duplicate_filter_capacity"],
+        sort_strategy=options["sort_strategy"],
+        sort_memory_budget=options["sort_memory_budget"],
+        page_size=options["page_size"],
+        max_retries=options["max_retries"],
+        progress_interval=options["progress_interval"],
+        progress_total=options["progress_total"],
+        join_mode=options["join_mode"],
+        dimension_cache=options["dimension_cache"],
+        columnar_batch_size=options["columnar_batch_size"],
+    )
+    check_multiple_destination_options(
+        config,
+        archive_file=options["archive_file"],
+        spool=options["spool"],
+        buffer_memory_limit=options["buffer_memory_limit"],
+        upload_rate_limit=options["upload_rate_limit"],
+    )
+    ftp_session = FtpSession(
+        user=config.SYMPLECTIC_FTP_USER,
+        password=config.SYMPLECTIC_FTP_PASS,
+        host=config.SYMPLECTIC_FTP_HOST,
+        port=int(config.SYMPLECTIC_FTP_PORT),
+    )
+    notifier = SnsNotifier(config=config) if options["use_sns_logging"] else None
+
+    def run_feed() -> tuple[bool, dict[str, Any]]:
+        pipe = create_pipe(
+            config,
+            engine,
+            feed_options,
+            output_file=None,
+            spool=options["spool"],
+            upload_rate_limit=options["upload_rate_limit"],
+            buffer_memory_limit=options["buffer_memory_limit"],
+            archive_file=options["archive_file"],
+            ftp_session=ftp_session,
+        )
+        succeeded = run_pipe(
+            config,
+            engine,
+            pipe,
+            feed_options,
+            notifier=notifier,
+            metrics_textfile=options["metrics_textfile"],
+            statsd_address=options["statsd_address"],
+            history_file=options["history_file"],
+            history_tolerance=options["history_tolerance"],
+            history_baseline_runs=options["history_baseline_runs"],
+            profile=options["profile"],
+            profile_directory=options["profile_directory"],
+            trace=options["trace"],
+            trace_directory=options["trace_directory"],
+        )
+        return succeeded, pipe.summary
+
+    def keep_alive() -> None:
+        # checking out a connection runs the pool's pre-ping
+        engine().connect().close()
+        ftp_session.keep_alive()
+
+    carbon_daemon = CarbonDaemon(
+        run_feed,
+        schedule=cron_schedule,
+        trigger_file=trigger_file,
+        status_file=status_file,
+        poll_interval=poll_interval,
+        keep_alive=keep_alive,
+        keepalive_interval=keepalive_interval,
+        max_runs=max_runs,
+    )
+    previous_handlers = {
+        signal_number: signal.signal(signal_number, lambda *_: carbon_daemon.stop())
+        for signal_number in (signal.SIGTERM, signal.SIGINT)
+    }
+    try:
+        engine.run_connection_test()
+        ftp_session.connect()
+        carbon_daemon.run()
+    finally:
+        ftp_session.close()
+        if notifier:
+            notifier.close()
+        for signal_number, handler in previous_handlers.items():
+            signal.signal(signal_number, handler)
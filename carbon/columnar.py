@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import Date, DateTime, Numeric
+
+try:
+    import pyarrow as pa  # type: ignore[import-untyped,import-not-found,unused-ignore]
+    import pyarrow.compute as pc  # type: ignore[import-untyped,import-not-found,unused-ignore]
+except ImportError:  # pragma: no cover
+    pa = pc = None
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable
+
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.sql.expression import ColumnCollection
+    from sqlalchemy.sql.selectable import TextualSelect
+
+# the characters matched by '\w' and '\s' in Python; '\w' and '\s' only match
+# ASCII characters in the regular expressions of pyarrow.compute (RE2)
+WORD_CHARACTERS = r"\pL\pN_"
+SPACE_CHARACTERS = r"\s\pZ"
+
+
+class ColumnarUnavailableError(Exception):
+    """Columnar mode was requested but pyarrow is not installed."""
+
+
+def check_columnar_available() -> None:
+    """Check that pyarrow is installed.
+
+    Raises:
+        ColumnarUnavailableError: If pyarrow cannot be imported.
+    """
+    if pa is None:
+        msg = "Columnar mode requires pyarrow: install it with 'pipenv install pyarrow'"
+        raise ColumnarUnavailableError(msg)
+
+
+def get_arrow_schema(columns: ColumnCollection) -> pa.Schema:
+    """Create the Arrow schema of the records returned by a select statement.
+
+    Numeric columns keep their precision and scale, so decimals are formatted with
+    the same number of digits as in the row path.
+    """
+    fields = []
+    for name, column in columns.items():
+        if isinstance(column.type, Numeric) and column.type.scale is not None:
+            arrow_type = pa.decimal128(column.type.precision or 38, column.type.scale)
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        elif isinstance(column.type, Date):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def batch_records(
+    records: Iterable[dict[str, Any]], schema: pa.Schema, batch_size: int
+) -> Generator[pa.Table, None, None]:
+    """Group records into Arrow tables of up to 'batch_size' rows."""
+    iterator = iter(records)
+    while rows := list(islice(iterator, batch_size)):
+        yield pa.Table.from_pylist(rows, schema=schema)
+
+
+def fetch_record_batches(
+    connection: Connection,
+    statement: TextualSelect,
+    parameters: dict[str, Any],
+    schema: pa.Schema,
+    batch_size: int,
+) -> Generator[pa.Table, None, None]:
+    """Fetch the results of a statement as Arrow tables of up to 'batch_size' rows.
+
+    With python-oracledb (3.1 or later), batches are fetched directly as data frames
+    (see oracledb.Connection.fetch_df_batches), so no Python object is created per
+    value. Otherwise, rows are fetched with SQLAlchemy and converted column by column.
+    """
+    driver_connection = connection.connection.driver_connection
+    if driver_connection is not None and hasattr(driver_connection, "fetch_df_batches"):
+        for data_frame in driver_connection.fetch_df_batches(
+            statement=str(statement), parameters=parameters, size=batch_size
+        ):
+            yield pa.table(data_frame).select(schema.names).cast(schema, safe=False)
+        return
+    result = connection.execute(statement, parameters)
+    for rows in result.partitions(batch_size):
+        yield pa.Table.from_arrays(
+            [
+                pa.array(values, type=field.type)
+                for values, field in zip(zip(*rows, strict=True), schema, strict=True)
+            ],
+            schema=schema,
+        )
+
+
+def create_table(columns: dict[str, Any], row_count: int) -> pa.Table:
+    """Create a table from arrays, repeating string values 'row_count' times."""
+    return pa.table(
+        {
+            name: (
+                pa.repeat(pa.scalar(values), row_count)
+                if isinstance(values, str)
+                else values
+            )
+            for name, values in columns.items()
+        }
+    )
+
+
+def format_dates(dates: pa.Array) -> pa.Array:
+    """Format dates as YYYY-MM-DD (see carbon.helpers.get_hire_date_string)."""
+    return pc.strftime(dates, format="%Y-%m-%d")
+
+
+def format_strings(values: pa.Array) -> pa.Array:
+    """Convert values to strings as 'str' does, including null values ('None')."""
+    return pc.fill_null(pc.cast(values, pa.string()), "None")
+
+
+def get_group_names(dlcs: pa.Array, sub_areas: pa.Array) -> pa.Array:
+    """Create primary group names (see carbon.helpers.get_group_name)."""
+    qualifiers = pc.if_else(
+        pc.is_in(sub_areas, value_set=pa.array(["CFAT", "CFAN"])),
+        "Faculty",
+        "Non-faculty",
+    )
+    return pc.binary_join_element_wise(pc.fill_null(dlcs, "None"), qualifiers, " ")
+
+
+def get_hire_dates(
+    original_start_dates: pa.Array, dates_to_faculty: pa.Array
+) -> pa.Array:
+    """Create hire date strings (see carbon.helpers.get_hire_date_string)."""
+    return format_dates(pc.coalesce(dates_to_faculty, original_start_dates))
+
+
+def get_initials(*name_components: pa.Array) -> pa.Array:
+    """Create space-separated initials (see carbon.helpers.get_initials).
+
+    Empty name components are skipped, as in the row path.
+    """
+    joined_initials = pa.nulls(len(name_components[0]), pa.string())
+    for name_component in name_components:
+        names = pc.if_else(
+            pc.equal(name_component, ""), pa.scalar(None, pa.string()), name_component
+        )
+        names = pc.replace_substring_regex(
+            names, rf"[^{WORD_CHARACTERS}{SPACE_CHARACTERS}-]", ""
+        )
+        # keep the first character of each word and of each run of separators
+        names = pc.replace_substring_regex(
+            names,
+            rf"([{WORD_CHARACTERS}])[{WORD_CHARACTERS}]*"
+            rf"|([^{WORD_CHARACTERS}])[^{WORD_CHARACTERS}]*",
+            r"\1\2",
+        )
+        initials = pc.utf8_upper(names)
+        # join with a space, skipping null values ('binary_join_element_wise' with
+        # null_handling="skip" drops rows in which every value is null)
+        joined_initials = pc.if_else(
+            pc.is_null(joined_initials),
+            initials,
+            pc.if_else(
+                pc.is_null(initials),
+                joined_initials,
+                pc.binary_join_element_wise(joined_initials, initials, " "),
+            ),
+        )
+    return pc.fill_null(joined_initials, "")
@@ -7,6 +7,14 @@ import sentry_sdk
 
 root_logger = logging.getLogger()
 
+EXTRA_FTP_TARGET_SETTINGS = (
+    "SYMPLECTIC_FTP_HOST",
+    "SYMPLECTIC_FTP_PORT",
+    "SYMPLECTIC_FTP_USER",
+    "SYMPLECTIC_FTP_PASS",
+    "SYMPLECTIC_FTP_PATH",
+)
+
 
 class Config:
     REQUIRED_ENVIRONMENT_VARIABLES: Iterable[str] = (
@@ -26,6 +34,7 @@ class Config:
     SYMPLECTIC_FTP_PATH: str
     SNS_TOPIC_ARN: str
     WORKSPACE: str
+    SYMPLECTIC_FTP_EXTRA_TARGETS: list[dict[str, str]]
 
     def __init__(
         self,
@@ -66,7 +75,11 @@ class Config:
         """Establish Carbon project on Sentry."""
         sentry_dsn = os.getenv("SENTRY_DSN", "None")
         if sentry_dsn and sentry_dsn.lower() != "none":
-            sentry_sdk.init(sentry_dsn, environment=self.WORKSPACE)
+            # transactions are only started by runs with tracing enabled (see
+            # carbon.tracing.Tracer), so every transaction is sent
+            sentry_sdk.init(
+                sentry_dsn, environment=self.WORKSPACE, traces_sample_rate=1.0
+            )
             root_logger.info(
                 "Sentry DSN found, exceptions will be sent to Sentry with env=%s",
                 self.WORKSPACE,
@@ -94,3 +107,46 @@ class Config:
                     config_variable,
                 )
                 raise
+        self.SYMPLECTIC_FTP_EXTRA_TARGETS = self.load_extra_ftp_targets()
+
+    @staticmethod
+    def load_extra_ftp_targets() -> list[dict[str, str]]:
+        """Retrieve and validate the optional additional FTP servers.
+
+        Each target is numbered from 1 in error messages, matching the names of the
+        sinks created for them (e.g. 'ftp_target_1').
+
+        Raises:
+            ValueError: If SYMPLECTIC_FTP_EXTRA_TARGETS_JSON is not a JSON list of
+                objects with the settings of an FTP server.
+        """
+        try:
+            targets = json.loads(os.getenv("SYMPLECTIC_FTP_EXTRA_TARGETS_JSON", "[]"))
+        except json.JSONDecodeError as error:
+            msg = f"SYMPLECTIC_FTP_EXTRA_TARGETS_JSON is not valid JSON: {error}"
+            raise ValueError(msg) from error
+        if not isinstance(targets, list):
+            msg = "SYMPLECTIC_FTP_EXTRA_TARGETS_JSON must be a JSON list of FTP targets"
+            raise ValueError(msg)  # noqa: TRY004
+        for index, target in enumerate(targets, start=1):
+            if not isinstance(target, dict):
+                msg = (
+                    f"SYMPLECTIC_FTP_EXTRA_TARGETS_JSON target {index} must be a JSON "
+                    f"object, got {target!r}"
+                )
+                raise ValueError(msg)  # noqa: TRY004
+            if missing_settings := [
+                setting for setting in EXTRA_FTP_TARGET_SETTINGS if setting not in target
+            ]:
+                msg = (
+                    f"SYMPLECTIC_FTP_EXTRA_TARGETS_JSON target {index} is missing "
+                    f"{', '.join(missing_settings)}"
+                )
+                raise ValueError(msg)
+            if not str(target["SYMPLECTIC_FTP_PORT"]).isdigit():
+                msg = (
+                    f"SYMPLECTIC_FTP_EXTRA_TARGETS_JSON target {index} has an invalid "
+                    f"SYMPLECTIC_FTP_PORT: {target['SYMPLECTIC_FTP_PORT']!r}"
+                )
+                raise ValueError(msg)
+        return targets
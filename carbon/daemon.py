@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+# the (minimum, maximum) values of the minute, hour, day, month, and weekday fields
+CRON_FIELD_RANGES: tuple[tuple[int, int], ...] = (
+    (0, 59),
+    (0, 23),
+    (1, 31),
+    (1, 12),
+    (0, 7),
+)
+
+
+class CronSchedule:
+    """A schedule defined by a cron expression, evaluated in local time.
+
+    The expression has five fields: minute, hour, day of month, month, and day of
+    week (0 or 7 is Sunday). Each field is '*', a value, a range ('1-5'), a step
+    ('*/15' or '0-30/10'), or a comma-separated list of these. As in cron, if both
+    the day of month and the day of week are restricted, a day matching either
+    field matches.
+
+    Attributes:
+        expression: The cron expression (e.g. "0 2 * * 1-5").
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != len(CRON_FIELD_RANGES):
+            msg = f"'{expression}' is not a valid cron expression: expected 5 fields"
+            raise ValueError(msg)
+        self.expression = expression
+        self._minutes, self._hours, self._days, self._months, self._weekdays = (
+            self._parse_field(field, minimum, maximum)
+            for field, (minimum, maximum) in zip(fields, CRON_FIELD_RANGES, strict=True)
+        )
+        if 7 in self._weekdays:  # noqa: PLR2004
+            self._weekdays = self._weekdays - {7} | {0}
+        self._days_restricted = fields[2] != "*"
+        self._weekdays_restricted = fields[4] != "*"
+
+    def _parse_field(self, field: str, minimum: int, maximum: int) -> set[int]:
+        values: set[int] = set()
+        for part in field.split(","):
+            range_part, _, step_part = part.partition("/")
+            try:
+                step = int(step_part) if step_part else 1
+                if range_part == "*":
+                    start, end = minimum, maximum
+                elif "-" in range_part:
+                    start, end = (int(value) for value in range_part.split("-", 1))
+                else:
+                    start = end = int(range_part)
+            except ValueError:
+                start, end, step = 0, -1, 0
+            if step < 1 or start < minimum or end > maximum or start > end:
+                msg = f"'{part}' is not valid in cron expression '{self.expression}'"
+                raise ValueError(msg)
+            values.update(range(start, end + 1, step))
+        return values
+
+    def matches(self, moment: datetime) -> bool:
+        """Check whether the schedule includes the minute of a datetime."""
+        if (
+            moment.minute not in self._minutes
+            or moment.hour not in self._hours
+            or moment.month not in self._months
+        ):
+            return False
+        day_matches = moment.day in self._days
+        weekday_matches = moment.isoweekday() % 7 in self._weekdays
+        if self._days_restricted and self._weekdays_restricted:
+            return day_matches or weekday_matches
+        return day_matches and weekday_matches
+
+    def next_run(self, after: datetime) -> datetime:
+        """Get the first minute of the schedule after a datetime.
+
+        Raises:
+            ValueError: If the schedule has no minute in the following year
+                (e.g. "0 0 31 2 *").
+        """
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        end = moment + timedelta(days=366)
+        while moment < end:
+            if self.matches(moment):
+                return moment
+            moment += timedelta(minutes=1)
+        msg = f"Cron expression '{self.expression}' never matches"
+        raise ValueError(msg)
+
+
+class CarbonDaemon:
+    """A long-running process that runs a feed on a schedule or on a trigger file.
+
+    The daemon polls every 'poll_interval' seconds. A run starts when the next time
+    of the schedule has passed or when the trigger file exists (the file is removed
+    first, so creating it again queues another run). Runs never overlap: a run
+    that is due while another run is in progress starts after it.
+
+    Between runs, 'keep_alive' is called every 'keepalive_interval' seconds so
+    that warm connections (a database connection pool, an FTP session) are not
+    closed by the server. The state of the daemon and the statistics of the most
+    recent runs are written to the status file after every change.
+
+    Attributes:
+        run_feed: A function that runs the feed and returns whether it succeeded
+            and the summary of the run.
+        schedule: A carbon.daemon.CronSchedule, or None to only run on the trigger.
+        trigger_file: The path to the trigger file, or None to only run on the
+            schedule.
+        status_file: The path to the JSON status file, or None.
+        poll_interval: The number of seconds between checks of the schedule and the
+            trigger file.
+        keep_alive: A function called between runs to keep connections warm.
+        keepalive_interval: The number of seconds between calls to 'keep_alive'.
+        max_runs: The number of runs after which the daemon stops, or None to run
+            until stopped.
+        run_count: The number of runs started.
+        failure_count: The number of runs that failed.
+        runs: The statistics of the most recent runs.
+    """
+
+    def __init__(
+        self,
+        run_feed: Callable[[], tuple[bool, dict[str, Any]]],
+        *,
+        schedule: CronSchedule | None = None,
+        trigger_file: str | None = None,
+        status_file: str | None = None,
+        poll_interval: float = 5.0,
+        keep_alive: Callable[[], None] | None = None,
+        keepalive_interval: float = 60.0,
+        max_runs: int | None = None,
+        history_size: int = 20,
+    ):
+        if schedule is None and trigger_file is None:
+            msg = "A schedule or a trigger file is required"
+            raise ValueError(msg)
+        self.run_feed = run_feed
+        self.schedule = schedule
+        self.trigger_file = trigger_file
+        self.status_file = status_file
+        self.poll_interval = poll_interval
+        self.keep_alive = keep_alive
+        self.keepalive_interval = keepalive_interval
+        self.max_runs = max_runs
+        self.run_count = 0
+        self.failure_count = 0
+        self.runs: deque[dict[str, Any]] = deque(maxlen=history_size)
+        self._stop_event = threading.Event()
+        self._started_at = ""
+        self._state = "idle"
+        self._next_run_time: datetime | None = None
+
+    def stop(self) -> None:
+        """Stop the daemon after the current run, if any."""
+        self._stop_event.set()
+
+    def run(self) -> None:
+        """Run the feed whenever it is due until the daemon is stopped."""
+        self._started_at = datetime.now().astimezone().isoformat(timespec="seconds")
+        if self.schedule:
+            self._next_run_time = self.schedule.next_run(datetime.now().astimezone())
+        logger.info(
+            "Carbon daemon started (schedule: %s, trigger file: %s, next run: %s)",
+            self.schedule.expression if self.schedule else None,
+            self.trigger_file,
+            self._next_run_time,
+        )
+        self.write_status()
+        last_keepalive_time = time.monotonic()
+        while not self._stop_event.is_set():
+            reason = self._get_run_reason()
+            if reason:
+                self.run_once(reason)
+                last_keepalive_time = time.monotonic()
+                if self.max_runs and self.run_count >= self.max_runs:
+                    break
+            elif (
+                self.keep_alive
+                and time.monotonic() - last_keepalive_time >= self.keepalive_interval
+            ):
+                self._call_keep_alive()
+                last_keepalive_time = time.monotonic()
+            self._stop_event.wait(self.poll_interval)
+        self._state = "stopped"
+        self.write_status()
+        logger.info(
+            "Carbon daemon stopped after %s runs (%s failed)",
+            self.run_count,
+            self.failure_count,
+        )
+
+    def _get_run_reason(self) -> str | None:
+        if self.trigger_file and os.path.exists(self.trigger_file):
+            os.remove(self.trigger_file)
+            return "trigger"
+        if (
+            self.schedule
+            and self._next_run_time
+            and datetime.now().astimezone() >= self._next_run_time
+        ):
+            self._next_run_time = self.schedule.next_run(datetime.now().astimezone())
+            return "schedule"
+        return None
+
+    def _call_keep_alive(self) -> None:
+        try:
+            self.keep_alive()  # type: ignore[misc]
+        except Exception:
+            logger.exception("Failed to keep connections alive")
+
+    def run_once(self, reason: str) -> dict[str, Any]:
+        """Run the feed once and record its statistics.
+
+        Args:
+            reason (str): What started the run: 'schedule' or 'trigger'.
+
+        Returns:
+            dict[str, Any]: The statistics of the run.
+        """
+        self.run_count += 1
+        self._state = "running"
+        self.write_status()
+        logger.info("Starting run %s of the Carbon daemon (%s)", self.run_count, reason)
+        started_at = datetime.now().astimezone().isoformat(timespec="seconds")
+        start_time = time.perf_counter()
+        try:
+            succeeded, summary = self.run_feed()
+        except Exception as error:
+            logger.exception("Run %s of the Carbon daemon failed", self.run_count)
+            succeeded, summary = False, {"error": repr(error)}
+        run = {
+            "run": self.run_count,
+            "reason": reason,
+            "started_at": started_at,
+            "status": "success" if succeeded else "fail",
+            "elapsed_seconds": round(time.perf_counter() - start_time, 3),
+            "summary": summary,
+        }
+        if not succeeded:
+            self.failure_count += 1
+        self.runs.append(run)
+        self._state = "idle"
+        self.write_status()
+        return run
+
+    def write_status(self) -> None:
+        """Write the state of the daemon and recent run statistics to the status file.
+
+        The file is replaced atomically. Failing to write it is logged but does not
+        stop the daemon.
+        """
+        if not self.status_file:
+            return
+        status = {
+            "pid": os.getpid(),
+            "started_at": self._started_at,
+            "state": self._state,
+            "next_run": (
+                self._next_run_time.isoformat() if self._next_run_time else None
+            ),
+            "run_count": self.run_count,
+            "failure_count": self.failure_count,
+            "runs": list(self.runs),
+        }
+        directory = os.path.dirname(os.path.abspath(self.status_file))
+        try:
+            file_descriptor, temporary_path = tempfile.mkstemp(
+                dir=directory, suffix=".tmp"
+            )
+            with os.fdopen(file_descriptor, "w") as temporary_file:
+                json.dump(status, temporary_file, default=str, indent=2)
+            os.replace(temporary_path, self.status_file)
+        except OSError:
+            logger.exception("Failed to write daemon status to '%s'", self.status_file)
@@ -6,6 +6,7 @@ from sqlalchemy import (
     Date,
     Engine,
     ForeignKey,
+    Integer,
     MetaData,
     Numeric,
     String,
@@ -15,9 +16,16 @@ from sqlalchemy import (
     create_engine,
 )
 from sqlalchemy.exc import DatabaseError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.functions import FunctionElement
 
 logger = logging.getLogger(__name__)
 
+# the number of buckets values are hashed into for sampling (see SampleBucket), so a
+# sample can be given in steps of 0.01 percent
+SAMPLE_BUCKET_COUNT = 10_000
+
 metadata = MetaData()
 
 persons = Table(
@@ -79,6 +87,36 @@ aa_articles = Table(
 )
 
 
+class SampleBucket(FunctionElement[int]):
+    """The sample bucket of a value, from 0 to SAMPLE_BUCKET_COUNT - 1.
+
+    Filtering on the bucket selects a deterministic sample: a value is always in the
+    same bucket, so the same records are sampled in every run. On Oracle, the value
+    is hashed with ORA_HASH. Other dialects (e.g. SQLite in tests) take the numeric
+    value modulo the bucket count, which requires a numeric string such as an MIT ID.
+    """
+
+    type = Integer()
+    name = "sample_bucket"
+    inherit_cache = True
+
+
+@compiles(SampleBucket)
+def _compile_sample_bucket(
+    element: SampleBucket, compiler: SQLCompiler, **kwargs: Any  # noqa: ANN401
+) -> str:
+    value = compiler.process(element.clauses, **kwargs)
+    return f"(CAST({value} AS INTEGER) % {SAMPLE_BUCKET_COUNT})"
+
+
+@compiles(SampleBucket, "oracle")
+def _compile_oracle_sample_bucket(
+    element: SampleBucket, compiler: SQLCompiler, **kwargs: Any  # noqa: ANN401
+) -> str:
+    value = compiler.process(element.clauses, **kwargs)
+    return f"ORA_HASH({value}, {SAMPLE_BUCKET_COUNT - 1})"
+
+
 class DatabaseEngine:
     """Database engine.
 
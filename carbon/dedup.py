@@ -0,0 +1,156 @@
+import hashlib
+import math
+from collections.abc import Generator, Iterable
+from typing import Any
+
+DUPLICATE_RULES: tuple[str, ...] = ("first", "last", "most_complete")
+
+
+class BloomFilter:
+    """A fixed-size probabilistic set of record key digests.
+
+    The filter uses a bit array sized for the expected number of keys and the
+    accepted false positive rate, so its memory use does not grow with the feed.
+    A false positive means that a record with a key that was not seen before is
+    treated as a duplicate; the error rate should be set accordingly.
+
+    Attributes:
+        capacity: The expected number of keys.
+        error_rate: The accepted false positive rate once 'capacity' keys are added.
+        bit_count: The number of bits in the filter.
+        hash_count: The number of bits set for each key.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 1e-6):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self._bits = bytearray(math.ceil(self.bit_count / 8))
+
+    def _positions(self, digest: bytes) -> Generator[int, Any, None]:
+        first_hash = int.from_bytes(digest[:8])
+        second_hash = int.from_bytes(digest[8:]) | 1
+        for index in range(self.hash_count):
+            yield (first_hash + index * second_hash) % self.bit_count
+
+    def __contains__(self, digest: bytes) -> bool:
+        """Check whether a key digest may have been added to the filter."""
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(digest)
+        )
+
+    def add(self, digest: bytes) -> None:
+        """Add a key digest to the filter."""
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+
+class RecordDeduplicator:
+    """A streaming filter that drops records with a key that was already seen.
+
+    Each record key is reduced to a 128-bit digest. By default, the first 64 bits
+    of each digest are kept in a set, which is exact for any realistic feed size;
+    if a capacity is provided, a carbon.dedup.BloomFilter with bounded memory is
+    used instead.
+
+    Duplicates that arrive one after the other (e.g. the rows created for a person
+    with several ORCIDs) are resolved with the duplicate rule:
+
+        - 'first': Keep the first record.
+        - 'last': Keep the last record.
+        - 'most_complete': Keep the record with the most non-null values; ties
+          keep the earlier record.
+
+    A duplicate of a record that was already emitted is always dropped, whatever
+    the rule, so 'last' and 'most_complete' require records ordered by the key
+    (e.g. with a sort strategy or keyset pagination). Then all duplicates arrive
+    one after the other and the rule applies to every duplicate.
+
+    Attributes:
+        key_columns: The names of the columns that identify a record.
+        rule: The rule deciding which of the consecutive duplicates is kept.
+        dropped_record_count: The number of duplicate records that were dropped.
+    """
+
+    def __init__(
+        self,
+        key_columns: Iterable[str],
+        rule: str = "first",
+        capacity: int | None = None,
+        error_rate: float = 1e-6,
+    ):
+        if rule not in DUPLICATE_RULES:
+            msg = f"'{rule}' is not a valid duplicate rule: {DUPLICATE_RULES}"
+            raise ValueError(msg)
+        self.key_columns = tuple(key_columns)
+        self.rule = rule
+        self.dropped_record_count = 0
+        self._seen_digests: set[int] = set()
+        self._bloom_filter = (
+            BloomFilter(capacity, error_rate=error_rate) if capacity else None
+        )
+
+    def _get_digest(self, record: dict[str, Any]) -> bytes:
+        key = tuple(record[column] for column in self.key_columns)
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+    def _is_seen(self, digest: bytes) -> bool:
+        if self._bloom_filter is not None:
+            if digest in self._bloom_filter:
+                return True
+            self._bloom_filter.add(digest)
+            return False
+        short_digest = int.from_bytes(digest[:8])
+        if short_digest in self._seen_digests:
+            return True
+        self._seen_digests.add(short_digest)
+        return False
+
+    def _choose(
+        self, kept_record: dict[str, Any], duplicate_record: dict[str, Any]
+    ) -> dict[str, Any]:
+        if self.rule == "last":
+            return duplicate_record
+        if self.rule == "most_complete":
+            kept_value_count = sum(value is not None for value in kept_record.values())
+            duplicate_value_count = sum(
+                value is not None for value in duplicate_record.values()
+            )
+            if duplicate_value_count > kept_value_count:
+                return duplicate_record
+        return kept_record
+
+    def deduplicate(
+        self, records: Iterable[dict[str, Any]]
+    ) -> Generator[dict[str, Any], Any, None]:
+        """Yield records, dropping duplicates.
+
+        Args:
+            records (Iterable[dict[str, Any]]): Records from the Data Warehouse.
+
+        Yields:
+            Generator[dict[str, Any], Any, None]: Records with unique keys.
+        """
+        pending_record: dict[str, Any] | None = None
+        pending_digest = None
+        for record in records:
+            digest = self._get_digest(record)
+            if pending_record is not None and digest == pending_digest:
+                self.dropped_record_count += 1
+                pending_record = self._choose(pending_record, record)
+                continue
+            if pending_record is not None:
+                yield pending_record
+                pending_record = None
+                pending_digest = None
+            if self._is_seen(digest):
+                self.dropped_record_count += 1
+                continue
+            pending_record = record
+            pending_digest = digest
+        if pending_record is not None:
+            yield pending_record
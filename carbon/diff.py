@@ -0,0 +1,157 @@
+import mmap
+import os
+from collections.abc import Callable, Generator
+from typing import IO, Any
+
+from lxml import etree as ET
+
+from carbon.feed import ArticlesXmlFeed, PeopleXmlFeed
+
+
+class FeedDiffError(Exception):
+    """Raised when feed files cannot be compared."""
+
+
+def _get_article_key(element: ET._Element) -> tuple[str, ...]:
+    return (
+        element.findtext("ARTICLE_ID", default=""),
+        element.findtext("MIT_ID", default=""),
+    )
+
+
+def _get_person_key(element: ET._Element) -> tuple[str, ...]:
+    for field in element:
+        if field.get("name") == "[Proprietary_ID]":
+            return (field.text or "",)
+    return ("",)
+
+
+# map the root element of each feed to the tag of its records and a function
+# returning the record key, which matches carbon.sort.get_sort_key
+RECORD_TYPES: dict[str, tuple[str, Callable[[ET._Element], tuple[str, ...]]]] = {
+    ArticlesXmlFeed.root_element_name: ("ARTICLE", _get_article_key),
+    PeopleXmlFeed.root_element_name: (
+        str(ET.QName(PeopleXmlFeed.symplectic_elements_namespace, "record")),
+        _get_person_key,
+    ),
+}
+
+
+class FeedDiff:
+    """Compare two feed files that are sorted by record key.
+
+    Both files are memory-mapped and parsed incrementally; each record is discarded
+    once it has been compared, so memory use does not depend on the size of the
+    files. The files are walked side by side, like a merge join, which requires
+    both files to be sorted by record key (see the '--sort_strategy' option of the
+    Carbon CLI).
+
+    Records are written to a delta XML document as they are found:
+
+        - 'added': A record with a key that is only in the new file.
+        - 'removed': A record with a key that is only in the old file.
+        - 'changed': The new version of a record with a key in both files whose
+          content is different.
+
+    The document ends with a 'summary' element with the number of records
+    in each category.
+
+    Attributes:
+        old_path: The path to the previous feed file.
+        new_path: The path to the current feed file.
+        output_file: A file-like object (stream) into which the delta XML document
+            is written.
+        counts: The number of 'added', 'removed', 'changed', and 'unchanged' records.
+    """
+
+    def __init__(self, old_path: str, new_path: str, output_file: IO):
+        self.old_path = old_path
+        self.new_path = new_path
+        self.output_file = output_file
+        self.counts = {"added": 0, "removed": 0, "changed": 0, "unchanged": 0}
+
+    def _iter_records(
+        self, path: str
+    ) -> Generator[tuple[tuple[str, ...], ET._Element], Any, None]:
+        if os.path.getsize(path) == 0:
+            msg = f"'{path}' is not a Carbon feed: the file is empty"
+            raise FeedDiffError(msg)
+        try:
+            yield from self._parse_records(path)
+        except ET.XMLSyntaxError as error:
+            msg = f"'{path}' is not a valid XML file: {error}"
+            raise FeedDiffError(msg) from error
+
+    def _parse_records(
+        self, path: str
+    ) -> Generator[tuple[tuple[str, ...], ET._Element], Any, None]:
+        with open(path, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped_file:
+            events = ET.iterparse(mapped_file, events=("start", "end"))
+            _, root = next(events)
+            if root.tag not in RECORD_TYPES:
+                msg = f"'{path}' is not a Carbon feed: unexpected root '{root.tag}'"
+                raise FeedDiffError(msg)
+            record_tag, get_key = RECORD_TYPES[root.tag]
+
+            previous_key: tuple[str, ...] = ()
+            for event, element in events:
+                if event != "end" or element.tag != record_tag:
+                    continue
+                key = get_key(element)
+                if key < previous_key:
+                    msg = f"'{path}' is not sorted by record key at {key}"
+                    raise FeedDiffError(msg)
+                previous_key = key
+                yield key, element
+                element.clear()
+                while element.getprevious() is not None:
+                    del root[0]
+
+    def run(self) -> dict[str, int]:
+        """Write the delta XML document and return the number of records per category.
+
+        Returns:
+            dict[str, int]: The number of 'added', 'removed', 'changed', and
+                'unchanged' records.
+        """
+        old_records = self._iter_records(self.old_path)
+        new_records = self._iter_records(self.new_path)
+        with ET.xmlfile(self.output_file, encoding="UTF-8") as xml_file:
+            xml_file.write_declaration()
+            with xml_file.element("delta"):
+                old_record = next(old_records, None)
+                new_record = next(new_records, None)
+                while old_record or new_record:
+                    if new_record is None or (
+                        old_record is not None and old_record[0] < new_record[0]
+                    ):
+                        self._write_record(xml_file, "removed", old_record[1])  # type: ignore[index]
+                        old_record = next(old_records, None)
+                    elif old_record is None or new_record[0] < old_record[0]:
+                        self._write_record(xml_file, "added", new_record[1])
+                        new_record = next(new_records, None)
+                    else:
+                        if ET.tostring(old_record[1], method="c14n") == ET.tostring(
+                            new_record[1], method="c14n"
+                        ):
+                            self.counts["unchanged"] += 1
+                        else:
+                            self._write_record(xml_file, "changed", new_record[1])
+                        old_record = next(old_records, None)
+                        new_record = next(new_records, None)
+                xml_file.write(
+                    ET.Element(
+                        "summary",
+                        {category: str(count) for category, count in self.counts.items()},
+                    )
+                )
+        return self.counts
+
+    def _write_record(
+        self, xml_file: Any, category: str, element: ET._Element  # noqa: ANN401
+    ) -> None:
+        self.counts[category] += 1
+        with xml_file.element(category):
+            xml_file.write(element, with_tail=False)
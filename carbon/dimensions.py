@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import closing
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import func, select
+
+from carbon.database import dlcs, orcids
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable
+
+    from sqlalchemy.engine import Connection
+
+    from carbon.database import DatabaseEngine
+
+logger = logging.getLogger(__name__)
+
+JOIN_MODES: tuple[str, ...] = ("server", "client")
+
+ORG_UNIT_COLUMNS: tuple[str, ...] = (
+    "DLC_NAME",
+    "ORG_HIER_SCHOOL_AREA_NAME",
+    "HR_ORG_LEVEL5_NAME",
+)
+
+
+class PeopleDimensions:
+    """In-memory hash maps of the dimension tables joined to 'people' records.
+
+    Attributes:
+        org_units: The 'HR_ORG_UNIT' rows in the areas included in the feed, keyed by
+            'HR_ORG_UNIT_ID'. Each row is a list of the values of ORG_UNIT_COLUMNS.
+        orcids: The ORCIDs of each person, keyed by 'MIT_ID'.
+    """
+
+    def __init__(
+        self,
+        org_units: dict[str, list[list[str | None]]],
+        orcids: dict[str, list[str | None]],
+    ):
+        self.org_units = org_units
+        self.orcids = orcids
+
+    def join(
+        self, person_records: Iterable[dict[str, Any]], columns: Iterable[str]
+    ) -> Generator[dict[str, Any], Any, None]:
+        """Join person records to the dimension tables.
+
+        The join has the same semantics as the server-side join of the 'people'
+        feed query: an outer join to 'ORCID_TO_MITID' (one record per ORCID, or one
+        record without an ORCID) and an inner join to 'HR_ORG_UNIT' (persons
+        without an org unit in the included areas are dropped).
+
+        Args:
+            person_records (Iterable[dict[str, Any]]): Records from the person query,
+                including 'HR_ORG_UNIT_ID'.
+            columns (Iterable[str]): The names of the columns of the joined records,
+                in the order of the server-side query.
+
+        Yields:
+            Generator[dict[str, Any], Any, None]: Joined 'people' records.
+        """
+        columns = tuple(columns)
+        for person_record in person_records:
+            org_units = self.org_units.get(person_record["HR_ORG_UNIT_ID"])
+            if not org_units:
+                continue
+            for orcid in self.orcids.get(person_record["MIT_ID"]) or [None]:
+                for org_unit in org_units:
+                    joined_record = {
+                        **person_record,
+                        **dict(zip(ORG_UNIT_COLUMNS, org_unit, strict=True)),
+                        "ORCID": orcid,
+                    }
+                    yield {column: joined_record[column] for column in columns}
+
+
+class DimensionCache:
+    """A loader of carbon.dimensions.PeopleDimensions with an optional on-disk cache.
+
+    The dimension tables are small, so they are read once per run. If a path is
+    provided, the tables are saved to a JSON file along with a fingerprint of each
+    table (the row count and the minimum and maximum key). Later runs reuse the file
+    if the fingerprint is unchanged and the file is younger than 'max_age'. The
+    fingerprint detects added and removed rows; 'max_age' bounds how long in-place
+    updates can go unnoticed.
+
+    Attributes:
+        areas: The school areas of the org units included in the feed (uppercase).
+        path: The path to the cache file. If None, the tables are not cached on disk.
+        max_age: The maximum age of the cache file, in seconds.
+        status: How the dimensions were loaded by the last call to 'load': 'hit'
+            (from the cache file), 'miss' (from the Data Warehouse, cache file
+            updated), or 'memory' (from the Data Warehouse, no cache file).
+    """
+
+    def __init__(
+        self, areas: Iterable[str], path: str | None = None, max_age: float = 86400
+    ):
+        self.areas = tuple(areas)
+        self.path = path
+        self.max_age = max_age
+        self.status = ""
+
+    @staticmethod
+    def fingerprint(connection: Connection) -> dict[str, list[Any]]:
+        """Create a cheap fingerprint of the dimension tables."""
+        return {
+            table.name: list(
+                connection.execute(
+                    select(func.count(), func.min(key_column), func.max(key_column))
+                ).one()
+            )
+            for table, key_column in (
+                (dlcs, dlcs.c.HR_ORG_UNIT_ID),
+                (orcids, orcids.c.MIT_ID),
+            )
+        }
+
+    def load(self, engine: DatabaseEngine) -> PeopleDimensions:
+        """Load the dimension tables, from the cache file if it is current.
+
+        Args:
+            engine (DatabaseEngine): A configured carbon.database.DatabaseEngine that
+                can connect to the Data Warehouse.
+
+        Returns:
+            PeopleDimensions: The dimension tables as hash maps.
+        """
+        start_time = time.perf_counter()
+        with closing(engine().connect()) as connection:
+            fingerprint = self.fingerprint(connection) if self.path else None
+            cached_tables = self._read_cache(fingerprint)
+            if cached_tables is not None:
+                self.status = "hit"
+                org_units, orcids_by_mit_id = cached_tables
+            else:
+                self.status = "miss" if self.path else "memory"
+                org_units, orcids_by_mit_id = self._query_tables(connection)
+                if self.path:
+                    self._write_cache(fingerprint, org_units, orcids_by_mit_id)
+        logger.info(
+            "Loaded %s org units and ORCIDs for %s persons (cache %s) in %.3f seconds",
+            len(org_units),
+            len(orcids_by_mit_id),
+            self.status,
+            time.perf_counter() - start_time,
+        )
+        return PeopleDimensions(org_units, orcids_by_mit_id)
+
+    def _query_tables(
+        self, connection: Connection
+    ) -> tuple[dict[str, list[list[str | None]]], dict[str, list[str | None]]]:
+        org_units: dict[str, list[list[str | None]]] = defaultdict(list)
+        for row in connection.execute(
+            select(dlcs.c.HR_ORG_UNIT_ID, *(dlcs.c[name] for name in ORG_UNIT_COLUMNS))
+            .where(dlcs.c.HR_ORG_UNIT_ID.is_not(None))
+            .where(func.upper(dlcs.c.ORG_HIER_SCHOOL_AREA_NAME).in_(self.areas))
+        ):
+            org_units[row[0]].append(list(row[1:]))
+        orcids_by_mit_id: dict[str, list[str | None]] = defaultdict(list)
+        for mit_id, orcid in connection.execute(
+            select(orcids.c.MIT_ID, orcids.c.ORCID).where(orcids.c.MIT_ID.is_not(None))
+        ):
+            orcids_by_mit_id[mit_id].append(orcid)
+        return dict(org_units), dict(orcids_by_mit_id)
+
+    def _read_cache(
+        self, fingerprint: dict[str, list[Any]] | None
+    ) -> tuple[dict[str, list[list[str | None]]], dict[str, list[str | None]]] | None:
+        if not self.path or not os.path.exists(self.path):
+            return None
+        if time.time() - os.path.getmtime(self.path) > self.max_age:
+            return None
+        try:
+            with open(self.path) as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError) as error:
+            logger.warning(
+                "Ignoring unreadable dimension cache '%s': %s", self.path, error
+            )
+            return None
+        if cache.get("fingerprint") != fingerprint or cache.get("areas") != list(
+            self.areas
+        ):
+            return None
+        return cache["org_units"], cache["orcids"]
+
+    def _write_cache(
+        self,
+        fingerprint: dict[str, list[Any]] | None,
+        org_units: dict[str, list[list[str | None]]],
+        orcids_by_mit_id: dict[str, list[str | None]],
+    ) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))  # type: ignore[type-var]
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w") as temporary_file:
+                json.dump(
+                    {
+                        "fingerprint": fingerprint,
+                        "areas": list(self.areas),
+                        "org_units": org_units,
+                        "orcids": orcids_by_mit_id,
+                    },
+                    temporary_file,
+                )
+            os.replace(temporary_path, self.path)  # type: ignore[arg-type]
+        except Exception:
+            os.remove(temporary_path)
+            raise
@@ -1,19 +1,50 @@
+import hashlib
+import logging
+import math
+import time
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Hashable
 from contextlib import closing
 from datetime import datetime
+from itertools import islice
 from typing import IO, Any, ClassVar
 
 from lxml import etree as ET
-from sqlalchemy import func, select
+from sqlalchemy import and_, bindparam, func, or_, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DatabaseError, OperationalError
+from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.sql.selectable import Select
 
-from carbon.database import DatabaseEngine, aa_articles, dlcs, orcids, persons
+from carbon import columnar
+from carbon.database import (
+    SAMPLE_BUCKET_COUNT,
+    DatabaseEngine,
+    SampleBucket,
+    aa_articles,
+    dlcs,
+    orcids,
+    persons,
+)
+from carbon.dedup import RecordDeduplicator
+from carbon.dimensions import JOIN_MODES, DimensionCache
 from carbon.helpers import (
     get_group_name,
     get_hire_date_string,
     get_initials,
 )
+from carbon.metrics import metrics
+from carbon.progress import ProgressReporter
+from carbon.quarantine import RecordQuarantine
+from carbon.sort import ExternalSorter
+from carbon.statements import statement_cache
+from carbon.tracing import TraceSpan, tracer
+from carbon.validation import ARTICLE_SCHEMA, PEOPLE_RECORD_SCHEMA, RecordValidator
+
+logger = logging.getLogger(__name__)
+
+# the number of records in each 'feed.batch' span when tracing is enabled
+TRACE_BATCH_SIZE = 1000
 
 
 class BaseXmlFeed(ABC):
@@ -24,46 +55,512 @@ class BaseXmlFeed(ABC):
 
         root_element_name: The 'tag' assigned to the root Element.
         query: The select statmenet submitted to the Data Warehouse to retrieve records.
+        record_schema: The XML schema (XSD) that each record element must match.
+        record_key: The names of the columns that identify a record.
+        sample_column: The name of the column whose value decides whether a record
+            is part of a sample. MIT_ID for both feeds, so a sample of 'articles'
+            has the articles of the people in the same sample of 'people'.
+        order_by_is_cheap: Whether the Data Warehouse can sort the query results by
+            the record key at little cost. Used when the sort strategy is 'auto'.
 
     Attributes:
         engine: A configured carbon.database.DatabaseEngine that can connect to the
             Data Warehouse.
         output_file: A file-like object (stream) into which normalized XML strings
             strings are written.
-
+        validator: A carbon.validation.RecordValidator that checks each record element
+            against the record schema as the feed is generated. Set if a validation
+            sample rate is provided.
+        deduplicator: A carbon.dedup.RecordDeduplicator that drops records with
+            a duplicate record key before they are transformed. Set if a duplicate
+            rule is provided.
+        sort_strategy: How records are sorted by the record key, making the feed
+            output deterministic. The following values are accepted:
+                - 'query': Add an ORDER BY clause to the query.
+                - 'external': Sort records with a carbon.sort.ExternalSorter.
+                - 'auto': Use 'query' if 'order_by_is_cheap', otherwise 'external'.
+            If None, records are written in the order returned by the Data Warehouse.
+        sorter: A carbon.sort.ExternalSorter used if the sort strategy is 'external'.
+        page_size: The number of rows fetched per query when extracting records
+            with keyset pagination. If None, all records are fetched with a single
+            query.
+        max_retries: The number of consecutive failed page queries that are retried
+            before the run fails. Used with keyset pagination.
+        retry_backoff: The number of seconds to wait before the first retry; the wait
+            doubles with each consecutive retry.
+        extraction_page_count: The number of page queries that succeeded.
+        extraction_retry_count: The number of page queries that were retried.
+        extraction_backoff_seconds: The time spent waiting before retries.
+        progress_reporter: A carbon.progress.ProgressReporter that periodically logs
+            the progress of the feed. Set if a progress interval is provided.
+        columnar_batch_size: The number of records transformed together as an Apache
+            Arrow table in columnar mode (see carbon.feed.BaseXmlFeed.format_batches).
+            If None, records are transformed one at a time.
+        limit: The maximum number of rows fetched, for quick smoke runs. The limit is
+            added to the feed query (e.g. 'FETCH FIRST n ROWS ONLY' on Oracle); use
+            the 'query' sort strategy to fetch the same rows in every run. If None,
+            all rows are fetched.
+        sample_percent: The percentage of records included in a deterministic sample,
+            by the hash of the sample column (see carbon.database.SampleBucket). The
+            same records are sampled in every run. The percentage is rounded up to
+            the next multiple of 0.01%, the share of one bucket. If None, records are
+            not sampled.
+        quarantine: A carbon.quarantine.RecordQuarantine to which records that
+            cannot be transformed or validated are written, so the run continues
+            until the error budget is exceeded. Set if a quarantine path is provided;
+            otherwise, such a record fails the run.
     """
 
     root_element_name: str = ""
     query: Select = select()
+    record_schema: str = ""
+    record_key: tuple[str, ...] = ()
+    sample_column: str = "MIT_ID"
+    order_by_is_cheap: bool = False
     processed_record_count: int = 0
 
-    def __init__(self, engine: DatabaseEngine, output_file: IO):
+    def __init__(
+        self,
+        engine: DatabaseEngine,
+        output_file: IO,
+        *,
+        validation_sample_rate: float | None = None,
+        duplicate_rule: str | None = None,
+        duplicate_filter_capacity: int | None = None,
+        sort_strategy: str | None = None,
+        sort_memory_budget: int = 64 * 1024**2,
+        page_size: int | None = None,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        progress_interval: float | None = None,
+        progress_total: str | None = None,
+        columnar_batch_size: int | None = None,
+        quarantine_path: str | None = None,
+        error_budget: int = 100,
+        limit: int | None = None,
+        sample_percent: float | None = None,
+    ):
         self.engine = engine
         self.output_file = output_file
+        self.validator = (
+            RecordValidator(self.record_schema, sample_rate=validation_sample_rate)
+            if validation_sample_rate
+            else None
+        )
+        self.deduplicator = (
+            RecordDeduplicator(
+                self.record_key,
+                rule=duplicate_rule,
+                capacity=duplicate_filter_capacity,
+            )
+            if duplicate_rule
+            else None
+        )
+        if sort_strategy == "auto":
+            sort_strategy = "query" if self.order_by_is_cheap else "external"
+        self.sort_strategy = sort_strategy
+        self.sorter = (
+            ExternalSorter(self.record_key, memory_budget=sort_memory_budget)
+            if sort_strategy == "external"
+            else None
+        )
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.extraction_page_count = 0
+        self.extraction_retry_count = 0
+        self.extraction_backoff_seconds = 0.0
+        self.progress_reporter = (
+            ProgressReporter(progress_interval, total_source=progress_total)
+            if progress_interval
+            else None
+        )
+        if columnar_batch_size:
+            columnar.check_columnar_available()
+        self.columnar_batch_size = columnar_batch_size
+        self.quarantine = (
+            RecordQuarantine(quarantine_path, error_budget=error_budget)
+            if quarantine_path
+            else None
+        )
+        if sample_percent is not None and not 0 < sample_percent <= 100:  # noqa: PLR2004
+            msg = f"Sample percentage must be in (0, 100], got {sample_percent}"
+            raise ValueError(msg)
+        self.limit = limit
+        self.sample_percent = sample_percent
+
+    def build_query(self) -> Select:
+        """Create the select statement submitted to the Data Warehouse.
+
+        Returns:
+            Select: The feed query, ordered by the record key if the sort strategy
+                is 'query'.
+        """
+        query = self.query
+        if self.sort_strategy == "query":
+            query = query.order_by(
+                *(query.selected_columns[column] for column in self.record_key)
+            )
+        return self._restrict_query(query)
+
+    def _restrict_query(self, query: Select) -> Select:
+        """Add the sample filter and the row limit to a feed query."""
+        if self.sample_percent is not None:
+            # round up, so a percentage below the resolution of the buckets still
+            # samples one bucket; the value is first rounded to drop float error
+            # (e.g. 0.07% is 7.000000000000001 buckets)
+            bucket_count = math.ceil(
+                round(self.sample_percent * SAMPLE_BUCKET_COUNT / 100, 6)
+            )
+            query = query.where(
+                SampleBucket(query.selected_columns[self.sample_column]) < bucket_count
+            )
+        if self.limit:
+            query = query.limit(self.limit)
+        return query
+
+    @property
+    def query_fingerprint(self) -> str:
+        """A short hash of the feed query and its parameters.
+
+        The fingerprint changes whenever the statement submitted to the Data Warehouse
+        changes (e.g. a new filter or sort strategy), so runs can be compared against
+        runs of the same query.
+        """
+        compiled_query = self.build_query().compile()
+        statement = f"{compiled_query}\n{sorted(compiled_query.params.items())!r}"
+        return hashlib.sha256(statement.encode()).hexdigest()[:16]
 
     @property
     def records(self) -> Generator[dict[str, Any], Any, None]:
         """Create a generator of 'people' or 'article' records from the Data Warehouse.
 
+        If a page size is set, records are extracted with keyset pagination
+        (see carbon.feed.BaseXmlFeed.paginated_records), and extraction stops once
+        'limit' rows are emitted.
+
         Yields:
             Generator[dict[str, Any], Any, None]: Records that
                 match the query submitted to the Data Warehouse.
         """
-        with closing(self.engine().connect()) as connection:
-            result = connection.execute(self.query)
+        if self.page_size:
+            yield from islice(self.paginated_records(), self.limit)
+            return
+        with tracer.span("db.connect"):
+            connection = self.engine().connect()
+        with closing(connection):
+            with metrics.timer("db_execute_seconds"), tracer.span("db.execute"):
+                result = statement_cache.execute(
+                    connection, self._get_statement_key("records"), self.build_query
+                )
+            with tracer.span("db.first_row"):
+                first_row = result.fetchone()
+            if first_row is None:
+                return
+            keys = result.keys()
+            yield dict(zip(keys, first_row, strict=True))
             for row in result:
-                yield dict(zip(result.keys(), row, strict=True))
+                yield dict(zip(keys, row, strict=True))
+
+    def paginated_records(self) -> Generator[dict[str, Any], Any, None]:
+        """Create a generator of records fetched in pages ordered by the record key.
+
+        Each page is a separate query that starts after the key of the last record
+        emitted, so no cursor is held open for the whole run. All rows for a given
+        key are emitted together: the rows that share the key of the last row of
+        a full page are held back and fetched with the next page. If a single key
+        fills a page, all rows for that key are fetched without a limit.
+
+        If a page query fails with a transient database error (an OperationalError,
+        e.g. a lost connection or Oracle's 'snapshot too old', or an error that
+        invalidated the connection), a new connection is opened and extraction
+        resumes from the last emitted key, after a backoff that doubles with each
+        consecutive failure. Any other database error (e.g. an IntegrityError or a
+        DataError) is raised at once.
+
+        Yields:
+            Generator[dict[str, Any], Any, None]: Records ordered by the record key.
+
+        Raises:
+            DatabaseError: If a page query fails with an error that is not transient,
+                or more than 'max_retries' times in a row.
+        """
+        last_key: tuple[Any, ...] | None = None
+        consecutive_failures = 0
+        while True:
+            try:
+                with tracer.span("db.connect"):
+                    connection = self.engine().connect()
+                with closing(connection):
+                    while True:
+                        rows = self._fetch_page(connection, last_key)
+                        self.extraction_page_count += 1
+                        consecutive_failures = 0
+                        if len(rows) < self.page_size:  # type: ignore[operator]
+                            yield from rows
+                            return
+                        boundary_key = self._get_key(rows[-1])
+                        complete_rows = [
+                            row for row in rows if self._get_key(row) != boundary_key
+                        ]
+                        if not complete_rows:
+                            complete_rows = self._fetch_key_group(
+                                connection, boundary_key
+                            )
+                        yield from complete_rows
+                        last_key = self._get_key(complete_rows[-1])
+            except DatabaseError as error:
+                # errors in the data or the statement fail the same way on retry
+                if not (
+                    isinstance(error, OperationalError) or error.connection_invalidated
+                ):
+                    raise
+                consecutive_failures += 1
+                if consecutive_failures > self.max_retries:
+                    raise
+                backoff = self.retry_backoff * 2 ** (consecutive_failures - 1)
+                logger.warning(
+                    "Page query failed (%s), resuming after key %s in %s seconds "
+                    "(retry %d of %d)",
+                    error.orig,
+                    last_key,
+                    backoff,
+                    consecutive_failures,
+                    self.max_retries,
+                )
+                self.extraction_retry_count += 1
+                self.extraction_backoff_seconds += backoff
+                time.sleep(backoff)
+
+    def _get_key(self, record: dict[str, Any]) -> tuple[Any, ...]:
+        return tuple(record[column] for column in self.record_key)
+
+    def _get_statement_key(self, *names: Hashable) -> tuple[Hashable, ...]:
+        """Identify a statement of the feed in carbon.statements.statement_cache.
+
+        The key must include every option that changes the statement built by
+        'build_query'; subclasses with such options extend it.
+        """
+        return (
+            type(self).__name__,
+            *names,
+            self.sort_strategy == "query",
+            self.limit,
+            self.sample_percent,
+        )
+
+    def _build_key_ordered_query(self) -> tuple[Select, list[Any]]:
+        # page queries have their own limit; the row limit is applied to the pages
+        query = self.build_query().order_by(None).limit(None)
+        key_columns = [query.selected_columns[column] for column in self.record_key]
+        return query.order_by(*key_columns), key_columns
+
+    def _fetch_page(
+        self, connection: Connection, after_key: tuple[Any, ...] | None
+    ) -> list[dict[str, Any]]:
+        def build_statement() -> Select:
+            query, key_columns = self._build_key_ordered_query()
+            if after_key is not None:
+                query = query.where(self._after_key_clause(key_columns))
+            return query.limit(self.page_size)
+
+        with (
+            metrics.timer("db_page_fetch_seconds"),
+            tracer.span("db.page_fetch", after_key=str(after_key)),
+        ):
+            result = statement_cache.execute(
+                connection,
+                self._get_statement_key("page", after_key is None, self.page_size),
+                build_statement,
+                self._get_key_parameters("after_key", after_key or ()),
+            )
+            return [dict(zip(result.keys(), row, strict=True)) for row in result]
+
+    def _fetch_key_group(
+        self, connection: Connection, key: tuple[Any, ...]
+    ) -> list[dict[str, Any]]:
+        def build_statement() -> Select:
+            query, key_columns = self._build_key_ordered_query()
+            return query.where(
+                *(
+                    column == bindparam(f"key_{index}", None, type_=column.type)
+                    for index, column in enumerate(key_columns)
+                )
+            )
+
+        with (
+            metrics.timer("db_page_fetch_seconds"),
+            tracer.span("db.page_fetch", key=str(key)),
+        ):
+            result = statement_cache.execute(
+                connection,
+                self._get_statement_key("key_group"),
+                build_statement,
+                self._get_key_parameters("key", key),
+            )
+            return [dict(zip(result.keys(), row, strict=True)) for row in result]
+
+    @staticmethod
+    def _get_key_parameters(prefix: str, key: tuple[Any, ...]) -> dict[str, Any]:
+        return {f"{prefix}_{index}": value for index, value in enumerate(key)}
+
+    @staticmethod
+    def _after_key_clause(key_columns: list[Any]) -> ColumnElement[bool]:
+        # expand (a, b) > (x, y) to a > x OR (a = x AND b > y), as row value
+        # comparisons are not supported by every dialect; the key values are bound
+        # as 'after_key_<index>' so the statement can be cached
+        after_key = [
+            bindparam(f"after_key_{index}", None, type_=column.type)
+            for index, column in enumerate(key_columns)
+        ]
+        clauses = []
+        for index, column in enumerate(key_columns):
+            clauses.append(
+                and_(
+                    *(
+                        key_columns[previous] == after_key[previous]
+                        for previous in range(index)
+                    ),
+                    column > after_key[index],
+                )
+            )
+        return or_(*clauses)
+
+    @property
+    def _fetches_record_batches(self) -> bool:
+        # whether columnar mode can fetch record batches directly, which requires
+        # the records to be the results of a single query, unchanged
+        return not (self.page_size or self.sorter or self.deduplicator)
+
+    def format_batches(
+        self, records: Generator[dict[str, Any], Any, None]
+    ) -> Generator[dict[str, Any], Any, None]:
+        """Transform records in columnar batches.
+
+        Records are grouped into Apache Arrow tables of 'columnar_batch_size' rows.
+        Each table is transformed with vectorized column operations (see
+        carbon.columnar) into the values of the record elements, which are the
+        same values carbon.feed.BaseXmlFeed._format_record creates for each record.
+
+        If the records are the unchanged results of the feed query (no pagination,
+        sorting, de-duplication, or client join), batches are fetched directly from
+        the Data Warehouse (see carbon.columnar.fetch_record_batches) instead.
+
+        If a batch cannot be transformed and a quarantine is set, its records are
+        transformed one at a time, and the records that still fail are written to
+        the quarantine file and left out of the feed.
+
+        Args:
+            records (Generator[dict[str, Any], Any, None]): The records of the feed.
+
+        Yields:
+            Generator[dict[str, Any], Any, None]: The values of each record element.
+        """
+        schema = columnar.get_arrow_schema(self.query.selected_columns)
+        if self._fetches_record_batches:
+            batches = self._fetch_record_batches(schema)
+        else:
+            batches = columnar.batch_records(
+                records, schema, self.columnar_batch_size  # type: ignore[arg-type]
+            )
+        for batch in batches:
+            try:
+                values = self._format_batch(batch).to_pylist()
+            except Exception:
+                if not self.quarantine:
+                    raise
+                yield from self._format_batch_rows(batch)
+            else:
+                yield from values
+
+    def _format_batch_rows(
+        self, batch: "columnar.pa.Table"
+    ) -> Generator[dict[str, Any], Any, None]:
+        # rows are yielded as they are transformed, so the record number of a
+        # quarantined row counts the rows before it that were already written
+        for index in range(batch.num_rows):
+            row = batch.slice(index, 1)
+            try:
+                values = self._format_batch(row).to_pylist()[0]
+            except Exception as error:  # noqa: BLE001
+                record = row.to_pylist()[0]
+                self.quarantine.add(  # type: ignore[union-attr]
+                    record,
+                    error,
+                    record_number=self._next_record_number,
+                    key=self._get_key(record),
+                )
+            else:
+                yield values
+
+    def _fetch_record_batches(
+        self, schema: "columnar.pa.Schema"
+    ) -> Generator["columnar.pa.Table", Any, None]:
+        with tracer.span("db.connect"):
+            connection = self.engine().connect()
+        with closing(connection):
+            statement, parameters = statement_cache.get(
+                connection.dialect, self._get_statement_key("records"), self.build_query
+            )
+            yield from columnar.fetch_record_batches(
+                connection,
+                statement,
+                parameters,
+                schema,
+                self.columnar_batch_size,  # type: ignore[arg-type]
+            )
 
-    @abstractmethod
     def _add_element(self, record: dict[str, Any]) -> None | ET._Element:
         """Create an XML element for a provided record.
 
+        Args:
+            record (dict[str, Any]): A record matching the query submitted to
+                the Data Warehouse.
+
+        Returns:
+            None | ET._Element: A record XML element.
+        """
+        return self._build_element(self._format_record(record))
+
+    @abstractmethod
+    def _format_record(self, record: dict[str, Any]) -> dict[str, Any]:
+        """Create the values of the XML element for a provided record.
+
         Must be overridden by subclasses.
 
         Args:
             record (dict[str, Any]): A record matching the query submitted to
                 the Data Warehouse.
 
+        Returns:
+            dict[str, Any]: The values of the record element, keyed by field name.
+        """
+
+    @abstractmethod
+    def _format_batch(self, batch: "columnar.pa.Table") -> "columnar.pa.Table":
+        """Create the values of the XML elements for a batch of records.
+
+        Must be overridden by subclasses. The vectorized equivalent of
+        carbon.feed.BaseXmlFeed._format_record.
+
+        Args:
+            batch (pa.Table): Records matching the query submitted to the
+                Data Warehouse.
+
+        Returns:
+            pa.Table: The values of the record elements, with a column per field.
+        """
+
+    @abstractmethod
+    def _build_element(self, values: dict[str, Any]) -> None | ET._Element:
+        """Create an XML element from the values of a record element.
+
+        Must be overridden by subclasses.
+
+        Args:
+            values (dict[str, Any]): The values created by
+                carbon.feed.BaseXmlFeed._format_record.
+
         Returns:
             None | ET._Element: A record XML element.
         """
@@ -93,20 +590,160 @@ class BaseXmlFeed(ABC):
         return subelement
 
     def run(self, **kwargs: dict[str, Any]) -> None:
-        """Generate a feed that streams normalized XML strings to an XML file."""
+        """Generate a feed that streams normalized XML strings to an XML file.
+
+        The time spent in each stage is added to carbon.metrics.metrics: 'extract'
+        (fetching, sorting, and de-duplicating records), 'transform' (creating and
+        validating record elements), and 'write' (serializing elements to the
+        output file). In columnar mode, the vectorized transforms are part of
+        'extract', and 'transform' only creates elements from the transformed values.
+
+        If tracing is enabled (see carbon.tracing.Tracer), each batch of
+        TRACE_BATCH_SIZE records read is traced as a 'feed.batch' span, ending with an
+        'xml.flush' span that writes the buffered XML to the output file, so time
+        spent waiting on a slow consumer (e.g. the FTP upload) is visible.
+
+        If a record cannot be transformed or validated and a quarantine is set, the
+        record is written to the quarantine file and left out of the feed.
+        """
+        extract_seconds = transform_seconds = write_seconds = 0.0
         with ET.xmlfile(self.output_file, encoding="UTF-8") as xml_file:
             xml_file.write_declaration()
             with xml_file.element(tag=self.root_element_name, **kwargs):
-                for record in self.records:
-                    element = self._add_element(record)
-                    xml_file.write(element)
-                    self.processed_record_count += 1
+                records = self.records
+                if self.sorter:
+                    records = self.sorter.sort(records)
+                if self.deduplicator:
+                    records = self.deduplicator.deduplicate(records)
+                if self.progress_reporter:
+                    self.progress_reporter.start(
+                        self.engine,
+                        self.build_query(),
+                        lambda: self.processed_record_count,
+                    )
+                add_element: Callable[[dict[str, Any]], None | ET._Element] = (
+                    self._add_element
+                )
+                if self.columnar_batch_size:
+                    records = self.format_batches(records)
+                    add_element = self._build_element
+                if self.quarantine:
+                    self.quarantine.open()
+                batch_span = tracer.start_span("feed.batch")
+                read_record_count = 0
+                stage_start_time = time.perf_counter()
+                try:
+                    for record in records:
+                        read_record_count += 1
+                        extracted_time = time.perf_counter()
+                        element = self._transform_record(add_element, record)
+                        transformed_time = time.perf_counter()
+                        if element is not None:
+                            xml_file.write(element)
+                            self.processed_record_count += 1
+                        written_time = time.perf_counter()
+                        extract_seconds += extracted_time - stage_start_time
+                        transform_seconds += transformed_time - extracted_time
+                        write_seconds += written_time - transformed_time
+                        stage_start_time = written_time
+                        # batches are counted in records read, as quarantined
+                        # records are not counted as processed
+                        if batch_span and read_record_count % TRACE_BATCH_SIZE == 0:
+                            batch_span = self._trace_batch_end(batch_span, xml_file)
+                finally:
+                    if self.progress_reporter:
+                        self.progress_reporter.stop()
+                    if self.quarantine:
+                        self.quarantine.close()
+                    tracer.end_span(batch_span)
+                extract_seconds += time.perf_counter() - stage_start_time
+
+        metrics.increment("records_processed_total", self.processed_record_count)
+        if self.deduplicator:
+            metrics.increment(
+                "duplicate_records_total", self.deduplicator.dropped_record_count
+            )
+        if self.quarantine:
+            metrics.increment(
+                "quarantined_records_total", self.quarantine.quarantined_record_count
+            )
+        metrics.set_gauge("extract_seconds", extract_seconds)
+        metrics.set_gauge("transform_seconds", transform_seconds)
+        metrics.set_gauge("write_seconds", write_seconds)
+
+    def _transform_record(
+        self,
+        add_element: Callable[[dict[str, Any]], None | ET._Element],
+        record: dict[str, Any],
+    ) -> None | ET._Element:
+        """Create and validate the XML element for a record.
+
+        Returns:
+            None | ET._Element: A record XML element, or None if the record was
+                quarantined.
+        """
+        try:
+            element = add_element(record)
+            if self.validator and element is not None:
+                self.validator.validate(element)
+        except Exception as error:
+            if not self.quarantine:
+                raise
+            self.quarantine.add(
+                record,
+                error,
+                record_number=self._next_record_number,
+                key=None if self.columnar_batch_size else self._get_key(record),
+            )
+            return None
+        return element
+
+    @property
+    def _next_record_number(self) -> int:
+        # the position in the feed of the record being transformed, starting at 1
+        quarantined_record_count = (
+            self.quarantine.quarantined_record_count if self.quarantine else 0
+        )
+        return self.processed_record_count + quarantined_record_count + 1
+
+    def _trace_batch_end(
+        self, batch_span: TraceSpan, xml_file: "ET._IncrementalFileWriter"
+    ) -> TraceSpan | None:
+        with tracer.span("xml.flush"):
+            xml_file.flush()
+        batch_span.set_attribute("records_processed", self.processed_record_count)
+        tracer.end_span(batch_span)
+        return tracer.start_span("feed.batch")
+
+    @property
+    def summary(self) -> dict[str, Any]:
+        """Statistics collected while generating the feed."""
+        summary: dict[str, Any] = {"records": self.processed_record_count}
+        if self.validator:
+            summary.update(self.validator.summary)
+        if self.deduplicator:
+            summary["duplicate_records"] = self.deduplicator.dropped_record_count
+        if self.quarantine:
+            summary.update(self.quarantine.summary)
+        if self.sort_strategy:
+            summary["sort_strategy"] = self.sort_strategy
+        if self.sorter:
+            summary["sort_runs"] = self.sorter.run_count
+        if self.page_size:
+            summary["extraction_pages"] = self.extraction_page_count
+            summary["extraction_retries"] = self.extraction_retry_count
+            summary["extraction_backoff_seconds"] = round(
+                self.extraction_backoff_seconds, 3
+            )
+        return summary
 
 
 class ArticlesXmlFeed(BaseXmlFeed):
     """Articles XML feed class."""
 
     root_element_name = "ARTICLES"
+    record_schema = ARTICLE_SCHEMA
+    record_key = ("ARTICLE_ID", "MIT_ID")
     query = (
         select(aa_articles)
         .where(aa_articles.c.ARTICLE_ID.is_not(None))
@@ -115,38 +752,62 @@ class ArticlesXmlFeed(BaseXmlFeed):
         .where(aa_articles.c.MIT_ID.is_not(None))
     )
 
-    def _add_element(self, record: dict[str, Any]) -> ET._Element:
+    # the names of the subelements of an 'ARTICLE' element, in order
+    element_names: tuple[str, ...] = (
+        "AA_MATCH_SCORE",
+        "ARTICLE_ID",
+        "ARTICLE_TITLE",
+        "ARTICLE_YEAR",
+        "AUTHORS",
+        "DOI",
+        "ISSN_ELECTRONIC",
+        "ISSN_PRINT",
+        "IS_CONFERENCE_PROCEEDING",
+        "JOURNAL_FIRST_PAGE",
+        "JOURNAL_LAST_PAGE",
+        "JOURNAL_ISSUE",
+        "JOURNAL_VOLUME",
+        "JOURNAL_NAME",
+        "MIT_ID",
+        "PUBLISHER",
+    )
+
+    def _format_record(self, record: dict[str, Any]) -> dict[str, Any]:
+        """Create the values of an 'ARTICLE' element.
+
+        Args:
+            record (dict[str, Any]): A record matching the query submitted to the
+                Data Warehouse for retrieving 'articles' records.
+
+        Returns:
+            dict[str, Any]: The text of each subelement, keyed by subelement name.
+        """
+        values = {name: record[name] for name in self.element_names}
+        values["AA_MATCH_SCORE"] = str(record["AA_MATCH_SCORE"])
+        return values
+
+    def _format_batch(self, batch: "columnar.pa.Table") -> "columnar.pa.Table":
+        """Create the values of 'ARTICLE' elements for a batch of records."""
+        values = {name: batch.column(name) for name in self.element_names}
+        values["AA_MATCH_SCORE"] = columnar.format_strings(batch.column("AA_MATCH_SCORE"))
+        return columnar.create_table(values, batch.num_rows)
+
+    def _build_element(self, values: dict[str, Any]) -> ET._Element:
         """Create an XML element representing an article.
 
         The function will create a single 'ARTICLE' element that contains subelements
         representing fields in a record from the 'AA_ARTICLE table'.
 
         Args:
-            record (dict[str, Any]): A record matching the query submitted to the
-                Data Warehouse for retrieving 'articles' records.
+            values (dict[str, Any]): The text of each subelement (see
+                carbon.feed.ArticlesXmlFeed._format_record).
 
         Returns:
             ET._Element: An articles XML element.
         """
         article = ET.Element("ARTICLE")
-        self._add_subelement(article, "AA_MATCH_SCORE", str(record["AA_MATCH_SCORE"]))
-        self._add_subelement(article, "ARTICLE_ID", record["ARTICLE_ID"])
-        self._add_subelement(article, "ARTICLE_TITLE", record["ARTICLE_TITLE"])
-        self._add_subelement(article, "ARTICLE_YEAR", record["ARTICLE_YEAR"])
-        self._add_subelement(article, "AUTHORS", record["AUTHORS"])
-        self._add_subelement(article, "DOI", record["DOI"])
-        self._add_subelement(article, "ISSN_ELECTRONIC", record["ISSN_ELECTRONIC"])
-        self._add_subelement(article, "ISSN_PRINT", record["ISSN_PRINT"])
-        self._add_subelement(
-            article, "IS_CONFERENCE_PROCEEDING", record["IS_CONFERENCE_PROCEEDING"]
-        )
-        self._add_subelement(article, "JOURNAL_FIRST_PAGE", record["JOURNAL_FIRST_PAGE"])
-        self._add_subelement(article, "JOURNAL_LAST_PAGE", record["JOURNAL_LAST_PAGE"])
-        self._add_subelement(article, "JOURNAL_ISSUE", record["JOURNAL_ISSUE"])
-        self._add_subelement(article, "JOURNAL_VOLUME", record["JOURNAL_VOLUME"])
-        self._add_subelement(article, "JOURNAL_NAME", record["JOURNAL_NAME"])
-        self._add_subelement(article, "MIT_ID", record["MIT_ID"])
-        self._add_subelement(article, "PUBLISHER", record["PUBLISHER"])
+        for name, text in values.items():
+            self._add_subelement(article, name, text)
         return article
 
 
@@ -161,6 +822,20 @@ class PeopleXmlFeed(BaseXmlFeed):
             attribute of the root 'records' element.
         namespace_mapping: A configuration required to clean up the 'xmlns'
             attribute of the root 'records' element when serialized.
+        person_conditions: The conditions on the person table used in
+            carbon.feed.PeopleXmlFeed.query and
+            carbon.feed.PeopleXmlFeed.person_query.
+        person_query: The select statement submitted to the Data Warehouse if
+            the join mode is 'client'. It only queries the person table.
+
+    Attributes:
+        join_mode: Where the person table is joined to the 'HR_ORG_UNIT' and
+            'ORCID_TO_MITID' tables. The following values are accepted:
+                - 'server': Submit carbon.feed.PeopleXmlFeed.query.
+                - 'client': Submit carbon.feed.PeopleXmlFeed.person_query and
+                  join the records to hash maps of the dimension tables.
+        dimension_cache: A carbon.dimensions.DimensionCache that loads the dimension
+            tables if the join mode is 'client'.
     """
 
     areas: tuple[str, ...] = (
@@ -242,6 +917,21 @@ class PeopleXmlFeed(BaseXmlFeed):
     namespace_mapping: ClassVar[dict] = {None: symplectic_elements_namespace}
 
     root_element_name: str = str(ET.QName(symplectic_elements_namespace, tag="records"))
+    record_schema = PEOPLE_RECORD_SCHEMA
+    record_key = ("MIT_ID",)
+    order_by_is_cheap = True
+    person_conditions = (
+        persons.c.EMAIL_ADDRESS.is_not(None),
+        persons.c.LAST_NAME.is_not(None),
+        persons.c.KRB_NAME_UPPERCASE.is_not(None),
+        persons.c.KRB_NAME_UPPERCASE != "UNKNOWN",
+        persons.c.MIT_ID.is_not(None),
+        persons.c.ORIGINAL_HIRE_DATE.is_not(None),
+        persons.c.APPOINTMENT_END_DATE  # noqa: SIM300
+        >= datetime(2009, 1, 1),  # noqa: DTZ001
+        persons.c.PERSONNEL_SUBAREA_CODE.in_(ps_codes),
+        func.upper(persons.c.JOB_TITLE).in_(titles),
+    )
     query = (
         select(
             persons.c.MIT_ID,
@@ -262,22 +952,162 @@ class PeopleXmlFeed(BaseXmlFeed):
         .select_from(persons)
         .outerjoin(orcids)
         .join(dlcs)
-        .where(persons.c.EMAIL_ADDRESS.is_not(None))
-        .where(persons.c.LAST_NAME.is_not(None))
-        .where(persons.c.KRB_NAME_UPPERCASE.is_not(None))
-        .where(persons.c.KRB_NAME_UPPERCASE != "UNKNOWN")
-        .where(persons.c.MIT_ID.is_not(None))
-        .where(persons.c.ORIGINAL_HIRE_DATE.is_not(None))
-        .where(
-            persons.c.APPOINTMENT_END_DATE  # noqa: SIM300
-            >= datetime(2009, 1, 1)  # noqa: DTZ001
-        )
+        .where(*person_conditions)
         .where(func.upper(dlcs.c.ORG_HIER_SCHOOL_AREA_NAME).in_(areas))
-        .where(persons.c.PERSONNEL_SUBAREA_CODE.in_(ps_codes))
-        .where(func.upper(persons.c.JOB_TITLE).in_(titles))
     )
+    person_query = select(
+        persons.c.MIT_ID,
+        persons.c.KRB_NAME_UPPERCASE,
+        persons.c.FIRST_NAME,
+        persons.c.MIDDLE_NAME,
+        persons.c.LAST_NAME,
+        persons.c.EMAIL_ADDRESS,
+        persons.c.DATE_TO_FACULTY,
+        persons.c.ORIGINAL_HIRE_DATE,
+        persons.c.PERSONNEL_SUBAREA_CODE,
+        persons.c.APPOINTMENT_END_DATE,
+        persons.c.HR_ORG_UNIT_ID,
+    ).where(*person_conditions)
+
+    def __init__(
+        self,
+        *args: Any,  # noqa: ANN401
+        join_mode: str = "server",
+        dimension_cache_path: str | None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ):
+        if join_mode not in JOIN_MODES:
+            msg = f"'{join_mode}' is not a valid join mode: {JOIN_MODES}"
+            raise ValueError(msg)
+        super().__init__(*args, **kwargs)
+        self.join_mode = join_mode
+        self.dimension_cache = (
+            DimensionCache(self.areas, path=dimension_cache_path)
+            if join_mode == "client"
+            else None
+        )
 
-    def _add_element(self, record: dict[str, Any]) -> ET._Element:
+    def build_query(self) -> Select:
+        """Create the select statement submitted to the Data Warehouse.
+
+        If the join mode is 'client', the statement only queries the person table;
+        the dimension tables are joined in Python (see
+        carbon.feed.PeopleXmlFeed.records).
+
+        Returns:
+            Select: The feed query, ordered by the record key if the sort strategy
+                is 'query'.
+        """
+        if self.join_mode != "client":
+            return super().build_query()
+        query = self.person_query
+        if self.sort_strategy == "query":
+            query = query.order_by(persons.c.MIT_ID)
+        return self._restrict_query(query)
+
+    def _get_statement_key(self, *names: Hashable) -> tuple[Hashable, ...]:
+        return (*super()._get_statement_key(*names), self.join_mode == "client")
+
+    @property
+    def _fetches_record_batches(self) -> bool:
+        return super()._fetches_record_batches and self.dimension_cache is None
+
+    @property
+    def records(self) -> Generator[dict[str, Any], Any, None]:
+        """Create a generator of 'people' records from the Data Warehouse.
+
+        If the join mode is 'client', the dimension tables are loaded into hash maps
+        (see carbon.dimensions.DimensionCache) and joined to the records returned by
+        the person query.
+
+        Yields:
+            Generator[dict[str, Any], Any, None]: Records that
+                match the query submitted to the Data Warehouse.
+        """
+        if self.dimension_cache is None:
+            yield from super().records
+            return
+        dimensions = self.dimension_cache.load(self.engine)
+        yield from dimensions.join(super().records, self.query.selected_columns.keys())
+
+    @property
+    def summary(self) -> dict[str, Any]:
+        """Statistics collected while generating the feed."""
+        summary = super().summary
+        if self.dimension_cache:
+            summary["dimension_cache"] = self.dimension_cache.status
+        return summary
+
+    def _format_record(self, record: dict[str, Any]) -> dict[str, Any]:
+        """Create the values of a person 'record' element.
+
+        Args:
+            record (dict[str, Any]): A record matching the query submitted to the
+                Data Warehouse for retrieving 'people' records.
+
+        Returns:
+            dict[str, Any]: The text of each 'field' subelement, keyed by the 'name'
+                attribute of the subelement.
+        """
+        return {
+            "[Proprietary_ID]": record["MIT_ID"],
+            "[Username]": record["KRB_NAME_UPPERCASE"],
+            "[Initials]": get_initials(record["FIRST_NAME"], record["MIDDLE_NAME"]),
+            "[LastName]": record["LAST_NAME"],
+            "[FirstName]": record["FIRST_NAME"],
+            "[Email]": record["EMAIL_ADDRESS"],
+            "[AuthenticatingAuthority]": "MIT",
+            "[IsAcademic]": "1",
+            "[IsCurrent]": "1",
+            "[LoginAllowed]": "1",
+            "[PrimaryGroupDescriptor]": get_group_name(
+                record["DLC_NAME"], record["PERSONNEL_SUBAREA_CODE"]
+            ),
+            "[ArriveDate]": get_hire_date_string(
+                record["ORIGINAL_HIRE_DATE"], record["DATE_TO_FACULTY"]
+            ),
+            "[LeaveDate]": record["APPOINTMENT_END_DATE"].strftime("%Y-%m-%d"),
+            "[Generic01]": record["ORCID"],
+            "[Generic02]": record["PERSONNEL_SUBAREA_CODE"],
+            "[Generic03]": record["ORG_HIER_SCHOOL_AREA_NAME"],
+            "[Generic04]": record["DLC_NAME"],
+            "[Generic05]": record.get("HR_ORG_LEVEL5_NAME"),
+        }
+
+    def _format_batch(self, batch: "columnar.pa.Table") -> "columnar.pa.Table":
+        """Create the values of person 'record' elements for a batch of records."""
+        column = batch.column
+        return columnar.create_table(
+            {
+                "[Proprietary_ID]": column("MIT_ID"),
+                "[Username]": column("KRB_NAME_UPPERCASE"),
+                "[Initials]": columnar.get_initials(
+                    column("FIRST_NAME"), column("MIDDLE_NAME")
+                ),
+                "[LastName]": column("LAST_NAME"),
+                "[FirstName]": column("FIRST_NAME"),
+                "[Email]": column("EMAIL_ADDRESS"),
+                "[AuthenticatingAuthority]": "MIT",
+                "[IsAcademic]": "1",
+                "[IsCurrent]": "1",
+                "[LoginAllowed]": "1",
+                "[PrimaryGroupDescriptor]": columnar.get_group_names(
+                    column("DLC_NAME"), column("PERSONNEL_SUBAREA_CODE")
+                ),
+                "[ArriveDate]": columnar.get_hire_dates(
+                    column("ORIGINAL_HIRE_DATE"), column("DATE_TO_FACULTY")
+                ),
+                "[LeaveDate]": columnar.format_dates(column("APPOINTMENT_END_DATE")),
+                "[Generic01]": column("ORCID"),
+                "[Generic02]": column("PERSONNEL_SUBAREA_CODE"),
+                "[Generic03]": column("ORG_HIER_SCHOOL_AREA_NAME"),
+                "[Generic04]": column("DLC_NAME"),
+                "[Generic05]": column("HR_ORG_LEVEL5_NAME"),
+            },
+            batch.num_rows,
+        )
+
+    def _build_element(self, values: dict[str, Any]) -> ET._Element:
         """Create an XML element representing a person.
 
         The function will create a single 'record' element that contains subelements
@@ -285,57 +1115,13 @@ class PeopleXmlFeed(BaseXmlFeed):
         and 'ORCID_TO_MITID' tables.
 
         Args:
-            record (dict[str, Any]): A record matching the query submitted to the
-                Data Warehouse for retrieving 'people' records.
+            values (dict[str, Any]): The text of each 'field' subelement (see
+                carbon.feed.PeopleXmlFeed._format_record).
 
         Returns:
             ET._Element: A person XML element.
         """
         person = ET.Element("record")
-        self._add_subelement(person, "field", record["MIT_ID"], name="[Proprietary_ID]")
-        self._add_subelement(
-            person, "field", record["KRB_NAME_UPPERCASE"], name="[Username]"
-        )
-        self._add_subelement(
-            person,
-            "field",
-            get_initials(record["FIRST_NAME"], record["MIDDLE_NAME"]),
-            name="[Initials]",
-        )
-        self._add_subelement(person, "field", record["LAST_NAME"], name="[LastName]")
-        self._add_subelement(person, "field", record["FIRST_NAME"], name="[FirstName]")
-        self._add_subelement(person, "field", record["EMAIL_ADDRESS"], name="[Email]")
-        self._add_subelement(person, "field", "MIT", name="[AuthenticatingAuthority]")
-        self._add_subelement(person, "field", "1", name="[IsAcademic]")
-        self._add_subelement(person, "field", "1", name="[IsCurrent]")
-        self._add_subelement(person, "field", "1", name="[LoginAllowed]")
-        self._add_subelement(
-            person,
-            "field",
-            get_group_name(record["DLC_NAME"], record["PERSONNEL_SUBAREA_CODE"]),
-            name="[PrimaryGroupDescriptor]",
-        )
-        self._add_subelement(
-            person,
-            "field",
-            get_hire_date_string(record["ORIGINAL_HIRE_DATE"], record["DATE_TO_FACULTY"]),
-            name="[ArriveDate]",
-        )
-        self._add_subelement(
-            person,
-            "field",
-            record["APPOINTMENT_END_DATE"].strftime("%Y-%m-%d"),
-            name="[LeaveDate]",
-        )
-        self._add_subelement(person, "field", record["ORCID"], name="[Generic01]")
-        self._add_subelement(
-            person, "field", record["PERSONNEL_SUBAREA_CODE"], name="[Generic02]"
-        )
-        self._add_subelement(
-            person, "field", record["ORG_HIER_SCHOOL_AREA_NAME"], name="[Generic03]"
-        )
-        self._add_subelement(person, "field", record["DLC_NAME"], name="[Generic04]")
-        self._add_subelement(
-            person, "field", record.get("HR_ORG_LEVEL5_NAME"), name="[Generic05]"
-        )
+        for name, text in values.items():
+            self._add_subelement(person, "field", text, name=name)
         return person
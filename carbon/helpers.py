@@ -1,10 +1,19 @@
+from __future__ import annotations
+
+import contextlib
 import logging
+import queue
 import re
+import threading
 from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any, Self
 
 import boto3
 
-from carbon.config import Config
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+    from carbon.config import Config
 
 logger = logging.getLogger(__name__)
 
@@ -88,57 +97,166 @@ def get_initials(*args: str) -> str:
     )
 
 
-def sns_log(config: Config, status: str, error: Exception | None = None) -> dict | None:
-    """Send a message to an Amazon SNS topic about the status of the Carbon run.
+def format_run_summary(run_summary: dict[str, Any]) -> str:
+    """Format the statistics collected during a Carbon run as a single line.
+
+    Args:
+        run_summary (dict[str, Any]): Statistics collected during a Carbon run
+            (e.g. {"records": 2, "elapsed_seconds": 0.5}).
+
+    Returns:
+        str: Comma-separated 'key=value' pairs (e.g. "records=2, elapsed_seconds=0.5").
+    """
+    return ", ".join(f"{key}={value}" for key, value in run_summary.items())
 
-    When Carbon is run in the 'stage' environment, subscribers to the 'carbon-ecs-stage'
-    topic receive an email with the published message. For a given run, two messages are
-    published:
 
-        1. When status = 'start', a message indicating the Carbon run has started.
-        2. When status = 'start'/'fail', a message indicating if the Carbon run has
-            successfully completed or encountered an error.
+def get_sns_message(
+    config: Config,
+    status: str,
+    error: Exception | None = None,
+    run_summary: dict[str, Any] | None = None,
+) -> str | None:
+    """Create the message published to an Amazon SNS topic for a Carbon run status.
 
     Args:
         config (Config): A Config instance with the required environment variables
           for running the feed.
-        status (str): The status of the Carbon run that is used to determine the message
-          published by SNS. The following values are accepted: 'start', 'success',
-          and 'fail'.
+        status (str): The status of the Carbon run. The following values are accepted:
+          'start', 'success', and 'fail'.
         error (Exception | None, optional): The exception thrown for a failed Carbon run.
           Defaults to None.
+        run_summary (dict[str, Any] | None, optional): Statistics collected during a
+          successful Carbon run, appended to the 'success' message. Defaults to None.
+
+    Returns:
+        str | None: The message for the provided status or None if the status
+            is not recognized.
     """
-    sns_client = boto3.client("sns")
-    sns_id = config.SNS_TOPIC_ARN
     stage = config.SYMPLECTIC_FTP_PATH.lstrip("/").split("/")[0]
     feed = config.FEED_TYPE
+    timestamp = datetime.now(tz=UTC).isoformat()
 
     if status == "start":
-        return sns_client.publish(
-            TopicArn=sns_id,
-            Subject="Carbon run",
-            Message=(
-                f"[{datetime.now(tz=UTC).isoformat()}] Starting carbon run for the "
-                f"{feed} feed in the {stage} environment."
-            ),
+        return (
+            f"[{timestamp}] Starting carbon run for the "
+            f"{feed} feed in the {stage} environment."
         )
     if status == "success":
-        return sns_client.publish(
-            TopicArn=sns_id,
-            Subject="Carbon run",
-            Message=(
-                f"[{datetime.now(tz=UTC).isoformat()}] Finished carbon run for the "
-                f"{feed} feed in the {stage} environment."
-            ),
+        message = (
+            f"[{timestamp}] Finished carbon run for the "
+            f"{feed} feed in the {stage} environment."
         )
+        if run_summary:
+            message += f" Run summary: {format_run_summary(run_summary)}."
+        return message
     if status == "fail":
-        return sns_client.publish(
-            TopicArn=sns_id,
-            Subject="Carbon run",
-            Message=(
-                f"[{datetime.now(tz=UTC).isoformat()}] The following problem was "
-                f"encountered during the carbon run for the {feed} feed "
-                f"in the {stage} environment: {error}."
-            ),
+        return (
+            f"[{timestamp}] The following problem was "
+            f"encountered during the carbon run for the {feed} feed "
+            f"in the {stage} environment: {error}."
         )
     return None
+
+
+class SnsNotifier:
+    """Publish messages about the status of a Carbon run from a background thread.
+
+    Messages are placed on a bounded queue and published by a single worker thread
+    that reuses one SNS client, so neither client construction nor the network
+    round trip to SNS is on the critical path of a Carbon run. The message text is
+    created when the status is reported, not when it is published. If the queue is
+    full, the message is dropped and a warning is logged.
+
+    Calling 'close' (or exiting the 'with' block) waits up to 'flush_timeout'
+    seconds for queued messages to be published before the application exits.
+
+    Attributes:
+        config: A Config instance with the required environment variables
+          for running the feed.
+        sns_client: The SNS client used to publish messages. If not provided,
+            the worker thread creates one with boto3 the first time a message
+            is published.
+        max_queue_size: The maximum number of messages waiting to be published.
+        flush_timeout: The maximum number of seconds 'close' waits for queued
+            messages to be published.
+        responses: The responses returned by SNS for published messages.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        sns_client: BaseClient | None = None,
+        max_queue_size: int = 10,
+        flush_timeout: float = 10.0,
+    ):
+        self.config = config
+        self.sns_client = sns_client
+        self.flush_timeout = flush_timeout
+        self.responses: list[dict] = []
+        self._queue: queue.Queue[str | None] = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(target=self._publish_messages, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> Self:
+        """Return the notifier for use in a 'with' block."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Publish queued messages when leaving a 'with' block."""
+        self.close()
+
+    def notify(
+        self,
+        status: str,
+        error: Exception | None = None,
+        run_summary: dict[str, Any] | None = None,
+    ) -> None:
+        """Queue a message about the status of the Carbon run without blocking.
+
+        Args:
+            status (str): The status of the Carbon run. The following values are
+                accepted: 'start', 'success', and 'fail'.
+            error (Exception | None, optional): The exception thrown for a failed
+                Carbon run. Defaults to None.
+            run_summary (dict[str, Any] | None, optional): Statistics collected during
+                a successful Carbon run. Defaults to None.
+        """
+        message = get_sns_message(
+            self.config, status, error=error, run_summary=run_summary
+        )
+        if message is None:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            logger.warning("SNS message queue is full, dropping '%s' message", status)
+
+    def close(self) -> None:
+        """Publish queued messages and stop the worker thread.
+
+        Waits up to 'flush_timeout' seconds; messages that are not published by
+        then are discarded.
+        """
+        with contextlib.suppress(queue.Full):
+            self._queue.put(None, timeout=self.flush_timeout)
+        self._thread.join(timeout=self.flush_timeout)
+        if self._thread.is_alive():
+            logger.warning(
+                "Timed out after %s seconds waiting for SNS messages to be published",
+                self.flush_timeout,
+            )
+
+    def _publish_messages(self) -> None:
+        while (message := self._queue.get()) is not None:
+            try:
+                if self.sns_client is None:
+                    self.sns_client = boto3.client("sns")
+                response = self.sns_client.publish(  # type: ignore[union-attr]
+                    TopicArn=self.config.SNS_TOPIC_ARN,
+                    Subject="Carbon run",
+                    Message=message,
+                )
+            except Exception:
+                logger.exception("Failed to publish message to SNS")
+            else:
+                self.responses.append(response)
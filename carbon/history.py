@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import sqlite3
+import statistics
+from contextlib import closing
+from io import BytesIO
+from typing import TYPE_CHECKING, Any
+
+from carbon.feed import ArticlesXmlFeed, PeopleXmlFeed
+
+if TYPE_CHECKING:
+    from carbon.database import DatabaseEngine
+
+RUN_COLUMNS: tuple[str, ...] = (
+    "started_at",
+    "feed_type",
+    "status",
+    "records",
+    "bytes",
+    "elapsed_seconds",
+    "extract_seconds",
+    "transform_seconds",
+    "write_seconds",
+    "query_fingerprint",
+)
+
+# the minimum number of earlier runs needed before a run is compared to the baseline
+MINIMUM_BASELINE_RUNS = 3
+
+
+def get_query_fingerprint(
+    engine: DatabaseEngine, feed_type: str, feed_options: dict[str, Any]
+) -> str:
+    """Get the fingerprint of the query a feed would submit to the Data Warehouse.
+
+    Args:
+        engine (DatabaseEngine): A carbon.database.DatabaseEngine. It is not used to
+            connect.
+        feed_type (str): The feed type, 'people' or 'articles'.
+        feed_options (dict[str, Any]): Keyword arguments passed to the feed.
+
+    Returns:
+        str: The fingerprint (see carbon.feed.BaseXmlFeed.query_fingerprint).
+    """
+    feed_class = PeopleXmlFeed if feed_type == "people" else ArticlesXmlFeed
+    xml_feed = feed_class(engine=engine, output_file=BytesIO(), **feed_options)
+    return xml_feed.query_fingerprint
+
+
+class RunLedger:
+    """A local SQLite ledger of Carbon runs with performance regression checks.
+
+    Every run appends a row with its feed type, exit status, record and byte counts,
+    stage timings, and query fingerprint. A successful run is compared to the
+    baseline of earlier successful runs of the same feed type and query: the median
+    duration and throughput (records per second) of the last 'baseline_size' runs.
+    Values outside the band 'baseline * (1 +/- tolerance)' are reported as
+    regressions. Runs of a changed query are not compared to runs of the old query.
+
+    Attributes:
+        path: The path to the SQLite database file.
+        baseline_size: The number of earlier runs included in the baseline.
+        tolerance: The relative width of the band around the baseline (e.g. 0.5
+            accepts values between half and one and a half times the baseline).
+    """
+
+    def __init__(self, path: str, baseline_size: int = 10, tolerance: float = 0.5):
+        self.path = path
+        self.baseline_size = baseline_size
+        self.tolerance = tolerance
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.row_factory = sqlite3.Row
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "started_at TEXT NOT NULL, "
+            "feed_type TEXT NOT NULL, "
+            "status TEXT NOT NULL, "
+            "records INTEGER, "
+            "bytes INTEGER, "
+            "elapsed_seconds REAL, "
+            "extract_seconds REAL, "
+            "transform_seconds REAL, "
+            "write_seconds REAL, "
+            "query_fingerprint TEXT)"
+        )
+        return connection
+
+    def record(self, run: dict[str, Any]) -> None:
+        """Append a run to the ledger.
+
+        Args:
+            run (dict[str, Any]): The values of the run, keyed by the names in
+                RUN_COLUMNS. Missing values are stored as NULL.
+        """
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"INSERT INTO runs ({', '.join(RUN_COLUMNS)}) "  # noqa: S608
+                f"VALUES ({', '.join('?' * len(RUN_COLUMNS))})",
+                [run.get(column) for column in RUN_COLUMNS],
+            )
+
+    def history(self, feed_type: str | None = None, limit: int = 20) -> list[dict]:
+        """Get the most recent runs, oldest first.
+
+        Args:
+            feed_type (str | None, optional): Only include runs of the feed type.
+                Defaults to None, which includes all runs.
+            limit (int, optional): The maximum number of runs. Defaults to 20.
+
+        Returns:
+            list[dict]: The runs, keyed by the names in RUN_COLUMNS.
+        """
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT * FROM runs WHERE ? IS NULL OR feed_type = ? "
+                "ORDER BY id DESC LIMIT ?",
+                (feed_type, feed_type, limit),
+            ).fetchall()
+        return [{column: row[column] for column in RUN_COLUMNS} for row in reversed(rows)]
+
+    def baseline(self, feed_type: str, query_fingerprint: str | None) -> dict | None:
+        """Get the rolling baseline for a feed type and query.
+
+        Args:
+            feed_type (str): The feed type.
+            query_fingerprint (str | None): The fingerprint of the feed query.
+
+        Returns:
+            dict | None: The median 'elapsed_seconds' and 'records_per_second' of
+                the last successful runs, and the number of 'runs' they are based
+                on, or None if there are fewer than MINIMUM_BASELINE_RUNS runs.
+        """
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT records, elapsed_seconds FROM runs "
+                "WHERE feed_type = ? AND query_fingerprint IS ? "
+                "AND status = 'success' AND elapsed_seconds > 0 "
+                "ORDER BY id DESC LIMIT ?",
+                (feed_type, query_fingerprint, self.baseline_size),
+            ).fetchall()
+        if len(rows) < MINIMUM_BASELINE_RUNS:
+            return None
+        return {
+            "runs": len(rows),
+            "elapsed_seconds": statistics.median(row[1] for row in rows),
+            "records_per_second": statistics.median(row[0] / row[1] for row in rows),
+        }
+
+    def check(self, run: dict[str, Any]) -> list[str]:
+        """Compare a run to the baseline of earlier runs.
+
+        Args:
+            run (dict[str, Any]): The values of the run (see RunLedger.record).
+
+        Returns:
+            list[str]: A description of each value outside the band around the
+                baseline. Empty if the run is within the band or if there is no
+                baseline yet.
+        """
+        baseline = self.baseline(run["feed_type"], run.get("query_fingerprint"))
+        if not baseline or not run.get("elapsed_seconds"):
+            return []
+        values = {
+            "elapsed_seconds": run["elapsed_seconds"],
+            "records_per_second": (run.get("records") or 0) / run["elapsed_seconds"],
+        }
+        regressions = []
+        for name, value in values.items():
+            lower_bound = baseline[name] * (1 - self.tolerance)
+            upper_bound = baseline[name] * (1 + self.tolerance)
+            if not lower_bound <= value <= upper_bound:
+                regressions.append(
+                    f"{name} {value:.3f} is outside {lower_bound:.3f}-"
+                    f"{upper_bound:.3f} (baseline {baseline[name]:.3f} "
+                    f"over {baseline['runs']} runs)"
+                )
+        return regressions
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+logger = logging.getLogger(__name__)
+
+# the maximum size of a StatsD packet that avoids fragmentation on most networks
+STATSD_MAX_PACKET_SIZE = 512
+
+
+class MetricsRegistry:
+    """A thread-safe collection of counters, gauges, and timers for a Carbon run.
+
+    Updates only touch a dictionary under a lock, so they are cheap enough to make
+    from the feed and the FTP upload thread. Metrics are exported once the run is
+    finished (see carbon.metrics.write_prometheus_textfile and
+    carbon.metrics.StatsdClient).
+
+    Attributes:
+        counters: Values that only increase during a run (e.g. records processed).
+        gauges: Values that are set to the latest measurement (e.g. transfer rate).
+        timers: The number of observations and their total, in seconds, for each
+            timed operation (e.g. database fetch latency).
+    """
+
+    def __init__(self) -> None:
+        self.counters: dict[str, float] = {}
+        self.gauges: dict[str, float] = {}
+        self.timers: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increase a counter by a value."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to a value."""
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record the duration of an operation."""
+        with self._lock:
+            count, total = self.timers.get(name, (0, 0.0))
+            self.timers[name] = (count + 1, total + seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Generator[None, None, None]:
+        """Record the duration of the code run within the context."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time)
+
+    def reset(self) -> None:
+        """Remove all metrics."""
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.timers.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped_labels = []
+    for name, value in sorted(labels.items()):
+        escaped_value = (
+            value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        escaped_labels.append(f'{name}="{escaped_value}"')
+    return "{" + ",".join(escaped_labels) + "}"
+
+
+def format_prometheus_text(
+    registry: MetricsRegistry, labels: dict[str, str] | None = None
+) -> str:
+    """Format metrics in the Prometheus text exposition format.
+
+    Metric names are prefixed with 'carbon_'. Timers are exported as summaries
+    with '_count' and '_sum' series.
+
+    Args:
+        registry (MetricsRegistry): The metrics to format.
+        labels (dict[str, str] | None, optional): Labels added to every series
+            (e.g. {"feed_type": "people"}). Defaults to None.
+
+    Returns:
+        str: The formatted metrics.
+    """
+    label_string = _format_labels(labels or {})
+    lines = []
+    for metric_type, values in (
+        ("counter", registry.counters),
+        ("gauge", registry.gauges),
+    ):
+        for name, value in sorted(values.items()):
+            lines.append(f"# TYPE carbon_{name} {metric_type}")
+            lines.append(f"carbon_{name}{label_string} {value}")
+    for name, (count, total) in sorted(registry.timers.items()):
+        lines.append(f"# TYPE carbon_{name} summary")
+        lines.append(f"carbon_{name}_count{label_string} {count}")
+        lines.append(f"carbon_{name}_sum{label_string} {total}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(
+    path: str, registry: MetricsRegistry, labels: dict[str, str] | None = None
+) -> None:
+    """Write metrics to a file read by the Prometheus node exporter textfile collector.
+
+    The metrics are written to a temporary file in the same directory, which then
+    replaces the target file, so the collector never reads a partial file.
+
+    Args:
+        path (str): The path to the textfile (e.g. "/var/lib/node_exporter/carbon.prom").
+        registry (MetricsRegistry): The metrics to write.
+        labels (dict[str, str] | None, optional): Labels added to every series.
+            Defaults to None.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w") as temporary_file:
+            temporary_file.write(format_prometheus_text(registry, labels))
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except Exception:
+        os.remove(temporary_path)
+        raise
+
+
+class StatsdClient:
+    """A client that sends metrics to a StatsD server over UDP.
+
+    Counters are sent as StatsD counters, gauges as gauges, and the average of each
+    timer as a timing in milliseconds. Lines are batched into packets of up to
+    512 bytes. UDP is fire-and-forget, so sending never blocks or fails the run.
+
+    Attributes:
+        host: The hostname of the StatsD server.
+        port: The port of the StatsD server.
+        prefix: The prefix added to every metric name (e.g. "carbon.people").
+    """
+
+    def __init__(self, host: str, port: int = 8125, prefix: str = "carbon"):
+        self.host = host
+        self.port = port
+        self.prefix = prefix
+
+    def format_lines(self, registry: MetricsRegistry) -> list[str]:
+        """Format metrics as StatsD lines."""
+        lines = [
+            f"{self.prefix}.{name}:{value}|c"
+            for name, value in sorted(registry.counters.items())
+        ]
+        lines.extend(
+            f"{self.prefix}.{name}:{value}|g"
+            for name, value in sorted(registry.gauges.items())
+        )
+        lines.extend(
+            f"{self.prefix}.{name}:{round(total / count * 1000, 3)}|ms"
+            for name, (count, total) in sorted(registry.timers.items())
+            if count
+        )
+        return lines
+
+    def send(self, registry: MetricsRegistry) -> None:
+        """Send metrics to the StatsD server."""
+        packets: list[str] = []
+        for line in self.format_lines(registry):
+            if packets and len(packets[-1]) + len(line) + 1 <= STATSD_MAX_PACKET_SIZE:
+                packets[-1] += "\n" + line
+            else:
+                packets.append(line)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as statsd_socket:
+            for packet in packets:
+                statsd_socket.sendto(packet.encode(), (self.host, self.port))
+
+
+def export_metrics(
+    registry: MetricsRegistry,
+    feed_type: str,
+    textfile_path: str | None = None,
+    statsd_address: str | None = None,
+) -> None:
+    """Export metrics to a Prometheus textfile and/or a StatsD server.
+
+    Errors are logged rather than raised, so a broken metrics destination never
+    fails a run.
+
+    Args:
+        registry (MetricsRegistry): The metrics to export.
+        feed_type (str): The feed type, added as the 'feed_type' label in the
+            textfile and to the StatsD prefix (e.g. "carbon.people").
+        textfile_path (str | None, optional): The path to the Prometheus textfile.
+            Defaults to None.
+        statsd_address (str | None, optional): The StatsD server as 'host:port'.
+            Defaults to None.
+    """
+    if textfile_path:
+        try:
+            write_prometheus_textfile(
+                textfile_path, registry, labels={"feed_type": feed_type}
+            )
+        except Exception:
+            logger.exception("Failed to write metrics to '%s'", textfile_path)
+    if statsd_address:
+        host, _, port = statsd_address.rpartition(":")
+        try:
+            StatsdClient(host, int(port), prefix=f"carbon.{feed_type}").send(registry)
+        except Exception:
+            logger.exception("Failed to send metrics to StatsD at '%s'", statsd_address)
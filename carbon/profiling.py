@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Self
+
+if TYPE_CHECKING:
+    from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES: tuple[str, ...] = ("cprofile", "sample")
+
+
+class StackSampler:
+    """A low-overhead profiler that periodically samples the stacks of all threads.
+
+    A background thread reads the current frame of every other thread at a fixed
+    interval (see sys._current_frames) and counts each distinct stack. Nothing is
+    traced between samples, so the overhead depends on the interval rather than on
+    the number of function calls, and it covers the FTP upload thread as well as
+    the main thread.
+
+    Attributes:
+        interval: The number of seconds between samples.
+        sample_count: The number of samples taken.
+        stack_counts: The number of samples of each stack, keyed by the collapsed
+            stack (frames from the thread name to the innermost function,
+            separated by ';').
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.sample_count = 0
+        self.stack_counts: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start sampling in a separate thread."""
+        self._thread = threading.Thread(
+            target=self._sample_periodically, name="carbon-stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+
+    def _sample_periodically(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        """Count the current stack of every thread except the sampler."""
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():  # noqa: SLF001
+            if thread_id == threading.get_ident():
+                continue
+            thread_name = thread_names.get(thread_id, str(thread_id))
+            self.stack_counts[self.collapse_stack(thread_name, frame)] += 1
+        self.sample_count += 1
+
+    @staticmethod
+    def collapse_stack(thread_name: str, frame: FrameType | None) -> str:
+        """Format a stack as a single line, outermost frame first."""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                f"{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        return ";".join([thread_name, *reversed(frames)])
+
+    def write_collapsed_stacks(self, path: str) -> None:
+        """Write the stack counts in the collapsed format read by flamegraph tools."""
+        with open(path, "w") as collapsed_file:
+            collapsed_file.writelines(
+                f"{stack} {count}\n" for stack, count in self.stack_counts.most_common()
+            )
+
+
+class RunProfiler:
+    """A context manager that profiles a Carbon run and writes the results to files.
+
+    Two modes are supported:
+
+        - 'cprofile': Trace every function call in the main thread with cProfile
+          and write a pstats file (read with 'python -m pstats' or snakeviz). The
+          tracing overhead grows with the number of function calls.
+        - 'sample': Sample the stacks of all threads with carbon.profiling.StackSampler
+          and write a collapsed-stack file (read with flamegraph.pl or speedscope).
+          The overhead is small enough for production runs.
+
+    Files are named 'carbon-<feed type>-<UTC timestamp>' with the extension
+    '.pstats' or '.collapsed'.
+
+    Attributes:
+        mode: The profiling mode, 'cprofile' or 'sample'.
+        feed_type: The feed type, included in the file names.
+        directory: The directory into which the files are written.
+        interval: The number of seconds between samples in 'sample' mode.
+        output_path: The path to the file written when the context exits. Failing
+            to write the file is logged but does not fail the run.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        feed_type: str,
+        directory: str = ".",
+        interval: float = 0.01,
+    ):
+        if mode not in PROFILE_MODES:
+            msg = f"'{mode}' is not a valid profile mode: {PROFILE_MODES}"
+            raise ValueError(msg)
+        self.mode = mode
+        self.feed_type = feed_type
+        self.directory = directory
+        self.interval = interval
+        timestamp = datetime.now(tz=UTC).strftime("%Y%m%dT%H%M%SZ")
+        extension = "pstats" if mode == "cprofile" else "collapsed"
+        self.output_path = os.path.join(
+            directory, f"carbon-{feed_type}-{timestamp}.{extension}"
+        )
+        self._profile: cProfile.Profile | None = None
+        self._sampler: StackSampler | None = None
+        self._start_time = 0.0
+
+    def __enter__(self) -> Self:
+        """Start profiling."""
+        self._start_time = time.perf_counter()
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = StackSampler(interval=self.interval)
+            self._sampler.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop profiling and write the results, also if the run failed."""
+        if self._profile:
+            self._profile.disable()
+        if self._sampler:
+            self._sampler.stop()
+        try:
+            if self._profile:
+                self._profile.dump_stats(self.output_path)
+            if self._sampler:
+                self._sampler.write_collapsed_stacks(self.output_path)
+        except OSError:
+            logger.exception("Failed to write profile to '%s'", self.output_path)
+            return
+        logger.info(
+            "Profiled the run for %.3f seconds with '%s', results written to '%s'",
+            time.perf_counter() - self._start_time,
+            self.mode,
+            self.output_path,
+        )
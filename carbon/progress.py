@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, select, text
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy.sql.selectable import Select
+
+    from carbon.database import DatabaseEngine
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TOTALS: tuple[str, ...] = ("count", "estimate")
+
+
+class ProgressReporter:
+    """A background reporter that periodically logs the progress of a feed.
+
+    Every interval, the reporter logs the number of records processed, the current
+    rate (since the previous report), and the average rate. If the total number of
+    records is known, the percentage done and an ETA based on the average rate are
+    also logged. The total is retrieved in a separate thread while the feed runs:
+
+        - 'count': Run a COUNT(*) over the feed query, which is exact but adds
+          a second query to the Data Warehouse.
+        - 'estimate': Read the number of rows of the main table of the feed from
+          the optimizer statistics (Oracle 'ALL_TABLES.NUM_ROWS'). This is cheap,
+          but it is only an upper bound on the number of records returned by
+          a filtered query.
+
+    The reporter reads the processed record count from the feed; it does not add
+    any work per record.
+
+    Attributes:
+        interval: The number of seconds between progress logs.
+        total_source: How the total number of records is retrieved: 'count',
+            'estimate', or None to log rates only.
+        total: The total number of records, once retrieved.
+    """
+
+    def __init__(self, interval: float = 60.0, total_source: str | None = None):
+        if total_source not in (*PROGRESS_TOTALS, None):
+            msg = f"'{total_source}' is not a valid progress total: {PROGRESS_TOTALS}"
+            raise ValueError(msg)
+        self.interval = interval
+        self.total_source = total_source
+        self.total: int | None = None
+        self._stop_event = threading.Event()
+        self._report_thread: threading.Thread | None = None
+        self._total_thread: threading.Thread | None = None
+        self._start_time = 0.0
+        self._last_report: tuple[float, int] = (0.0, 0)
+
+    def start(
+        self,
+        engine: DatabaseEngine,
+        query: Select,
+        get_processed_count: Callable[[], int],
+    ) -> None:
+        """Start logging progress in a separate thread.
+
+        Args:
+            engine (DatabaseEngine): A configured carbon.database.DatabaseEngine
+                used to retrieve the total number of records.
+            query (Select): The feed query.
+            get_processed_count (Callable[[], int]): A function returning the number
+                of records processed by the feed.
+        """
+        self._start_time = time.perf_counter()
+        self._last_report = (self._start_time, 0)
+        if self.total_source:
+            self._total_thread = threading.Thread(
+                target=self._retrieve_total, args=(engine, query), daemon=True
+            )
+            self._total_thread.start()
+        self._report_thread = threading.Thread(
+            target=self._report_periodically, args=(get_processed_count,), daemon=True
+        )
+        self._report_thread.start()
+
+    def stop(self) -> None:
+        """Stop logging progress.
+
+        A COUNT(*) that is still running is abandoned.
+        """
+        self._stop_event.set()
+        if self._report_thread:
+            self._report_thread.join()
+
+    def _retrieve_total(self, engine: DatabaseEngine, query: Select) -> None:
+        start_time = time.perf_counter()
+        try:
+            with engine().connect() as connection:
+                if self.total_source == "count":
+                    count_query = select(func.count()).select_from(query.subquery())
+                    self.total = connection.execute(count_query).scalar_one()
+                elif connection.dialect.name == "oracle":
+                    table_name = next(iter(query.selected_columns)).table.name  # type: ignore[attr-defined]
+                    self.total = connection.execute(
+                        text("SELECT NUM_ROWS FROM ALL_TABLES WHERE TABLE_NAME = :table"),
+                        {"table": table_name.upper()},
+                    ).scalar()
+                else:
+                    logger.info(
+                        "Row count estimates are not available for the '%s' dialect",
+                        connection.dialect.name,
+                    )
+                    return
+        except Exception as error:  # noqa: BLE001
+            logger.warning("Failed to retrieve the total number of records: %s", error)
+            return
+        logger.info(
+            "The feed has %s %s records (retrieved in %.3f seconds)",
+            "an estimated" if self.total_source == "estimate" else "a total of",
+            self.total,
+            time.perf_counter() - start_time,
+        )
+
+    def _report_periodically(self, get_processed_count: Callable[[], int]) -> None:
+        while not self._stop_event.wait(self.interval):
+            logger.info(self.report(get_processed_count(), time.perf_counter()))
+
+    def report(self, processed_count: int, now: float) -> str:
+        """Create a progress message and remember it as the latest report.
+
+        Args:
+            processed_count (int): The number of records processed.
+            now (float): The current time, as returned by time.perf_counter().
+
+        Returns:
+            str: The progress message.
+        """
+        last_report_time, last_processed_count = self._last_report
+        self._last_report = (now, processed_count)
+        current_rate = (processed_count - last_processed_count) / max(
+            now - last_report_time, 1e-9
+        )
+        average_rate = processed_count / max(now - self._start_time, 1e-9)
+        rates = f"{current_rate:,.0f} records/s (average {average_rate:,.0f} records/s)"
+        if not self.total:
+            return f"Processed {processed_count:,} records, {rates}"
+        remaining_count = max(self.total - processed_count, 0)
+        eta = (
+            str(timedelta(seconds=round(remaining_count / average_rate)))
+            if average_rate
+            else "unknown"
+        )
+        return (
+            f"Processed {processed_count:,} of {self.total:,} records "
+            f"({processed_count / self.total:.1%}), {rates}, ETA {eta}"
+        )
@@ -0,0 +1,105 @@
+import json
+import logging
+from collections.abc import Hashable
+from typing import IO, Any
+
+logger = logging.getLogger(__name__)
+
+
+class ErrorBudgetExceededError(Exception):
+    """Raised when more records are quarantined than the error budget allows."""
+
+
+class RecordQuarantine:
+    """A log of the records that could not be transformed into record elements.
+
+    A record whose transform (or validation) raises an exception is written to the
+    quarantine file, with the exception, instead of failing the run. The file is
+    written in the JSON Lines format, one compact object per record with the keys
+    'record_number', 'key', 'error', and 'record'; values that are not JSON types
+    (e.g. dates) are written as strings. The file is replaced at the start of
+    each run.
+
+    Once more than 'error_budget' records are quarantined, the run fails, so
+    a systematic error (e.g. a changed column) does not produce an empty feed.
+
+    Attributes:
+        path: The path of the quarantine file.
+        error_budget: The number of records that can be quarantined before the
+            run fails.
+        quarantined_record_count: The number of records written to the quarantine
+            file.
+    """
+
+    def __init__(self, path: str, error_budget: int = 100):
+        if error_budget < 0:
+            msg = f"Error budget must be zero or greater, got {error_budget}"
+            raise ValueError(msg)
+        self.path = path
+        self.error_budget = error_budget
+        self.quarantined_record_count = 0
+        self._file: IO | None = None
+
+    def open(self) -> IO:
+        """Create an empty quarantine file."""
+        self.quarantined_record_count = 0
+        self._file = open(self.path, "w", encoding="utf-8")  # noqa: SIM115
+        return self._file
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def add(
+        self,
+        record: dict[str, Any],
+        error: Exception,
+        record_number: int,
+        key: tuple[Hashable, ...] | None = None,
+    ) -> None:
+        """Write a record that could not be transformed to the quarantine file.
+
+        Args:
+            record (dict[str, Any]): The record that could not be transformed (or,
+                in columnar mode, the values of a record element that could not be
+                validated).
+            error (Exception): The exception raised by the transform.
+            record_number (int): The position of the record in the feed, starting
+                at 1.
+            key (tuple[Hashable, ...] | None, optional): The record key, if known.
+                Defaults to None.
+
+        Raises:
+            ErrorBudgetExceededError: If the error budget is exceeded.
+        """
+        file = self._file or self.open()
+        self.quarantined_record_count += 1
+        entry = {
+            "record_number": record_number,
+            "key": key,
+            "error": f"{type(error).__name__}: {error}",
+            "record": record,
+        }
+        file.write(
+            json.dumps(entry, default=str, ensure_ascii=False, separators=(",", ":"))
+            + "\n"
+        )
+        logger.warning(
+            "Quarantined record %s (key: %s): %s", record_number, key, entry["error"]
+        )
+        if self.quarantined_record_count > self.error_budget:
+            file.flush()
+            msg = (
+                f"{self.quarantined_record_count} records could not be transformed, "
+                f"exceeding the error budget of {self.error_budget}; see '{self.path}'"
+            )
+            raise ErrorBudgetExceededError(msg) from error
+
+    @property
+    def summary(self) -> dict[str, Any]:
+        """The number of quarantined records and the path of the quarantine file."""
+        return {
+            "quarantined_records": self.quarantined_record_count,
+            "quarantine_file": self.path,
+        }
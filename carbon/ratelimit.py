@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+from typing import IO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+
+class RateSchedule:
+    """Upload rate limits that depend on the time of day, evaluated in local time.
+
+    Each rule is a rate in megabytes per second, optionally preceded by a time window
+    in 24-hour 'HH:MM-HH:MM=' form (e.g. '08:00-18:00=2'). A window ending at or
+    before its start time wraps past midnight (e.g. '22:00-06:00=50'). The first
+    window that includes the time of day applies; a rule without a window applies
+    at any other time. If no rule applies, the rate is not limited.
+
+    Attributes:
+        rules: The rules the schedule was created from.
+    """
+
+    def __init__(self, rules: Iterable[str]):
+        self.rules = tuple(rules)
+        self._windows: list[tuple[int, int, float]] = []
+        self._default_rate: float | None = None
+        for rule in self.rules:
+            window, _, rate = rule.rpartition("=")
+            bytes_per_second = self._parse_rate(rule, rate)
+            if window:
+                start, end = self._parse_window(rule, window)
+                self._windows.append((start, end, bytes_per_second))
+            else:
+                self._default_rate = bytes_per_second
+
+    @staticmethod
+    def _parse_rate(rule: str, rate: str) -> float:
+        try:
+            megabytes_per_second = float(rate)
+        except ValueError:
+            megabytes_per_second = 0.0
+        if not megabytes_per_second > 0:
+            msg = f"'{rule}' is not a valid rate limit: the rate must be positive"
+            raise ValueError(msg)
+        return megabytes_per_second * 1024**2
+
+    @staticmethod
+    def _parse_window(rule: str, window: str) -> tuple[int, int]:
+        minutes = []
+        for time_of_day in window.split("-"):
+            try:
+                moment = datetime.strptime(time_of_day.strip(), "%H:%M")  # noqa: DTZ007
+            except ValueError:
+                break
+            minutes.append(moment.hour * 60 + moment.minute)
+        if len(minutes) != 2:  # noqa: PLR2004
+            msg = f"'{rule}' is not a valid rate limit: expected 'HH:MM-HH:MM=RATE'"
+            raise ValueError(msg)
+        return minutes[0], minutes[1]
+
+    def get_rate(self, moment: datetime) -> float | None:
+        """Get the rate limit in bytes per second at a time, or None for no limit."""
+        minute = moment.hour * 60 + moment.minute
+        for start, end, rate in self._windows:
+            if start <= minute < end or (end <= start and not end <= minute < start):
+                return rate
+        return self._default_rate
+
+
+class RateLimiter:
+    """A token bucket that paces the data read by one or more upload streams.
+
+    Tokens are added at the rate of the carbon.ratelimit.RateSchedule in effect,
+    up to 'burst_seconds' worth of data. Each read takes tokens for the data it
+    returns; a read that takes more tokens than are available waits until the
+    debt is repaid. The limiter is thread-safe, so it can be shared by several
+    upload streams to limit their combined rate.
+
+    Attributes:
+        schedule: The carbon.ratelimit.RateSchedule of rate limits.
+        burst_seconds: The number of seconds of data that can be sent at once after
+            the upload was idle.
+        byte_count: The number of bytes read through the limiter.
+        throttled_seconds: The time reads waited for tokens, summed over all
+            upload streams.
+    """
+
+    def __init__(
+        self,
+        schedule: RateSchedule,
+        burst_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.schedule = schedule
+        self.burst_seconds = burst_seconds
+        self.byte_count = 0
+        self.throttled_seconds = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._refill_time: float | None = None
+
+    def throttle(self, size: int) -> None:
+        """Wait until 'size' bytes can be sent at the rate in effect."""
+        with self._lock:
+            now = self._clock()
+            self.byte_count += size
+            rate = self.schedule.get_rate(datetime.now())  # noqa: DTZ005
+            if rate is None:
+                self._tokens = 0.0
+                self._refill_time = now
+                wait_seconds = 0.0
+            else:
+                capacity = rate * self.burst_seconds
+                if self._refill_time is None:
+                    self._tokens = capacity
+                else:
+                    self._tokens = min(
+                        capacity, self._tokens + (now - self._refill_time) * rate
+                    )
+                self._refill_time = now
+                self._tokens -= size
+                wait_seconds = max(0.0, -self._tokens / rate)
+            self.throttled_seconds += wait_seconds
+        if wait_seconds:
+            self._sleep(wait_seconds)
+
+    def reader(self, file: IO[bytes]) -> RateLimitedReader:
+        """Wrap a file-like object so that reads from it are paced by the limiter."""
+        return RateLimitedReader(file, self)
+
+
+class RateLimitedReader:
+    """A file-like wrapper whose reads are paced by a carbon.ratelimit.RateLimiter.
+
+    Attributes:
+        file: The file-like object (stream) that data is read from.
+        limiter: The carbon.ratelimit.RateLimiter that paces the reads.
+    """
+
+    def __init__(self, file: IO[bytes], limiter: RateLimiter):
+        self.file = file
+        self.limiter = limiter
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.file.read(size)
+        if data:
+            self.limiter.throttle(len(data))
+        return data
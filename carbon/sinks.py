@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import IO, TYPE_CHECKING, Any
+
+from carbon.app import FileWriter, FtpFile
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from carbon.app import FtpSession
+    from carbon.config import Config
+    from carbon.database import DatabaseEngine
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# markers queued after the last chunk of a feed
+_END_OF_FEED = b""
+_ABORTED_FEED = None
+
+
+class SinkError(Exception):
+    """Raised when one or more sinks failed to write the feed."""
+
+
+class SinkReader:
+    """A file-like object (stream) that reads the chunks queued for a sink.
+
+    Attributes:
+        chunks: The queue of chunks written to the sink.
+    """
+
+    def __init__(self, chunks: queue.Queue[bytes | None]):
+        self.chunks = chunks
+        self._buffer = b""
+        self._at_eof = False
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to 'size' bytes, blocking until they are queued or the feed ends.
+
+        Raises:
+            SinkError: If the feed was aborted before it was completed.
+        """
+        while not self._at_eof and (size < 0 or len(self._buffer) < size):
+            chunk = self.chunks.get()
+            if chunk is _ABORTED_FEED:
+                msg = "The feed was aborted before it was completed"
+                raise SinkError(msg)
+            if chunk == _END_OF_FEED:
+                self._at_eof = True
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class Sink(ABC):
+    """Base class for a destination of the feed.
+
+    Each sink consumes the feed in its own thread, reading from a bounded queue of
+    chunks. A sink that is slower than the feed fills its queue, after which the feed
+    waits for the sink; the time spent waiting is reported as 'blocked_seconds'.
+    A sink that fails stops receiving chunks, so the other sinks can finish.
+
+    Attributes:
+        name: The name of the sink, used as a prefix in the run summary.
+        max_queued_chunks: The maximum number of chunks buffered for the sink.
+        chunks: The queue of chunks written to the sink.
+        reader: A carbon.sinks.SinkReader for the queued chunks.
+        byte_count: The number of bytes queued for the sink.
+        blocked_seconds: The time the feed waited for space in the queue.
+        elapsed_seconds: The time the sink took to consume the feed.
+        error: The exception raised by the sink, if it failed.
+    """
+
+    def __init__(self, name: str, *, max_queued_chunks: int = 64):
+        self.name = name
+        self.max_queued_chunks = max_queued_chunks
+        self.chunks: queue.Queue[bytes | None] = queue.Queue(maxsize=max_queued_chunks)
+        self.reader = SinkReader(self.chunks)
+        self.byte_count = 0
+        self.blocked_seconds = 0.0
+        self.elapsed_seconds = 0.0
+        self.error: Exception | None = None
+        self._thread = threading.Thread(
+            target=self._consume, name=f"carbon-sink-{name}", daemon=True
+        )
+
+    @abstractmethod
+    def consume(self) -> None:
+        """Read the feed from 'reader' and write it to the destination.
+
+        Must be overridden by subclasses.
+        """
+
+    def _consume(self) -> None:
+        start_time = time.perf_counter()
+        try:
+            self.consume()
+        except Exception as error:  # noqa: BLE001
+            self.error = error
+            logger.error("Sink '%s' failed: %s", self.name, error)  # noqa: TRY400
+        finally:
+            self.elapsed_seconds = time.perf_counter() - start_time
+
+    def start(self) -> None:
+        """Start consuming the feed in a separate thread."""
+        self._thread.start()
+
+    def _put(self, chunk: bytes | None) -> bool:
+        start_time = time.perf_counter()
+        try:
+            while self.error is None and self._thread.is_alive():
+                try:
+                    self.chunks.put(chunk, timeout=0.1)
+                except queue.Full:
+                    continue
+                else:
+                    return True
+            return False
+        finally:
+            self.blocked_seconds += time.perf_counter() - start_time
+
+    def write(self, chunk: bytes) -> None:
+        """Queue a chunk of the feed, waiting for space in the queue if needed."""
+        if chunk and self._put(chunk):
+            self.byte_count += len(chunk)
+
+    def finish(self, *, aborted: bool = False) -> None:
+        """Mark the end of the feed and wait for the sink to consume it."""
+        self._put(_ABORTED_FEED if aborted else _END_OF_FEED)
+        self._thread.join()
+
+    @property
+    def summary(self) -> dict[str, Any]:
+        """Statistics describing the throughput and status of the sink."""
+        return {
+            f"{self.name}_status": "failed" if self.error else "ok",
+            f"{self.name}_bytes": self.byte_count,
+            f"{self.name}_mb_per_second": (
+                round(self.byte_count / 1024**2 / self.elapsed_seconds, 3)
+                if self.elapsed_seconds
+                else 0.0
+            ),
+            f"{self.name}_blocked_seconds": round(self.blocked_seconds, 3),
+        }
+
+
+class FileSink(Sink):
+    """A sink that writes the feed to a file-like object (stream).
+
+    Attributes:
+        output_file: A file-like object (stream) into which the feed is written.
+            The file is not closed by the sink.
+    """
+
+    def __init__(self, name: str, output_file: IO, *, max_queued_chunks: int = 64):
+        super().__init__(name, max_queued_chunks=max_queued_chunks)
+        self.output_file = output_file
+
+    def consume(self) -> None:
+        """Copy the feed to the output file."""
+        shutil.copyfileobj(self.reader, self.output_file)  # type: ignore[misc]
+
+
+class ArchiveSink(Sink):
+    """A sink that writes a gzip-compressed copy of the feed to a file.
+
+    The archive is written to a temporary file next to the target path, which is
+    renamed once the feed is complete, so a partial archive never replaces an
+    existing one.
+
+    Attributes:
+        path: The path to the archive file (e.g. "archive/people.xml.gz").
+    """
+
+    def __init__(self, name: str, path: str, *, max_queued_chunks: int = 64):
+        super().__init__(name, max_queued_chunks=max_queued_chunks)
+        self.path = path
+
+    def consume(self) -> None:
+        """Compress the feed into the archive file."""
+        partial_path = f"{self.path}.part"
+        try:
+            with gzip.open(partial_path, "wb") as archive_file:
+                shutil.copyfileobj(self.reader, archive_file)  # type: ignore[misc]
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        os.replace(partial_path, self.path)
+
+
+class FtpSink(Sink):
+    """A sink that uploads the feed to an FTP server with a carbon.app.FtpFile.
+
+    Attributes:
+        ftp_file: The carbon.app.FtpFile that reads the feed from 'reader'.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        user: str,
+        password: str,
+        path: str,
+        *,
+        host: str = "localhost",
+        port: int = 21,
+        max_queued_chunks: int = 64,
+        session: FtpSession | None = None,
+    ):
+        super().__init__(name, max_queued_chunks=max_queued_chunks)
+        self.ftp_file = FtpFile(
+            content_feed=self.reader,  # type: ignore[arg-type]
+            user=user,
+            password=password,
+            path=path,
+            host=host,
+            port=port,
+            session=session,
+        )
+
+    def consume(self) -> None:
+        """Upload the feed to the FTP server."""
+        self.ftp_file()
+
+    def run_connection_test(self) -> None:
+        """Connect and log in to the FTP server.
+
+        A connection opened by the session of the FTP file is left open for the
+        upload.
+        """
+        ftps = self.ftp_file.connect()
+        if not self.ftp_file.session:
+            ftps.quit()
+
+    @property
+    def summary(self) -> dict[str, Any]:
+        """Statistics describing the sink and the verification of the uploaded file."""
+        return {
+            **super().summary,
+            **{
+                f"{self.name}_{key}": value
+                for key, value in self.ftp_file.summary.items()
+            },
+        }
+
+
+class TeeFile:
+    """A file-like object (stream) that fans the feed out to several sinks.
+
+    Data written to the tee is collected into chunks, and each chunk is queued for
+    every sink.
+
+    Attributes:
+        sinks: The carbon.sinks.Sink instances the feed is written to.
+        chunk_size: The number of bytes collected before a chunk is queued.
+    """
+
+    def __init__(self, sinks: Iterable[Sink], chunk_size: int = CHUNK_SIZE):
+        self.sinks = list(sinks)
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def start(self) -> None:
+        """Start the sinks."""
+        for sink in self.sinks:
+            sink.start()
+
+    def write(self, data: bytes) -> int:
+        """Collect data, queueing a chunk for each sink once it is full."""
+        self._buffer += data
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        """Queue the collected data for each sink."""
+        if not self._buffer:
+            return
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        for sink in self.sinks:
+            sink.write(chunk)
+
+    def close(self, *, aborted: bool = False) -> None:
+        """Mark the end of the feed and wait for every sink to finish.
+
+        Args:
+            aborted (bool): Whether the feed failed before it was completed. Sinks
+                then stop without completing their output. Defaults to False.
+        """
+        if not aborted:
+            self.flush()
+        for sink in self.sinks:
+            sink.finish(aborted=aborted)
+
+
+class DatabaseToSinksPipe:
+    """A pipe feeding data from the Data Warehouse to several destinations at once.
+
+    The feed is generated once and written to a carbon.sinks.TeeFile, which queues
+    it for each sink (e.g. the Elements FTP server, a second Elements environment,
+    and a compressed archive). Each sink writes the feed concurrently.
+
+    Attributes:
+        config: A carbon.config.Config instance with the required environment variables
+          for running the feed.
+        engine: A configured carbon.database.DatabaseEngine that can connect to the
+            Data Warehouse.
+        sinks: The carbon.sinks.Sink instances the feed is written to.
+        feed_options: Keyword arguments passed to the feed (see carbon.app.FileWriter).
+        summary: Statistics collected during the last call to 'run'.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        engine: DatabaseEngine,
+        sinks: Iterable[Sink],
+        *,
+        feed_options: dict[str, Any] | None = None,
+    ):
+        self.config = config
+        self.engine = engine
+        self.sinks = list(sinks)
+        self.feed_options = feed_options
+        self.summary: dict[str, Any] = {}
+
+    def run(self) -> None:
+        """Write the feed to every sink.
+
+        Raises:
+            SinkError: If one or more sinks failed. The sinks that did not fail
+                complete their output.
+        """
+        start_time = time.perf_counter()
+        tee_file = TeeFile(self.sinks)
+        tee_file.start()
+        file_writer = FileWriter(
+            engine=self.engine,
+            output_file=tee_file,  # type: ignore[arg-type]
+            feed_options=self.feed_options,
+        )
+        try:
+            file_writer.write(feed_type=self.config.FEED_TYPE)
+        except Exception:
+            tee_file.close(aborted=True)
+            raise
+        tee_file.close()
+
+        self.summary = dict(file_writer.summary)
+        for sink in self.sinks:
+            self.summary.update(sink.summary)
+            logger.info(
+                "Sink '%s' wrote %s bytes in %.3f seconds and blocked the feed "
+                "for %.3f seconds",
+                sink.name,
+                sink.byte_count,
+                sink.elapsed_seconds,
+                sink.blocked_seconds,
+            )
+        self.summary["elapsed_seconds"] = round(time.perf_counter() - start_time, 3)
+
+        if failed_sinks := [sink for sink in self.sinks if sink.error]:
+            msg = f"{len(failed_sinks)} of {len(self.sinks)} sinks failed: " + "; ".join(
+                f"{sink.name}: {sink.error}" for sink in failed_sinks
+            )
+            raise SinkError(msg) from failed_sinks[0].error
+
+    def run_connection_test(self) -> None:
+        """Test connections to the FTP servers of the FTP sinks."""
+        for sink in self.sinks:
+            if isinstance(sink, FtpSink):
+                logger.info(
+                    "Testing connection to the FTP server for sink '%s'", sink.name
+                )
+                try:
+                    sink.run_connection_test()
+                except Exception:
+                    logger.exception(
+                        "Failed to connect to the FTP server for sink '%s'", sink.name
+                    )
+                    raise
+                logger.info(
+                    "Successfully connected to the FTP server for sink '%s'", sink.name
+                )
@@ -0,0 +1,108 @@
+import heapq
+import pickle  # nosec
+import tempfile
+from collections.abc import Generator, Iterable
+from typing import IO, Any
+
+SORT_STRATEGIES: tuple[str, ...] = ("auto", "query", "external")
+
+
+def get_sort_key(record: dict[str, Any], key_columns: Iterable[str]) -> tuple[str, ...]:
+    """Create the key used to sort a record.
+
+    Values are compared as strings, matching the text of the XML elements written
+    for the record.
+
+    Args:
+        record (dict[str, Any]): A record from the Data Warehouse.
+        key_columns (Iterable[str]): The names of the columns that identify a record.
+
+    Returns:
+        tuple[str, ...]: The record key, with null values replaced by empty strings.
+    """
+    return tuple(
+        "" if record[column] is None else str(record[column]) for column in key_columns
+    )
+
+
+class ExternalSorter:
+    """A disk-backed merge sort for records that may not fit in memory.
+
+    Records are serialized and collected in memory until the memory budget is
+    reached. The collected records are then sorted by key and written to a temporary
+    file as a sorted 'run'. Once all records are read, the runs are merged into a
+    single sorted stream. If all records fit within the memory budget, they are
+    sorted in memory and no temporary files are created. The sort is stable, so
+    records with the same key keep the order in which they were read.
+
+    Attributes:
+        key_columns: The names of the columns that identify a record.
+        memory_budget: The maximum number of bytes of serialized records held
+            in memory.
+        run_count: The number of sorted runs written to temporary files.
+        spilled_bytes: The number of bytes written to temporary files.
+    """
+
+    def __init__(self, key_columns: Iterable[str], memory_budget: int = 64 * 1024**2):
+        self.key_columns = tuple(key_columns)
+        self.memory_budget = memory_budget
+        self.run_count = 0
+        self.spilled_bytes = 0
+
+    def _write_run(self, buffer: list[tuple[tuple[str, ...], bytes]]) -> IO[bytes]:
+        buffer.sort(key=lambda item: item[0])
+        run_file = tempfile.TemporaryFile()  # noqa: SIM115
+        for item in buffer:
+            self.spilled_bytes += run_file.write(pickle.dumps(item))
+        run_file.seek(0)
+        self.run_count += 1
+        return run_file
+
+    @staticmethod
+    def _read_run(
+        run_file: IO[bytes],
+    ) -> Generator[tuple[tuple[str, ...], bytes], Any, None]:
+        with run_file:
+            while True:
+                try:
+                    yield pickle.load(run_file)  # noqa: S301
+                except EOFError:
+                    return
+
+    def sort(
+        self, records: Iterable[dict[str, Any]]
+    ) -> Generator[dict[str, Any], Any, None]:
+        """Yield records sorted by key.
+
+        Args:
+            records (Iterable[dict[str, Any]]): Records from the Data Warehouse.
+
+        Yields:
+            Generator[dict[str, Any], Any, None]: Records sorted by key.
+        """
+        buffer: list[tuple[tuple[str, ...], bytes]] = []
+        buffer_size = 0
+        run_files: list[IO[bytes]] = []
+        for record in records:
+            serialized_record = pickle.dumps(record)
+            buffer.append((get_sort_key(record, self.key_columns), serialized_record))
+            buffer_size += len(serialized_record)
+            if buffer_size >= self.memory_budget:
+                run_files.append(self._write_run(buffer))
+                buffer = []
+                buffer_size = 0
+
+        if not run_files:
+            buffer.sort(key=lambda item: item[0])
+            for _, serialized_record in buffer:
+                yield pickle.loads(serialized_record)  # noqa: S301
+            return
+
+        if buffer:
+            run_files.append(self._write_run(buffer))
+        del buffer
+        for _, serialized_record in heapq.merge(
+            *(self._read_run(run_file) for run_file in run_files),
+            key=lambda item: item[0],
+        ):
+            yield pickle.loads(serialized_record)  # noqa: S301
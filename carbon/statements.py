@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import bindparam, text
+
+from carbon.metrics import metrics
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+    from sqlalchemy.engine import Connection, CursorResult, Dialect
+    from sqlalchemy.sql.compiler import SQLCompiler
+    from sqlalchemy.sql.elements import BindParameter, TextClause
+    from sqlalchemy.sql.selectable import Select, TextualSelect
+
+# the oracledb statement cache size: the number of parsed statements each Oracle
+# connection keeps, so repeated page queries skip the server-side parse
+ORACLE_STATEMENT_CACHE_SIZE = 50
+
+
+class StatementCache:
+    """A process-wide cache of feed queries compiled to SQL for each database dialect.
+
+    SQLAlchemy caches compiled statements itself, but it still generates a cache key
+    by walking the statement on every execution and renders the values of 'IN'
+    lists (such as the job titles of the 'people' feed) into the SQL each time.
+    This cache compiles a statement once per dialect, with 'IN' lists expanded to
+    individual bind parameters, and keeps the SQL as a textual select. Executing it
+    again only binds parameters, and as the SQL string never changes, the driver
+    statement cache (see ORACLE_STATEMENT_CACHE_SIZE) can reuse the parsed
+    statement. This benefits keyset pagination, which executes the same query for
+    every page, and daemon runs, which execute the same queries on every run.
+
+    Statements are cached by a key chosen by the caller, which must identify every
+    option that changes the statement. Values that change between executions
+    (e.g. the key after which a page starts) must be explicit bind parameters.
+
+    Hits, misses, and compile times are also added to carbon.metrics.metrics.
+
+    Attributes:
+        hit_count: The number of executions of an already compiled statement.
+        miss_count: The number of statements compiled.
+        compile_seconds: The time spent compiling statements.
+    """
+
+    def __init__(self) -> None:
+        self.hit_count = 0
+        self.miss_count = 0
+        self.compile_seconds = 0.0
+        self._statements: dict[tuple[Any, ...], tuple[TextualSelect, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, dialect: Dialect, key: Hashable, build_statement: Callable[[], Select]
+    ) -> tuple[TextualSelect, dict[str, Any]]:
+        """Get a compiled statement, compiling it if it is not cached yet.
+
+        Args:
+            dialect (Dialect): The dialect of the connection that executes the
+                statement.
+            key (Hashable): The key identifying the statement.
+            build_statement (Callable[[], Select]): A function that creates the
+                statement, called only if it is not cached.
+
+        Returns:
+            tuple[TextualSelect, dict[str, Any]]: The textual statement and the
+                values of its bind parameters.
+        """
+        cache_key = (dialect.name, dialect.driver, key)
+        with self._lock:
+            cached_statement = self._statements.get(cache_key)
+            if cached_statement is not None:
+                self.hit_count += 1
+                metrics.increment("statement_cache_hits_total")
+                return cached_statement
+        start_time = time.perf_counter()
+        statement = build_statement()
+        compiled_statement = statement.compile(
+            dialect=_get_named_dialect(dialect),
+            compile_kwargs={"render_postcompile": True},
+        )
+        text_clause: TextClause = text(str(compiled_statement)).bindparams(
+            *_get_typed_parameters(compiled_statement)
+        )
+        cached_statement = (
+            text_clause.columns(*statement.selected_columns),
+            dict(compiled_statement.params),
+        )
+        compile_seconds = time.perf_counter() - start_time
+        with self._lock:
+            self.miss_count += 1
+            self.compile_seconds += compile_seconds
+            self._statements[cache_key] = cached_statement
+        metrics.increment("statement_cache_misses_total")
+        metrics.observe("statement_compile_seconds", compile_seconds)
+        return cached_statement
+
+    def execute(
+        self,
+        connection: Connection,
+        key: Hashable,
+        build_statement: Callable[[], Select],
+        parameters: dict[str, Any] | None = None,
+    ) -> CursorResult:
+        """Execute a statement, compiling it only the first time for each dialect.
+
+        Args:
+            connection (Connection): The database connection.
+            key (Hashable): The key identifying the statement.
+            build_statement (Callable[[], Select]): A function that creates the
+                statement, called only if it is not cached.
+            parameters (dict[str, Any] | None, optional): Values of explicit bind
+                parameters of the statement. Defaults to None.
+
+        Returns:
+            CursorResult: The result of the statement.
+        """
+        statement, statement_parameters = self.get(
+            connection.dialect, key, build_statement
+        )
+        return connection.execute(
+            statement, {**statement_parameters, **(parameters or {})}
+        )
+
+    def clear(self) -> None:
+        """Remove all compiled statements and reset the statistics."""
+        with self._lock:
+            self._statements.clear()
+            self.hit_count = 0
+            self.miss_count = 0
+            self.compile_seconds = 0.0
+
+
+def _get_named_dialect(dialect: Dialect) -> Dialect:
+    # the compiled SQL is parsed again by sqlalchemy.text, which only understands
+    # named (':name') parameters; positional dialects such as SQLite ('?') render
+    # the textual statement back to their own parameter style when it is executed
+    if dialect.paramstyle == "named":
+        return dialect
+    named_dialect = copy.copy(dialect)
+    named_dialect.paramstyle = "named"
+    named_dialect.positional = False
+    return named_dialect
+
+
+def _get_typed_parameters(compiled_statement: SQLCompiler) -> list[BindParameter]:
+    # keep the type of each parameter (e.g. DateTime), so values are processed as
+    # they are for the original statement; the parameters of an expanded 'IN' list
+    # are named '<parameter>_<position>' and have the type of the list parameter
+    parameters = []
+    for name in compiled_statement.params:
+        bind = compiled_statement.binds.get(name)
+        if bind is None:
+            bind = compiled_statement.binds.get(name.rsplit("_", 1)[0])
+        if bind is not None:
+            parameters.append(bindparam(name, type_=bind.type))
+    return parameters
+
+
+statement_cache = StatementCache()
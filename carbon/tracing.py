@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+import sentry_sdk
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from sentry_sdk.tracing import Span
+
+logger = logging.getLogger(__name__)
+
+
+class TraceSpan:
+    """A timed operation in a Carbon run.
+
+    Attributes:
+        name: The name of the operation (e.g. "db.execute").
+        span_id: A random 16-character hexadecimal ID.
+        parent_span_id: The ID of the enclosing span, or an empty string for the
+            root span.
+        thread_name: The name of the thread that started the span.
+        start_time_ns: The start time, in nanoseconds since the epoch.
+        end_time_ns: The end time, in nanoseconds since the epoch, once ended.
+        attributes: Values describing the operation (e.g. {"records": 1000}).
+        error: The error that ended the span, if any.
+        sentry_span: The matching Sentry span, if spans are sent to Sentry.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        parent_span_id: str = "",
+        attributes: dict[str, Any] | None = None,
+        sentry_span: Span | None = None,
+    ):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.thread_name = threading.current_thread().name
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns = 0
+        self.attributes = attributes or {}
+        self.error: str | None = None
+        self.sentry_span = sentry_span
+
+    def set_attribute(self, key: str, value: Any) -> None:  # noqa: ANN401
+        """Add a value describing the operation."""
+        self.attributes[key] = value
+        if self.sentry_span:
+            self.sentry_span.set_data(key, value)
+
+
+class Tracer:
+    """A collector of spans describing where time goes in a Carbon run.
+
+    Tracing is off until 'start' is called, and starting a span is then a no-op
+    that returns None, so instrumented code costs a single attribute check.
+
+    Once started, spans started in any thread are children of the innermost span
+    still open in the same thread, or of the root span. Spans started in the FTP
+    upload thread are therefore siblings of the spans of the feed, which shows how
+    the producer and the upload overlap. If Sentry is initialized (see
+    carbon.config.Config.configure_sentry), spans are sent to Sentry as a
+    transaction; otherwise they are written to a local JSON file in the
+    OpenTelemetry (OTLP) format, which can be loaded into Jaeger or Perfetto.
+
+    Attributes:
+        enabled: Whether spans are collected.
+        output_path: The path to the JSON trace file, if spans are not sent
+            to Sentry.
+        trace_id: A random 32-character hexadecimal ID for the run.
+        spans: The spans that have ended, in the order they ended.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.output_path: str | None = None
+        self.trace_id = ""
+        self.spans: list[TraceSpan] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._root_span: TraceSpan | None = None
+
+    def start(self, name: str, output_path: str | None = None) -> None:
+        """Start collecting spans under a root span.
+
+        Args:
+            name (str): The name of the root span (e.g. "carbon.people").
+            output_path (str | None, optional): The path to the JSON trace file
+                written by 'finish' if Sentry is not initialized. Defaults to None.
+        """
+        self.output_path = output_path
+        self.trace_id = os.urandom(16).hex()
+        self.spans = []
+        self._local = threading.local()
+        sentry_transaction = (
+            sentry_sdk.start_transaction(op="carbon.run", name=name)
+            if sentry_sdk.get_client().is_active()
+            else None
+        )
+        self._root_span = TraceSpan(name, sentry_span=sentry_transaction)
+        self.enabled = True
+
+    def _get_open_spans(self) -> list[TraceSpan]:
+        if not hasattr(self._local, "open_spans"):
+            self._local.open_spans = []
+        return self._local.open_spans
+
+    def start_span(
+        self, name: str, **attributes: Any  # noqa: ANN401
+    ) -> TraceSpan | None:
+        """Start a span, if tracing is enabled.
+
+        Args:
+            name (str): The name of the operation.
+            **attributes: Values describing the operation.
+
+        Returns:
+            TraceSpan | None: The span, to be passed to 'end_span', or None if
+                tracing is not enabled.
+        """
+        if not self.enabled:
+            return None
+        open_spans = self._get_open_spans()
+        parent_span = open_spans[-1] if open_spans else self._root_span
+        sentry_span = None
+        if parent_span and parent_span.sentry_span:
+            sentry_span = parent_span.sentry_span.start_child(op=name, name=name)
+            for key, value in attributes.items():
+                sentry_span.set_data(key, value)
+        span = TraceSpan(
+            name,
+            parent_span_id=parent_span.span_id if parent_span else "",
+            attributes=attributes,
+            sentry_span=sentry_span,
+        )
+        open_spans.append(span)
+        return span
+
+    def end_span(
+        self, span: TraceSpan | None, error: BaseException | None = None
+    ) -> None:
+        """End a span returned by 'start_span'.
+
+        Args:
+            span (TraceSpan | None): The span. If None, nothing is done.
+            error (BaseException | None, optional): The error that ended the span.
+                Defaults to None.
+        """
+        if span is None:
+            return
+        span.end_time_ns = time.time_ns()
+        if error is not None:
+            span.error = repr(error)
+        if span.sentry_span:
+            if error is not None:
+                span.sentry_span.set_status("internal_error")
+            span.sentry_span.finish()
+        open_spans = self._get_open_spans()
+        if span in open_spans:
+            open_spans.remove(span)
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(
+        self, name: str, **attributes: Any  # noqa: ANN401
+    ) -> Generator[TraceSpan | None, None, None]:
+        """Trace the code run within the context as a span."""
+        span = self.start_span(name, **attributes)
+        try:
+            yield span
+        except BaseException as error:
+            self.end_span(span, error=error)
+            raise
+        self.end_span(span)
+
+    def finish(self) -> None:
+        """End the root span, then send the trace to Sentry or write the trace file.
+
+        Failing to write the trace file is logged but does not fail the run.
+        """
+        if not self.enabled or self._root_span is None:
+            return
+        self.enabled = False
+        root_span = self._root_span
+        root_span.end_time_ns = time.time_ns()
+        self.spans.append(root_span)
+        if root_span.sentry_span:
+            root_span.sentry_span.finish()
+            logger.info("Sent %s trace spans to Sentry", len(self.spans))
+        elif self.output_path:
+            try:
+                with open(self.output_path, "w") as trace_file:
+                    json.dump(self.format_otlp(), trace_file)
+            except OSError:
+                logger.exception("Failed to write trace to '%s'", self.output_path)
+                return
+            logger.info("Wrote %s trace spans to '%s'", len(self.spans), self.output_path)
+
+    def format_otlp(self) -> dict[str, Any]:
+        """Format the spans as an OTLP/JSON 'ExportTraceServiceRequest'."""
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [_format_otlp_attribute("service.name", "carbon")]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "carbon.tracing"},
+                            "spans": [
+                                self._format_otlp_span(span) for span in self.spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def _format_otlp_span(self, span: TraceSpan) -> dict[str, Any]:
+        otlp_span = {
+            "traceId": self.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_time_ns),
+            "endTimeUnixNano": str(span.end_time_ns),
+            "attributes": [
+                _format_otlp_attribute("thread.name", span.thread_name),
+                *(
+                    _format_otlp_attribute(key, value)
+                    for key, value in span.attributes.items()
+                ),
+            ],
+            "status": {"code": 0},
+        }
+        if span.error:
+            otlp_span["status"] = {"code": 2, "message": span.error}
+        return otlp_span
+
+
+def _format_otlp_attribute(key: str, value: Any) -> dict[str, Any]:  # noqa: ANN401
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+tracer = Tracer()
@@ -0,0 +1,151 @@
+import time
+from typing import Any
+
+from lxml import etree as ET
+
+ARTICLE_SCHEMA = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:simpleType name="requiredString">
+    <xs:restriction base="xs:string">
+      <xs:minLength value="1"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:element name="ARTICLE">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="AA_MATCH_SCORE" type="xs:decimal"/>
+        <xs:element name="ARTICLE_ID" type="requiredString"/>
+        <xs:element name="ARTICLE_TITLE" type="requiredString"/>
+        <xs:element name="ARTICLE_YEAR" type="xs:string"/>
+        <xs:element name="AUTHORS" type="xs:string"/>
+        <xs:element name="DOI" type="requiredString"/>
+        <xs:element name="ISSN_ELECTRONIC" type="xs:string"/>
+        <xs:element name="ISSN_PRINT" type="xs:string"/>
+        <xs:element name="IS_CONFERENCE_PROCEEDING" type="xs:string"/>
+        <xs:element name="JOURNAL_FIRST_PAGE" type="xs:string"/>
+        <xs:element name="JOURNAL_LAST_PAGE" type="xs:string"/>
+        <xs:element name="JOURNAL_ISSUE" type="xs:string"/>
+        <xs:element name="JOURNAL_VOLUME" type="xs:string"/>
+        <xs:element name="JOURNAL_NAME" type="xs:string"/>
+        <xs:element name="MIT_ID" type="requiredString"/>
+        <xs:element name="PUBLISHER" type="xs:string"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
+# XSD 1.0 cannot tie the content of a 'field' to its 'name' attribute, so the schema
+# checks that each of the expected fields appears exactly once
+PEOPLE_RECORD_SCHEMA = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:simpleType name="fieldName">
+    <xs:restriction base="xs:string">
+      <xs:enumeration value="[Proprietary_ID]"/>
+      <xs:enumeration value="[Username]"/>
+      <xs:enumeration value="[Initials]"/>
+      <xs:enumeration value="[LastName]"/>
+      <xs:enumeration value="[FirstName]"/>
+      <xs:enumeration value="[Email]"/>
+      <xs:enumeration value="[AuthenticatingAuthority]"/>
+      <xs:enumeration value="[IsAcademic]"/>
+      <xs:enumeration value="[IsCurrent]"/>
+      <xs:enumeration value="[LoginAllowed]"/>
+      <xs:enumeration value="[PrimaryGroupDescriptor]"/>
+      <xs:enumeration value="[ArriveDate]"/>
+      <xs:enumeration value="[LeaveDate]"/>
+      <xs:enumeration value="[Generic01]"/>
+      <xs:enumeration value="[Generic02]"/>
+      <xs:enumeration value="[Generic03]"/>
+      <xs:enumeration value="[Generic04]"/>
+      <xs:enumeration value="[Generic05]"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:element name="record">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="field" minOccurs="18" maxOccurs="18">
+          <xs:complexType>
+            <xs:simpleContent>
+              <xs:extension base="xs:string">
+                <xs:attribute name="name" type="fieldName" use="required"/>
+              </xs:extension>
+            </xs:simpleContent>
+          </xs:complexType>
+        </xs:element>
+      </xs:sequence>
+    </xs:complexType>
+    <xs:unique name="uniqueFieldName">
+      <xs:selector xpath="field"/>
+      <xs:field xpath="@name"/>
+    </xs:unique>
+  </xs:element>
+</xs:schema>
+"""
+
+
+class FeedValidationError(Exception):
+    """Raised when a record XML element does not match the schema for its feed."""
+
+
+class RecordValidator:
+    """A validator that checks record XML elements against an XML schema.
+
+    The validator is applied to each record element (e.g. 'ARTICLE' or 'record')
+    as it is generated, so the feed document is never buffered in memory. To reduce
+    the cost of validation for production runs, a sample rate can be provided;
+    records are then validated at a fixed interval (e.g. every tenth record for
+    a sample rate of 0.1), starting with the first record.
+
+    Attributes:
+        schema: The XML schema (XSD) that record elements are validated against.
+        sample_rate: The fraction of records that are validated, where 1.0 validates
+            every record.
+        checked_record_count: The number of records passed to the validator.
+        validated_record_count: The number of records validated against the schema.
+        validation_seconds: The time spent validating records.
+    """
+
+    def __init__(self, schema: str, sample_rate: float = 1.0):
+        if not 0 < sample_rate <= 1:
+            msg = f"Validation sample rate must be in (0, 1], got {sample_rate}"
+            raise ValueError(msg)
+        self.schema = ET.XMLSchema(ET.fromstring(schema.encode()))
+        self.sample_rate = sample_rate
+        self.checked_record_count = 0
+        self.validated_record_count = 0
+        self.validation_seconds = 0.0
+        self._sample_interval = max(1, round(1 / sample_rate))
+
+    def validate(self, element: ET._Element) -> None:
+        """Validate a record XML element if it is part of the sample.
+
+        Args:
+            element (ET._Element): A record XML element.
+
+        Raises:
+            FeedValidationError: If the element does not match the schema.
+        """
+        record_number = self.checked_record_count
+        self.checked_record_count += 1
+        if record_number % self._sample_interval:
+            return
+
+        start_time = time.perf_counter()
+        is_valid = self.schema.validate(element)
+        self.validation_seconds += time.perf_counter() - start_time
+        self.validated_record_count += 1
+        if not is_valid:
+            msg = (
+                f"Record {record_number + 1} does not match the feed schema: "
+                f"{self.schema.error_log.last_error}"  # type: ignore[attr-defined]
+            )
+            raise FeedValidationError(msg)
+
+    @property
+    def summary(self) -> dict[str, Any]:
+        """Statistics describing the records validated and the cost of validation."""
+        return {
+            "validated_records": self.validated_record_count,
+            "validation_seconds": round(self.validation_seconds, 3),
+        }
@@ -27,7 +27,7 @@ setup(
     license=mit_license,
     author="Mike Graves",
     author_email="mgraves@mit.edu",
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "benchmarks"]),
     install_requires=[],
     entry_points={
         "console_scripts": [
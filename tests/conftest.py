@@ -1,18 +1,21 @@
+import hashlib
 import os
 import socket
 import tempfile
 import threading
 from contextlib import closing
+from io import BytesIO
 
 import botocore
 import pytest
 import yaml
-from botocore.stub import Stubber
+from botocore.stub import ANY, Stubber
 from lxml.builder import ElementMaker
 from pyftpdlib.authorizers import DummyAuthorizer
 from pyftpdlib.handlers import TLS_FTPHandler
 from pyftpdlib.servers import FTPServer
 
+from carbon.app import FileWriter
 from carbon.config import Config
 from carbon.database import DatabaseEngine, aa_articles, dlcs, metadata, orcids, persons
 
@@ -269,7 +272,36 @@ def feed_type(request, monkeypatch):
 
 
 # AWS stubs for mocking cli requests
-def setup_stubbed_sns_client(actions):
+class RunSummaryMessage:
+    """Match an SNS message whose run summary has the expected 'key=value' pairs.
+
+    The pairs are compared in any order, and values given as botocore.stub.ANY
+    (e.g. timing fields) match any value.
+    """
+
+    __hash__ = None
+
+    def __init__(self, message, run_summary):
+        self.message = message
+        self.run_summary = run_summary
+
+    def __eq__(self, other):
+        """Compare the message text and the run summary of a published message."""
+        message, separator, run_summary = other.partition(" Run summary: ")
+        if message != self.message or not separator or not run_summary.endswith("."):
+            return False
+        pairs = dict(pair.split("=", 1) for pair in run_summary[:-1].split(", "))
+        return pairs == {
+            key: value if value is ANY else str(value)
+            for key, value in self.run_summary.items()
+        }
+
+    def __repr__(self):
+        """Show the expected message in stub assertion errors."""
+        return f"{self.message} Run summary: {self.run_summary!r}."
+
+
+def setup_stubbed_sns_client(actions, run_summary=None):
     feed = os.environ.get("FEED_TYPE", "")
     stage = os.environ.get("SYMPLECTIC_FTP_PATH", "").lstrip("/").split("/")[0]
     request_response_payloads = {
@@ -289,8 +321,16 @@ def setup_stubbed_sns_client(actions):
                 "TopicArn": "arn:aws:sns:us-east-1:123456789012:test_sns_topic",
                 "Subject": "Carbon run",
                 "Message": (
-                    f"[2023-08-18T00:00:00+00:00] Finished carbon run for the "
-                    f"{feed} feed in the {stage} environment."
+                    RunSummaryMessage(
+                        f"[2023-08-18T00:00:00+00:00] Finished carbon run for the "
+                        f"{feed} feed in the {stage} environment.",
+                        run_summary,
+                    )
+                    if run_summary
+                    else (
+                        f"[2023-08-18T00:00:00+00:00] Finished carbon run for the "
+                        f"{feed} feed in the {stage} environment."
+                    )
                 ),
             },
             {"MessageId": "SuccessMessageId"},
@@ -324,35 +364,36 @@ def setup_stubbed_sns_client(actions):
 
 
 @pytest.fixture
-def stubbed_sns_client_start():
-    sns_client, stubber = setup_stubbed_sns_client(["start"])
-    with stubber:
-        yield sns_client
-
-
-@pytest.fixture
-def stubbed_sns_client_success():
-    sns_client, stubber = setup_stubbed_sns_client(["success"])
-    with stubber:
-        yield sns_client
-
-
-@pytest.fixture
-def stubbed_sns_client_fail():
-    sns_client, stubber = setup_stubbed_sns_client(["fail"])
+def stubbed_sns_client_start_success():
+    sns_client, stubber = setup_stubbed_sns_client(["start", "success"])
     with stubber:
         yield sns_client
 
 
 @pytest.fixture
-def stubbed_sns_client_start_success():
-    sns_client, stubber = setup_stubbed_sns_client(["start", "success"])
+def stubbed_sns_client_start_fail():
+    sns_client, stubber = setup_stubbed_sns_client(["start", "fail"])
     with stubber:
         yield sns_client
 
 
 @pytest.fixture
-def stubbed_sns_client_start_fail():
-    sns_client, stubber = setup_stubbed_sns_client(["start", "fail"])
+def stubbed_sns_client_start_success_with_summary(feed_type, functional_engine):
+    feed = FileWriter(engine=functional_engine, output_file=BytesIO())
+    feed.write(feed_type)
+    content = feed.output_file.getvalue()
+    sns_client, stubber = setup_stubbed_sns_client(
+        ["start", "success"],
+        run_summary={
+            "records": feed.summary["records"],
+            "uploaded_bytes": len(content),
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "remote_size": len(content),
+            "remote_sha256_verified": False,
+            "elapsed_seconds": ANY,
+        },
+    )
     with stubber:
         yield sns_client
+    # the notifier swallows errors from the stub, so check every message was sent
+    stubber.assert_no_pending_responses()
@@ -1,11 +1,29 @@
+import hashlib
 import os
+import threading
+from contextlib import closing
+from ftplib import error_perm
 from io import BytesIO
+from unittest.mock import patch
 
 import pytest
 from lxml import etree as ET
+from sqlalchemy.dialects import oracle
+from sqlalchemy.exc import DataError, OperationalError
 
-from carbon.app import ConcurrentFtpFileWriter, FileWriter, FtpFile
+from carbon.app import (
+    CarbonFtpsTls,
+    ConcurrentFtpFileWriter,
+    DatabaseToFtpPipe,
+    FileWriter,
+    FtpFile,
+    FtpSession,
+    FtpVerificationError,
+)
+from carbon.buffer import SpillBuffer
+from carbon.database import DatabaseEngine, orcids
 from carbon.feed import ArticlesXmlFeed, PeopleXmlFeed
+from carbon.metrics import metrics
 
 pytestmark = pytest.mark.usefixtures("_load_data")
 symplectic_elements_namespace = "http://www.symplectic.co.uk/hrimporter"
@@ -31,6 +49,75 @@ def test_concurrent_ftp_file_writer_creates_people_xml_file(reader, functional_e
     assert people_first_names_xpath[1].text == "Þorgerðr"
 
 
+def test_concurrent_ftp_file_writer_raises_upload_error(functional_engine):
+    class FailingUpload:
+        def __init__(self, content_feed):
+            self.content_feed = content_feed
+
+        def __call__(self):
+            self.content_feed.read(1)
+            message = "550 Permission denied"
+            raise error_perm(message)
+
+    def run_large_feed(feed, **_kwargs):
+        # more data than the pipe holds, so the feed blocks unless the upload
+        # closes the pipe when it fails
+        feed.output_file.write(b"x" * 1024**2)
+
+    read_file, write_file = os.pipe()
+    with open(read_file, "rb") as buffered_reader, open(
+        write_file, "wb"
+    ) as buffered_writer, patch.object(PeopleXmlFeed, "run", run_large_feed):
+        ftp_file_writer = ConcurrentFtpFileWriter(
+            engine=functional_engine,
+            input_file=buffered_writer,
+            ftp_output_file=FailingUpload(buffered_reader),
+        )
+        with pytest.raises(error_perm, match="550"):
+            ftp_file_writer.write("people")
+
+
+@pytest.mark.parametrize("buffered", [False, True])
+def test_concurrent_ftp_file_writer_raises_feed_error(functional_engine, buffered):
+    class DrainingUpload:
+        def __init__(self, content_feed):
+            self.content_feed = content_feed
+
+        def __call__(self):
+            while self.content_feed.read(64 * 1024):
+                pass
+
+    def fail_mid_stream(feed, **_kwargs):
+        feed.output_file.write(b"x" * 1024**2)
+        raise OperationalError("SELECT", {}, Exception("ORA-03113"))  # noqa: EM101
+
+    if buffered:
+        input_file = reader = SpillBuffer(memory_limit=1024)
+    else:
+        read_file, write_file = os.pipe()
+        reader, input_file = open(read_file, "rb"), open(write_file, "wb")  # noqa: SIM115
+    errors = []
+
+    def write():
+        ftp_file_writer = ConcurrentFtpFileWriter(
+            engine=functional_engine,
+            input_file=input_file,
+            ftp_output_file=DrainingUpload(reader),
+        )
+        try:
+            ftp_file_writer.write("people")
+        except OperationalError as error:
+            errors.append(error)
+
+    with patch.object(PeopleXmlFeed, "run", fail_mid_stream):
+        thread = threading.Thread(target=write, daemon=True)
+        thread.start()
+        thread.join(timeout=10)
+    reader.close()
+    assert not thread.is_alive()
+    assert "ORA-03113" in str(errors[0])
+
+
 def test_file_writer_creates_people_xml_file(functional_engine):
     file_writer = FileWriter(engine=functional_engine, output_file=BytesIO())
     file_writer.write("people")
@@ -57,6 +144,240 @@ def test_ftp_file_uploads_file_to_server(ftp_server_wrapper):
         assert file.read() == "File uploaded to FTP server."
 
 
+def test_ftp_file_verifies_uploaded_file(ftp_server_wrapper):
+    ftp_socket, _ = ftp_server_wrapper
+    content = b"File uploaded to FTP server."
+    metrics.reset()
+    ftp_file = FtpFile(
+        content_feed=BytesIO(content),
+        user="user",
+        password="pass",  # noqa: S106
+        path="/DEV",
+        port=ftp_socket[1],
+    )
+    ftp_file()
+    assert ftp_file.summary == {
+        "uploaded_bytes": len(content),
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "remote_size": len(content),
+        "remote_sha256_verified": False,
+    }
+    assert metrics.counters["ftp_uploaded_bytes_total"] == len(content)
+
+
+def test_ftp_file_raises_error_if_remote_size_differs(ftp_server_wrapper):
+    ftp_socket, _ = ftp_server_wrapper
+    ftp_file = FtpFile(
+        content_feed=BytesIO(b"File uploaded to FTP server."),
+        user="user",
+        password="pass",  # noqa: S106
+        path="/DEV",
+        port=ftp_socket[1],
+    )
+    with patch.object(CarbonFtpsTls, "size", return_value=1), pytest.raises(
+        FtpVerificationError, match="has 1 bytes, but 28 bytes were sent"
+    ):
+        ftp_file()
+
+
+def test_ftp_file_verifies_over_new_connection_after_timeout(caplog, ftp_server_wrapper):
+    ftp_socket, _ = ftp_server_wrapper
+    storbinary = CarbonFtpsTls.storbinary
+
+    def storbinary_with_timeout(self, *args, **kwargs):
+        storbinary(self, *args, **kwargs)
+        raise TimeoutError
+
+    ftp_file = FtpFile(
+        content_feed=BytesIO(b"File uploaded to FTP server."),
+        user="user",
+        password="pass",  # noqa: S106
+        path="/DEV",
+        port=ftp_socket[1],
+    )
+    with patch.object(CarbonFtpsTls, "storbinary", storbinary_with_timeout):
+        ftp_file()
+    assert "Verifying the uploaded file over a new connection" in caplog.text
+    assert ftp_file.summary["remote_size"] == 28  # noqa: PLR2004
+
+
+def test_ftp_file_reconnects_session_after_timeout(ftp_server_wrapper):
+    ftp_socket, _ = ftp_server_wrapper
+    storbinary = CarbonFtpsTls.storbinary
+
+    def storbinary_with_timeout(self, *args, **kwargs):
+        storbinary(self, *args, **kwargs)
+        raise TimeoutError
+
+    ftp_session = FtpSession("user", "pass", port=ftp_socket[1])
+    ftp_file = FtpFile(
+        content_feed=BytesIO(b"File uploaded to FTP server."),
+        user="user",
+        password="pass",  # noqa: S106
+        path="/DEV",
+        port=ftp_socket[1],
+        session=ftp_session,
+    )
+    with patch.object(CarbonFtpsTls, "storbinary", storbinary_with_timeout):
+        ftp_file()
+    ftp_session.close()
+    assert ftp_session.connect_count == 2  # noqa: PLR2004
+    assert ftp_file.summary["remote_size"] == 28  # noqa: PLR2004
+
+
+def test_ftp_file_skips_size_check_if_size_is_not_supported(caplog, ftp_server_wrapper):
+    ftp_socket, _ = ftp_server_wrapper
+    ftp_file = FtpFile(
+        content_feed=BytesIO(b"File uploaded to FTP server."),
+        user="user",
+        password="pass",  # noqa: S106
+        path="/DEV",
+        port=ftp_socket[1],
+    )
+    with patch.object(
+        CarbonFtpsTls, "size", side_effect=error_perm("502 Command not implemented.")
+    ):
+        ftp_file()
+    assert ftp_file.summary["remote_size"] is None
+    assert "does not support SIZE" in caplog.text
+
+
+def test_ftp_file_atomic_upload_renames_file_into_place(ftp_server_wrapper):
+    ftp_socket, ftp_directory = ftp_server_wrapper
+    with open(os.path.join(ftp_directory, "DEV"), "w") as file:
+        file.write("Previous file.")
+    ftp_file = FtpFile(
+        content_feed=BytesIO(b"File uploaded to FTP server."),
+        user="user",
+        password="pass",  # noqa: S106
+        path="/DEV",
+        port=ftp_socket[1],
+        atomic=True,
+    )
+    ftp_file()
+    assert os.listdir(ftp_directory) == ["DEV"]
+    with open(os.path.join(ftp_directory, "DEV")) as file:
+        assert file.read() == "File uploaded to FTP server."
+    assert "rename_seconds" in ftp_file.summary
+
+
+def test_ftp_file_atomic_upload_deletes_file_if_rename_fails(caplog, ftp_server_wrapper):
+    ftp_socket, ftp_directory = ftp_server_wrapper
+    with open(os.path.join(ftp_directory, "DEV"), "w") as file:
+        file.write("Previous file.")
+    voidcmd = CarbonFtpsTls.voidcmd
+    failures = [error_perm("550 File exists")]
+
+    def rnto_once_fails(self, cmd):
+        if cmd.startswith("RNTO") and failures:
+            raise failures.pop()
+        return voidcmd(self, cmd)
+
+    ftp_file = FtpFile(
+        content_feed=BytesIO(b"File uploaded to FTP server."),
+        user="user",
+        password="pass",  # noqa: S106
+        path="/DEV",
+        port=ftp_socket[1],
+        atomic=True,
+    )
+    with patch.object(CarbonFtpsTls, "voidcmd", rnto_once_fails):
+        ftp_file()
+    assert "Failed to rename '/DEV.part' to '/DEV'" in caplog.text
+    with open(os.path.join(ftp_directory, "DEV")) as file:
+        assert file.read() == "File uploaded to FTP server."
+
+
+def test_ftp_file_atomic_upload_keeps_file_if_rnfr_fails(ftp_server_wrapper):
+    ftp_socket, ftp_directory = ftp_server_wrapper
+    with open(os.path.join(ftp_directory, "DEV"), "w") as file:
+        file.write("Previous file.")
+    sendcmd = CarbonFtpsTls.sendcmd
+
+    def rnfr_fails(self, cmd):
+        if cmd.startswith("RNFR"):
+            message = "550 Permission denied"
+            raise error_perm(message)
+        return sendcmd(self, cmd)
+
+    ftp_file = FtpFile(
+        content_feed=BytesIO(b"File uploaded to FTP server."),
+        user="user",
+        password="pass",  # noqa: S106
+        path="/DEV",
+        port=ftp_socket[1],
+        atomic=True,
+    )
+    with patch.object(CarbonFtpsTls, "sendcmd", rnfr_fails), pytest.raises(
+        error_perm, match="Permission denied"
+    ):
+        ftp_file()
+    with open(os.path.join(ftp_directory, "DEV")) as file:
+        assert file.read() == "Previous file."
+
+
+def test_ftp_file_atomic_upload_raises_if_rnto_fails_without_file(ftp_server_wrapper):
+    ftp_socket, ftp_directory = ftp_server_wrapper
+    voidcmd = CarbonFtpsTls.voidcmd
+
+    def rnto_fails(self, cmd):
+        if cmd.startswith("RNTO"):
+            message = "553 Not allowed"
+            raise error_perm(message)
+        return voidcmd(self, cmd)
+
+    ftp_file = FtpFile(
+        content_feed=BytesIO(b"File uploaded to FTP server."),
+        user="user",
+        password="pass",  # noqa: S106
+        path="/DEV",
+        port=ftp_socket[1],
+        atomic=True,
+    )
+    with patch.object(CarbonFtpsTls, "voidcmd", rnto_fails), patch.object(
+        CarbonFtpsTls, "delete"
+    ) as delete, pytest.raises(error_perm, match="Not allowed"):
+        ftp_file()
+    delete.assert_not_called()
+    assert os.listdir(ftp_directory) == ["DEV.part"]
+
+
+def test_database_to_ftp_pipe_spools_feed_before_upload(
+    config, ftp_server_wrapper, functional_engine, monkeypatch
+):
+    _, ftp_directory = ftp_server_wrapper
+    monkeypatch.setattr(config, "FEED_TYPE", "articles")
+    monkeypatch.setattr(config, "SYMPLECTIC_FTP_PATH", "/articles.xml")
+    pipe = DatabaseToFtpPipe(config=config, engine=functional_engine, spool=True)
+    pipe.run()
+    assert os.listdir(ftp_directory) == ["articles.xml"]
+    with open(os.path.join(ftp_directory, "articles.xml"), "rb") as file:
+        content = file.read()
+    assert b"<ARTICLES>" in content
+    assert pipe.summary["spool_bytes"] == len(content)
+    assert {"spool_seconds", "upload_seconds", "rename_seconds"} <= set(pipe.summary)
+
+
+@pytest.mark.parametrize(
+    ("responses", "expected_sha256"),
+    [
+        (
+            [
+                "211-Features:\n HASH SHA-1;SHA-256*\n211 End",
+                "200 OK",
+                f"213 SHA-256 0-4 {'a' * 64} /DEV",
+            ],
+            "a" * 64,
+        ),
+        (["211-Features:\n XSHA256\n211 End", f"250 {'B' * 64}"], "b" * 64),
+        (["211-Features:\n SIZE\n211 End"], None),
+    ],
+)
+def test_carbon_ftps_tls_sha256_uses_supported_hash_command(responses, expected_sha256):
+    with patch.object(CarbonFtpsTls, "sendcmd", side_effect=responses):
+        assert CarbonFtpsTls().sha256("/DEV") == expected_sha256
+
+
 def test_people_xml_feed_adds_subelement(functional_engine, people_element_maker):
     people_xml_feed = PeopleXmlFeed(engine=functional_engine, output_file=BytesIO())
     xml = people_element_maker.records(
@@ -125,6 +446,146 @@ def test_people_xml_feed_uses_namespace(functional_engine):
     assert people_element.tag == "{http://www.symplectic.co.uk/hrimporter}records"
 
 
+def test_people_xml_feed_paginates_records_by_mit_id(functional_engine):
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), page_size=1
+    )
+    assert [record["MIT_ID"] for record in people_xml_feed.records] == [
+        "098754",
+        "123456",
+    ]
+    assert people_xml_feed.extraction_page_count == 3  # noqa: PLR2004
+
+
+def test_people_xml_feed_pagination_keeps_rows_with_same_key_together(
+    functional_engine,
+):
+    with closing(functional_engine().connect()) as connection:
+        connection.execute(
+            orcids.insert(), {"MIT_ID": "098754", "ORCID": "http://example.com/3"}
+        )
+        connection.commit()
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), page_size=1
+    )
+    assert [
+        (record["MIT_ID"], record["ORCID"]) for record in people_xml_feed.records
+    ] == [
+        ("098754", "http://example.com/2"),
+        ("098754", "http://example.com/3"),
+        ("123456", "http://example.com/1"),
+    ]
+
+
+@pytest.mark.parametrize("page_size", [None, 1])
+def test_people_xml_feed_limit_fetches_first_records(functional_engine, page_size):
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine,
+        output_file=BytesIO(),
+        sort_strategy="query",
+        page_size=page_size,
+        limit=1,
+    )
+    assert [record["MIT_ID"] for record in people_xml_feed.records] == ["098754"]
+
+
+def test_people_xml_feed_sample_is_deterministic(functional_engine):
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), sample_percent=50
+    )
+    # the buckets of the MIT IDs are 8754 ('098754') and 3456 ('123456')
+    for _ in range(2):
+        assert [record["MIT_ID"] for record in people_xml_feed.records] == ["123456"]
+
+
+def test_xml_feed_sample_uses_ora_hash_on_oracle():
+    articles_xml_feed = ArticlesXmlFeed(
+        engine=DatabaseEngine(), output_file=BytesIO(), sample_percent=1, limit=10
+    )
+    statement = str(articles_xml_feed.build_query().compile(dialect=oracle.dialect()))
+    assert 'ORA_HASH("AA_ARTICLE"."MIT_ID", 9999) < :param_1' in statement
+    assert "FETCH FIRST __[POSTCOMPILE_param_2] ROWS ONLY" in statement
+
+
+@pytest.mark.parametrize(
+    ("sample_percent", "bucket_count"), [(0.001, 1), (0.07, 7), (0.015, 2), (100, 10000)]
+)
+def test_xml_feed_sample_rounds_up_to_whole_buckets(sample_percent, bucket_count):
+    articles_xml_feed = ArticlesXmlFeed(
+        engine=DatabaseEngine(), output_file=BytesIO(), sample_percent=sample_percent
+    )
+    statement = articles_xml_feed.build_query().compile(dialect=oracle.dialect())
+    assert statement.params["param_1"] == bucket_count
+
+
+def test_xml_feed_rejects_invalid_sample_percent():
+    with pytest.raises(ValueError, match="Sample percentage must be in"):
+        PeopleXmlFeed(engine=DatabaseEngine(), output_file=BytesIO(), sample_percent=0)
+
+
+def test_articles_xml_feed_pagination_resumes_after_failed_page(
+    caplog, functional_engine
+):
+    articles_xml_feed = ArticlesXmlFeed(
+        engine=functional_engine,
+        output_file=BytesIO(),
+        page_size=1,
+        retry_backoff=0,
+    )
+    fetch_page = articles_xml_feed._fetch_page  # noqa: SLF001
+    failures = [OperationalError("SELECT", {}, Exception("ORA-01555"))]
+
+    def fail_once(connection, after_key):
+        if after_key is not None and failures:
+            raise failures.pop()
+        return fetch_page(connection, after_key)
+
+    with patch.object(articles_xml_feed, "_fetch_page", side_effect=fail_once):
+        articles_xml_feed.run()
+    assert articles_xml_feed.summary == {
+        "records": 1,
+        "extraction_pages": 2,
+        "extraction_retries": 1,
+        "extraction_backoff_seconds": 0,
+    }
+    assert "Page query failed (ORA-01555), resuming after key" in caplog.text
+
+
+def test_xml_feed_pagination_raises_error_after_max_retries(functional_engine):
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine,
+        output_file=BytesIO(),
+        page_size=1,
+        max_retries=2,
+        retry_backoff=0,
+    )
+    with patch.object(
+        people_xml_feed,
+        "_fetch_page",
+        side_effect=OperationalError("SELECT", {}, Exception("ORA-03113")),
+    ), pytest.raises(OperationalError):
+        list(people_xml_feed.records)
+    assert people_xml_feed.extraction_retry_count == 2  # noqa: PLR2004
+
+
+def test_xml_feed_pagination_raises_non_transient_error_at_once(functional_engine):
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine,
+        output_file=BytesIO(),
+        page_size=1,
+        max_retries=2,
+        retry_backoff=0,
+    )
+    with patch.object(
+        people_xml_feed,
+        "_fetch_page",
+        side_effect=DataError("SELECT", {}, Exception("ORA-01722")),
+    ) as fetch_page, pytest.raises(DataError):
+        list(people_xml_feed.records)
+    fetch_page.assert_called_once()
+    assert people_xml_feed.extraction_retry_count == 0
+
+
 def test_article_xml_feed_adds_subelement(articles_element_maker, functional_engine):
     articles_xml_feed = ArticlesXmlFeed(engine=functional_engine, output_file=BytesIO())
     xml = articles_element_maker.ARTICLES(articles_element_maker.ARTICLE("foobar"))
@@ -0,0 +1,91 @@
+import os
+import threading
+
+import pytest
+
+from carbon.app import DatabaseToFtpPipe
+from carbon.buffer import SpillBuffer
+
+
+def read_all(spill_buffer, size=3):
+    chunks = []
+    while chunk := spill_buffer.read(size):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def test_spill_buffer_keeps_data_in_memory_below_limit():
+    spill_buffer = SpillBuffer(memory_limit=10)
+    spill_buffer.write(b"abcde")
+    spill_buffer.close()
+    assert read_all(spill_buffer) == b"abcde"
+    assert spill_buffer.summary["buffer_spill_count"] == 0
+    assert spill_buffer.summary["buffer_max_memory_bytes"] == 5  # noqa: PLR2004
+
+
+def test_spill_buffer_spills_beyond_limit_and_preserves_order():
+    spill_buffer = SpillBuffer(memory_limit=4)
+    for chunk in (b"abc", b"def", b"ghi"):
+        spill_buffer.write(chunk)
+    assert spill_buffer.read(2) == b"ab"
+    spill_buffer.write(b"jkl")
+    spill_buffer.close()
+    assert read_all(spill_buffer) == b"cdefghijkl"
+    assert spill_buffer.spill_count == 1
+    assert spill_buffer.spilled_bytes == 9  # noqa: PLR2004
+    assert spill_buffer.max_spill_backlog_bytes == 9  # noqa: PLR2004
+    spill_buffer.dispose()
+
+
+def test_spill_buffer_returns_to_memory_after_drain():
+    spill_buffer = SpillBuffer(memory_limit=4)
+    spill_buffer.write(b"abcdef")
+    assert spill_buffer.read() == b"abcdef"
+    spill_buffer.write(b"gh")
+    spill_buffer.close()
+    assert read_all(spill_buffer) == b"gh"
+    assert spill_buffer.spilled_bytes == 6  # noqa: PLR2004
+    assert spill_buffer._spill_write_offset == 0  # noqa: SLF001
+    spill_buffer.dispose()
+
+
+def test_spill_buffer_read_waits_for_writer():
+    spill_buffer = SpillBuffer(memory_limit=16)
+    content = [f"chunk {index}\n".encode() for index in range(1000)]
+
+    def write_content():
+        for chunk in content:
+            spill_buffer.write(chunk)
+        spill_buffer.close()
+
+    writer = threading.Thread(target=write_content)
+    writer.start()
+    assert read_all(spill_buffer, size=7) == b"".join(content)
+    writer.join()
+    spill_buffer.dispose()
+
+
+def test_spill_buffer_write_fails_after_close():
+    spill_buffer = SpillBuffer(memory_limit=16)
+    spill_buffer.write(b"abc")
+    spill_buffer.close()
+    with pytest.raises(ValueError, match="write to closed buffer"):
+        spill_buffer.write(b"def")
+    assert read_all(spill_buffer) == b"abc"
+    spill_buffer.dispose()
+
+
+@pytest.mark.usefixtures("_load_data")
+def test_database_to_ftp_pipe_with_buffer_memory_limit(
+    config, ftp_server_wrapper, functional_engine, monkeypatch
+):
+    _, ftp_directory = ftp_server_wrapper
+    monkeypatch.setattr(config, "FEED_TYPE", "articles")
+    monkeypatch.setattr(config, "SYMPLECTIC_FTP_PATH", "/articles.xml")
+    pipe = DatabaseToFtpPipe(
+        config=config, engine=functional_engine, buffer_memory_limit=64
+    )
+    pipe.run()
+    with open(os.path.join(ftp_directory, "articles.xml"), "rb") as file:
+        assert b"<ARTICLES>" in file.read()
+    assert pipe.summary["buffer_max_memory_bytes"] <= 64  # noqa: PLR2004
@@ -1,3 +1,5 @@
+import gzip
+import json
 import os
 from unittest.mock import patch
 
@@ -6,6 +8,7 @@ from click.testing import CliRunner
 from freezegun import freeze_time
 from lxml import etree as ET
 
+from carbon.app import CarbonFtpsTls
 from carbon.cli import DatabaseToFtpPipe, main
 
 
@@ -26,14 +29,14 @@ def test_people_returns_people(
     functional_engine,
     people_element,
     runner,
-    stubbed_sns_client_start_success,
+    stubbed_sns_client_start_success_with_summary,
 ):
     _, ftp_directory = ftp_server
 
     with patch("boto3.client") as mocked_sns_client, patch(
         "carbon.cli.DatabaseEngine"
     ) as mocked_engine:
-        mocked_sns_client.return_value = stubbed_sns_client_start_success
+        mocked_sns_client.return_value = stubbed_sns_client_start_success_with_summary
         mocked_engine.return_value = functional_engine
         result = runner.invoke(main)
         assert result.exit_code == 0
@@ -59,7 +62,7 @@ def test_articles_returns_articles(
     ftp_server,
     functional_engine,
     runner,
-    stubbed_sns_client_start_success,
+    stubbed_sns_client_start_success_with_summary,
 ):
     _, ftp_directory = ftp_server
 
@@ -67,7 +70,7 @@ def test_articles_returns_articles(
         "carbon.cli.DatabaseEngine"
     ) as mocked_engine:
         mocked_engine.return_value = functional_engine
-        mocked_sns_client.return_value = stubbed_sns_client_start_success
+        mocked_sns_client.return_value = stubbed_sns_client_start_success_with_summary
         result = runner.invoke(main)
         assert result.exit_code == 0
 
@@ -91,7 +94,7 @@ def test_file_is_ftped(
     ftp_server,
     functional_engine,
     runner,
-    stubbed_sns_client_start_success,
+    stubbed_sns_client_start_success_with_summary,
 ):
     _, ftp_directory = ftp_server
 
@@ -99,7 +102,7 @@ def test_file_is_ftped(
         "carbon.cli.DatabaseEngine"
     ) as mocked_engine:
         mocked_engine.return_value = functional_engine
-        mocked_sns_client.return_value = stubbed_sns_client_start_success
+        mocked_sns_client.return_value = stubbed_sns_client_start_success_with_summary
         result = runner.invoke(main)
         assert result.exit_code == 0
 
@@ -117,13 +120,11 @@ def test_cli_sns_log_is_ignored_with_flag(
     caplog,
     functional_engine,
     runner,
-    stubbed_sns_client_start_success,
 ):
     with patch("boto3.client") as mocked_sns_client, patch(
         "carbon.cli.DatabaseEngine"
     ) as mocked_engine:
         mocked_engine.return_value = functional_engine
-        mocked_sns_client.return_value = stubbed_sns_client_start_success
         result = runner.invoke(main, ["--ignore_sns_logging"])
         assert result.exit_code == 0
         assert "Carbon run has successfully completed." in caplog.text
@@ -141,16 +142,17 @@ def test_cli_sns_log_publishes_status_message_success(
     caplog,
     functional_engine,
     runner,
-    stubbed_sns_client_start_success,
+    stubbed_sns_client_start_success_with_summary,
 ):
     with patch("boto3.client") as mocked_sns_client, patch(
         "carbon.cli.DatabaseEngine"
     ) as mocked_engine:
         mocked_engine.return_value = functional_engine
-        mocked_sns_client.return_value = stubbed_sns_client_start_success
+        mocked_sns_client.return_value = stubbed_sns_client_start_success_with_summary
         result = runner.invoke(main)
         assert result.exit_code == 0
         assert "Carbon run has successfully completed." in caplog.text
+        assert "Failed to publish message to SNS" not in caplog.text
         mocked_sns_client.assert_called()
 
 
@@ -178,6 +180,191 @@ def test_cli_sns_log_publishes_status_message_fail(
         mocked_sns_client.assert_called()
 
 
+@pytest.mark.parametrize(
+    ("feed_type", "symplectic_ftp_path"), [("people", "/people.xml")], indirect=True
+)
+@pytest.mark.usefixtures("_load_data")
+def test_cli_writes_feed_to_output_file_and_archives(
+    feed_type, symplectic_ftp_path, caplog, functional_engine, runner, tmp_path
+):
+    output_path = tmp_path / "people.xml"
+    archive_path = tmp_path / "people.xml.gz"
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine:
+        mocked_engine.return_value = functional_engine
+        result = runner.invoke(
+            main,
+            [
+                "-o",
+                str(output_path),
+                "--archive_file",
+                str(archive_path),
+                "--ignore_sns_logging",
+            ],
+        )
+        assert result.exit_code == 0
+
+    assert gzip.decompress(archive_path.read_bytes()) == output_path.read_bytes()
+    assert "Sink 'archive_1' wrote" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "options",
+    [["--spool"], ["--buffer_memory_limit", "8"], ["--upload_rate_limit", "2"]],
+)
+def test_cli_rejects_single_destination_options_with_archive_file(
+    options, functional_engine, runner, tmp_path
+):
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine:
+        mocked_engine.return_value = functional_engine
+        result = runner.invoke(
+            main,
+            [
+                "--archive_file",
+                str(tmp_path / "people.xml.gz"),
+                "--ignore_sns_logging",
+                *options,
+            ],
+        )
+    assert result.exit_code == 2  # noqa: PLR2004
+    assert f"{options[0]} cannot be used with --archive_file" in result.output
+
+
+@pytest.mark.parametrize(
+    ("feed_type", "symplectic_ftp_path"), [("people", "/people.xml")], indirect=True
+)
+@pytest.mark.usefixtures("_load_data")
+def test_cli_columnar_mode_writes_same_feed(
+    feed_type, symplectic_ftp_path, functional_engine, runner, tmp_path
+):
+    pytest.importorskip("pyarrow")
+    outputs = []
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine:
+        mocked_engine.return_value = functional_engine
+        for options in ([], ["--columnar_batch_size", "100"]):
+            output_path = tmp_path / f"people-{len(options)}.xml"
+            result = runner.invoke(
+                main, ["-o", str(output_path), "--ignore_sns_logging", *options]
+            )
+            assert result.exit_code == 0
+            outputs.append(output_path.read_bytes())
+
+    assert outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize(
+    ("feed_type", "symplectic_ftp_path"), [("people", "/people.xml")], indirect=True
+)
+@pytest.mark.usefixtures("_load_data")
+def test_cli_quarantines_record_that_cannot_be_transformed(
+    feed_type, symplectic_ftp_path, functional_engine, runner, tmp_path
+):
+    output_path = tmp_path / "people.xml"
+    quarantine_path = tmp_path / "quarantine.jsonl"
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine, patch(
+        "carbon.feed.get_hire_date_string", side_effect=[ValueError("bad date"), "2015"]
+    ):
+        mocked_engine.return_value = functional_engine
+        result = runner.invoke(
+            main,
+            [
+                "-o",
+                str(output_path),
+                "--ignore_sns_logging",
+                "--quarantine_file",
+                str(quarantine_path),
+            ],
+        )
+        assert result.exit_code == 0
+
+    assert output_path.read_bytes().count(b"<record>") == 1
+    (entry,) = (json.loads(line) for line in quarantine_path.read_text().splitlines())
+    assert entry["error"] == "ValueError: bad date"
+
+
+@pytest.mark.parametrize(
+    ("feed_type", "symplectic_ftp_path"), [("people", "/people.xml")], indirect=True
+)
+@pytest.mark.usefixtures("_load_data")
+def test_cli_limit_and_sample_restrict_records(
+    feed_type, symplectic_ftp_path, functional_engine, runner, tmp_path
+):
+    output_path = tmp_path / "people.xml"
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine:
+        mocked_engine.return_value = functional_engine
+        result = runner.invoke(
+            main,
+            [
+                "-o",
+                str(output_path),
+                "--ignore_sns_logging",
+                "--limit",
+                "5",
+                "--sample",
+                "50",
+            ],
+        )
+        assert result.exit_code == 0
+
+    assert output_path.read_bytes().count(b"<record>") == 1
+
+
+@pytest.mark.parametrize(
+    ("feed_type", "symplectic_ftp_path"), [("people", "/people.xml")], indirect=True
+)
+@pytest.mark.usefixtures("_load_data")
+def test_cli_exports_metrics(
+    feed_type, symplectic_ftp_path, functional_engine, runner, tmp_path
+):
+    textfile_path = tmp_path / "carbon.prom"
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine:
+        mocked_engine.return_value = functional_engine
+        result = runner.invoke(
+            main,
+            [
+                "-o",
+                str(tmp_path / "people.xml"),
+                "--metrics_textfile",
+                str(textfile_path),
+                "--ignore_sns_logging",
+            ],
+        )
+        assert result.exit_code == 0
+
+    textfile = textfile_path.read_text()
+    assert 'carbon_records_processed_total{feed_type="people"} 2' in textfile
+    assert 'carbon_last_run_success{feed_type="people"} 1' in textfile
+
+
+@pytest.mark.parametrize(
+    ("feed_type", "symplectic_ftp_path"), [("people", "/people.xml")], indirect=True
+)
+@pytest.mark.usefixtures("_load_data")
+def test_cli_records_run_history(
+    feed_type, symplectic_ftp_path, functional_engine, runner, tmp_path
+):
+    history_path = tmp_path / "history.db"
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine:
+        mocked_engine.return_value = functional_engine
+        for _ in range(2):
+            result = runner.invoke(
+                main,
+                [
+                    "-o",
+                    str(tmp_path / "people.xml"),
+                    "--history_file",
+                    str(history_path),
+                    "--ignore_sns_logging",
+                ],
+            )
+            assert result.exit_code == 0
+
+    result = runner.invoke(main, ["history", str(history_path)])
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert len(lines) == 3  # noqa: PLR2004
+    assert lines[1].split()[1:4] == ["people", "success", "2"]
+
+
 def test_cli_connection_tests_success(caplog, functional_engine, runner):
     with patch("carbon.cli.DatabaseEngine") as mocked_engine:
         mocked_engine.return_value = functional_engine
@@ -188,6 +375,25 @@ def test_cli_connection_tests_success(caplog, functional_engine, runner):
     assert "Successfully connected to the Symplectic Elements FTP server" in caplog.text
 
 
+@pytest.mark.parametrize(
+    ("feed_type", "symplectic_ftp_path"), [("people", "/people.xml")], indirect=True
+)
+@pytest.mark.usefixtures("_load_data")
+def test_cli_upload_reuses_connection_test_session(
+    feed_type, symplectic_ftp_path, ftp_server, functional_engine, runner
+):
+    _, ftp_directory = ftp_server
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine, patch.object(
+        CarbonFtpsTls, "login", autospec=True, side_effect=CarbonFtpsTls.login
+    ) as mocked_login:
+        mocked_engine.return_value = functional_engine
+        result = runner.invoke(main, ["--ignore_sns_logging"])
+        assert result.exit_code == 0
+
+    mocked_login.assert_called_once()
+    assert os.path.exists(os.path.join(ftp_directory, "people.xml"))
+
+
 def test_cli_database_connection_test_fails(caplog, nonfunctional_engine, runner):
     with patch("carbon.cli.DatabaseEngine") as mocked_engine:
         mocked_engine.return_value = nonfunctional_engine
@@ -217,3 +423,140 @@ def test_cli_ftp_connection_test_fails(
         assert result.exit_code == 0
 
     assert "Failed to connect to the Symplectic Elements FTP server" in caplog.text
+
+
+def test_cli_diff_writes_delta_and_counts(runner, tmp_path):
+    old_path, new_path = tmp_path / "old.xml", tmp_path / "new.xml"
+    old_path.write_bytes(
+        b"<ARTICLES><ARTICLE><ARTICLE_ID>1</ARTICLE_ID></ARTICLE></ARTICLES>"
+    )
+    new_path.write_bytes(
+        b"<ARTICLES><ARTICLE><ARTICLE_ID>2</ARTICLE_ID></ARTICLE></ARTICLES>"
+    )
+    result = runner.invoke(main, ["diff", str(old_path), str(new_path)])
+    assert result.exit_code == 0
+    assert "added=1, removed=1, changed=0, unchanged=0" in result.stderr
+    assert ET.XML(result.stdout_bytes).find("added/ARTICLE/ARTICLE_ID").text == "2"
+
+
+def test_cli_diff_reports_invalid_xml_file(runner, tmp_path):
+    old_path, new_path = tmp_path / "old.xml", tmp_path / "new.xml"
+    old_path.write_bytes(b"not xml")
+    new_path.write_bytes(b"<ARTICLES/>")
+    result = runner.invoke(main, ["diff", str(old_path), str(new_path)])
+    assert result.exit_code == 1
+    assert f"'{old_path}' is not a valid XML file" in result.stderr
+
+
+@pytest.mark.parametrize(
+    ("feed_type", "symplectic_ftp_path"), [("people", "/people.xml")], indirect=True
+)
+@pytest.mark.usefixtures("_load_data")
+def test_cli_daemon_runs_feed_on_trigger(
+    feed_type,
+    symplectic_ftp_path,
+    ftp_server_wrapper,
+    functional_engine,
+    runner,
+    tmp_path,
+):
+    _, ftp_directory = ftp_server_wrapper
+    trigger_path, status_path = tmp_path / "run", tmp_path / "status.json"
+    trigger_path.touch()
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine:
+        mocked_engine.return_value = functional_engine
+        result = runner.invoke(
+            main,
+            [
+                "--ignore_sns_logging",
+                "daemon",
+                "--trigger_file",
+                str(trigger_path),
+                "--status_file",
+                str(status_path),
+                "--poll_interval",
+                "0.01",
+                "--max_runs",
+                "1",
+            ],
+        )
+    assert result.exit_code == 0
+    assert os.listdir(ftp_directory) == ["people.xml"]
+    status = json.loads(status_path.read_text())
+    assert status["runs"][0]["status"] == "success"
+    assert status["runs"][0]["summary"]["records"] == 2  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ("feed_type", "symplectic_ftp_path"), [("people", "/people.xml")], indirect=True
+)
+@pytest.mark.usefixtures("_load_data", "ftp_server_wrapper")
+def test_cli_daemon_reuses_one_sns_notifier_for_every_run(
+    feed_type, symplectic_ftp_path, functional_engine, runner, tmp_path
+):
+    trigger_path = tmp_path / "run"
+    trigger_path.touch()
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine, patch(
+        "carbon.cli.SnsNotifier"
+    ) as mocked_notifier:
+        mocked_engine.return_value = functional_engine
+        notifier = mocked_notifier.return_value
+        # trigger a second run when the first one finishes
+        notifier.notify.side_effect = lambda **_: trigger_path.touch()
+        result = runner.invoke(
+            main,
+            [
+                "daemon",
+                "--trigger_file",
+                str(trigger_path),
+                "--poll_interval",
+                "0.01",
+                "--max_runs",
+                "2",
+            ],
+        )
+    assert result.exit_code == 0
+    mocked_notifier.assert_called_once()
+    assert [call.kwargs["status"] for call in notifier.notify.call_args_list] == [
+        "start",
+        "success",
+        "start",
+        "success",
+    ]
+    notifier.close.assert_called_once()
+
+
+def test_cli_daemon_requires_schedule_or_trigger(runner):
+    result = runner.invoke(main, ["daemon"])
+    assert result.exit_code == 2  # noqa: PLR2004
+    assert "requires --schedule or --trigger_file" in result.output
+
+
+@pytest.mark.parametrize(
+    ("feed_type", "symplectic_ftp_path"), [("people", "/people.xml")], indirect=True
+)
+def test_cli_rejects_invalid_upload_rate_limit(
+    feed_type, symplectic_ftp_path, functional_engine, runner
+):
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine:
+        mocked_engine.return_value = functional_engine
+        result = runner.invoke(
+            main, ["--ignore_sns_logging", "--spool", "--upload_rate_limit", "8-18=2"]
+        )
+    assert result.exit_code == 2  # noqa: PLR2004
+    assert "expected 'HH:MM-HH:MM=RATE'" in result.output
+
+
+@pytest.mark.parametrize(
+    ("feed_type", "symplectic_ftp_path"), [("people", "/people.xml")], indirect=True
+)
+def test_cli_rejects_duplicate_rule_without_key_order(
+    feed_type, symplectic_ftp_path, functional_engine, runner
+):
+    with patch("carbon.cli.DatabaseEngine") as mocked_engine:
+        mocked_engine.return_value = functional_engine
+        result = runner.invoke(
+            main, ["--ignore_sns_logging", "--duplicate_rule", "most_complete"]
+        )
+    assert result.exit_code == 2  # noqa: PLR2004
+    assert "--duplicate_rule most_complete requires --sort_strategy" in result.output
@@ -0,0 +1,97 @@
+import json
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from lxml import etree as ET
+
+from carbon import columnar
+from carbon.feed import ArticlesXmlFeed, PeopleXmlFeed
+from carbon.helpers import get_initials
+
+pa = pytest.importorskip("pyarrow")
+
+pytestmark = pytest.mark.usefixtures("_load_data")
+
+
+def _run_feed(feed_class, functional_engine, **kwargs):
+    output_file = BytesIO()
+    feed = feed_class(engine=functional_engine, output_file=output_file, **kwargs)
+    feed.run(nsmap=getattr(feed, "namespace_mapping", None) or {})
+    return output_file.getvalue()
+
+
+@pytest.mark.parametrize(
+    "feed_options",
+    [
+        {},
+        {"sort_strategy": "external"},
+        {"page_size": 1},
+        {"join_mode": "client"},
+    ],
+)
+def test_people_columnar_mode_matches_row_mode(functional_engine, feed_options):
+    assert _run_feed(
+        PeopleXmlFeed, functional_engine, columnar_batch_size=1, **feed_options
+    ) == _run_feed(PeopleXmlFeed, functional_engine, **feed_options)
+
+
+@pytest.mark.parametrize("feed_options", [{}, {"sort_strategy": "external"}])
+def test_articles_columnar_mode_matches_row_mode(functional_engine, feed_options):
+    assert _run_feed(
+        ArticlesXmlFeed, functional_engine, columnar_batch_size=10, **feed_options
+    ) == _run_feed(ArticlesXmlFeed, functional_engine, **feed_options)
+
+
+def test_people_columnar_mode_quarantines_failing_record_of_batch(
+    functional_engine, tmp_path
+):
+    def get_initials(first_names, middle_names):
+        if "Foobar" in first_names.to_pylist():
+            message = "Unexpected name: Foobar"
+            raise ValueError(message)
+        return columnar_get_initials(first_names, middle_names)
+
+    columnar_get_initials = columnar.get_initials
+    quarantine_path = tmp_path / "quarantine.jsonl"
+    with patch("carbon.columnar.get_initials", get_initials):
+        output = _run_feed(
+            PeopleXmlFeed,
+            functional_engine,
+            columnar_batch_size=10,
+            quarantine_path=str(quarantine_path),
+        )
+
+    people_ids = ET.XML(output).xpath(
+        "//s:field[@name='[Proprietary_ID]']/text()",
+        namespaces={"s": "http://www.symplectic.co.uk/hrimporter"},
+    )
+    assert people_ids == ["098754"]
+    entries = [json.loads(line) for line in quarantine_path.read_text().splitlines()]
+    assert len(entries) == 1
+    assert entries[0]["key"] == ["123456"]
+    assert entries[0]["record"]["MIT_ID"] == "123456"
+    assert entries[0]["error"] == "ValueError: Unexpected name: Foobar"
+
+
+def test_columnar_get_initials_matches_row_transform():
+    first_names = ["Foo Bar", "F. Bar-Baz", "Foo-bar", "влад", "Þorgerðr", "", None]
+    middle_names = ["Baz", None, "", "a  b", "Hǫlgabrúðr", "", None]
+    initials = columnar.get_initials(pa.array(first_names), pa.array(middle_names))
+    assert initials.to_pylist() == [
+        get_initials(first_name, middle_name)
+        for first_name, middle_name in zip(first_names, middle_names, strict=True)
+    ]
+
+
+def test_columnar_format_strings_keeps_decimal_scale():
+    schema = columnar.get_arrow_schema(ArticlesXmlFeed.query.selected_columns)
+    batch = next(
+        columnar.batch_records(
+            [{"AA_MATCH_SCORE": 1}, {"AA_MATCH_SCORE": None}], schema, batch_size=10
+        )
+    )
+    assert columnar.format_strings(batch.column("AA_MATCH_SCORE")).to_pylist() == [
+        "1.0",
+        "None",
+    ]
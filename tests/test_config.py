@@ -1,3 +1,4 @@
+import json
 import logging
 
 import pytest
@@ -49,3 +50,47 @@ def test_configure_sentry_env_variable_is_dsn(caplog, monkeypatch):
 
 def test_load_config_values_success(config):
     assert config.FEED_TYPE == "test_feed_type"
+
+
+def test_load_config_extra_ftp_targets(monkeypatch):
+    target = {
+        "SYMPLECTIC_FTP_HOST": "localhost",
+        "SYMPLECTIC_FTP_PORT": "2121",
+        "SYMPLECTIC_FTP_USER": "user",
+        "SYMPLECTIC_FTP_PASS": "pass",
+        "SYMPLECTIC_FTP_PATH": "/people.xml",
+    }
+    monkeypatch.setenv("SYMPLECTIC_FTP_EXTRA_TARGETS_JSON", json.dumps([target]))
+    extra_targets = Config().SYMPLECTIC_FTP_EXTRA_TARGETS
+    assert extra_targets == [target]
+
+
+@pytest.mark.parametrize(
+    ("extra_targets_json", "message"),
+    [
+        ("[{", "is not valid JSON"),
+        ('{"SYMPLECTIC_FTP_HOST": "localhost"}', "must be a JSON list of FTP targets"),
+        ('["localhost"]', "target 1 must be a JSON object"),
+        (
+            '[{"SYMPLECTIC_FTP_HOST": "localhost", "SYMPLECTIC_FTP_PORT": 21}]',
+            (
+                "target 1 is missing SYMPLECTIC_FTP_USER, SYMPLECTIC_FTP_PASS, "
+                "SYMPLECTIC_FTP_PATH"
+            ),
+        ),
+        (
+            (
+                '[{"SYMPLECTIC_FTP_HOST": "localhost", "SYMPLECTIC_FTP_PORT": "ftp", '
+                '"SYMPLECTIC_FTP_USER": "user", "SYMPLECTIC_FTP_PASS": "pass", '
+                '"SYMPLECTIC_FTP_PATH": "/people.xml"}]'
+            ),
+            "target 1 has an invalid SYMPLECTIC_FTP_PORT: 'ftp'",
+        ),
+    ],
+)
+def test_load_config_rejects_malformed_extra_ftp_targets(
+    extra_targets_json, message, monkeypatch
+):
+    monkeypatch.setenv("SYMPLECTIC_FTP_EXTRA_TARGETS_JSON", extra_targets_json)
+    with pytest.raises(ValueError, match=message):
+        Config()
@@ -0,0 +1,123 @@
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from carbon.app import FtpSession
+from carbon.daemon import CarbonDaemon, CronSchedule
+
+
+@pytest.mark.parametrize(
+    ("expression", "after", "expected_next_run"),
+    [
+        (
+            "*/15 * * * *",
+            datetime(2026, 10, 19, 9, 7, 30, tzinfo=UTC),
+            datetime(2026, 10, 19, 9, 15, tzinfo=UTC),
+        ),
+        (
+            "0 2 * * 1-5",
+            datetime(2026, 10, 23, 2, 0, tzinfo=UTC),
+            datetime(2026, 10, 26, 2, 0, tzinfo=UTC),
+        ),
+        (
+            "30 6 1 * 0",
+            datetime(2026, 10, 19, 7, 0, tzinfo=UTC),
+            datetime(2026, 10, 25, 6, 30, tzinfo=UTC),
+        ),
+        (
+            "0 0 * * 7",
+            datetime(2026, 10, 19, 7, 0, tzinfo=UTC),
+            datetime(2026, 10, 25, 0, 0, tzinfo=UTC),
+        ),
+        (
+            "5,10 12 * 11 *",
+            datetime(2026, 10, 19, 7, 0, tzinfo=UTC),
+            datetime(2026, 11, 1, 12, 5, tzinfo=UTC),
+        ),
+    ],
+)
+def test_cron_schedule_next_run(expression, after, expected_next_run):
+    assert CronSchedule(expression).next_run(after) == expected_next_run
+
+
+@pytest.mark.parametrize(
+    "expression", ["* * * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *", "a * * * *"]
+)
+def test_cron_schedule_invalid_expression_raises_error(expression):
+    with pytest.raises(ValueError, match="cron expression"):
+        CronSchedule(expression)
+
+
+def test_cron_schedule_that_never_matches_raises_error():
+    with pytest.raises(ValueError, match="never matches"):
+        CronSchedule("0 0 31 2 *").next_run(datetime(2026, 1, 1, tzinfo=UTC))
+
+
+def test_carbon_daemon_runs_on_trigger_and_writes_status(tmp_path):
+    trigger_path, status_path = tmp_path / "run", tmp_path / "status.json"
+    trigger_path.touch()
+    carbon_daemon = CarbonDaemon(
+        lambda: (True, {"records": 2}),
+        trigger_file=str(trigger_path),
+        status_file=str(status_path),
+        poll_interval=0.01,
+        max_runs=1,
+    )
+    carbon_daemon.run()
+    assert not trigger_path.exists()
+    status = json.loads(status_path.read_text())
+    assert status["state"] == "stopped"
+    assert status["run_count"] == 1
+    assert status["runs"][0]["reason"] == "trigger"
+    assert status["runs"][0]["status"] == "success"
+    assert status["runs"][0]["summary"] == {"records": 2}
+
+
+def test_carbon_daemon_keeps_connections_alive_between_runs(tmp_path):
+    trigger_path = tmp_path / "run"
+    keep_alive_calls = []
+
+    def keep_alive():
+        keep_alive_calls.append(True)
+        trigger_path.touch()
+
+    carbon_daemon = CarbonDaemon(
+        lambda: (True, {}),
+        trigger_file=str(trigger_path),
+        poll_interval=0.01,
+        keep_alive=keep_alive,
+        keepalive_interval=0.01,
+        max_runs=1,
+    )
+    carbon_daemon.run()
+    assert keep_alive_calls
+    assert carbon_daemon.run_count == 1
+
+
+def test_carbon_daemon_records_failed_run(caplog):
+    def run_feed():
+        msg = "Data Warehouse unavailable"
+        raise RuntimeError(msg)
+
+    carbon_daemon = CarbonDaemon(run_feed, trigger_file="unused")
+    run = carbon_daemon.run_once("trigger")
+    assert run["status"] == "fail"
+    assert carbon_daemon.failure_count == 1
+    assert "Run 1 of the Carbon daemon failed" in caplog.text
+
+
+def test_carbon_daemon_requires_schedule_or_trigger():
+    with pytest.raises(ValueError, match="A schedule or a trigger file is required"):
+        CarbonDaemon(lambda: (True, {}))
+
+
+def test_ftp_session_reuses_and_reconnects_connection(ftp_server):
+    ftp_socket, _ = ftp_server
+    ftp_session = FtpSession("user", "pass", host=ftp_socket[0], port=ftp_socket[1])
+    ftps = ftp_session.connect()
+    assert ftp_session.connect() is ftps
+    ftps.close()
+    assert ftp_session.connect() is not ftps
+    assert ftp_session.connect_count == 2  # noqa: PLR2004
+    ftp_session.close()
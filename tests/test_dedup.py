@@ -0,0 +1,66 @@
+from contextlib import closing
+from io import BytesIO
+
+import pytest
+
+from carbon.database import orcids
+from carbon.dedup import BloomFilter, RecordDeduplicator
+from carbon.feed import PeopleXmlFeed
+
+records = [
+    {"MIT_ID": "1", "ORCID": None},
+    {"MIT_ID": "1", "ORCID": "http://example.com/1"},
+    {"MIT_ID": "2", "ORCID": "http://example.com/2"},
+    {"MIT_ID": "1", "ORCID": "http://example.com/3"},
+]
+
+
+@pytest.mark.parametrize(
+    ("rule", "expected_orcids"),
+    [
+        ("first", [None, "http://example.com/2"]),
+        ("last", ["http://example.com/1", "http://example.com/2"]),
+        ("most_complete", ["http://example.com/1", "http://example.com/2"]),
+    ],
+)
+def test_record_deduplicator_applies_rule_to_consecutive_duplicates(
+    rule, expected_orcids
+):
+    deduplicator = RecordDeduplicator(key_columns=("MIT_ID",), rule=rule)
+    deduplicated_records = list(deduplicator.deduplicate(records))
+    assert [record["ORCID"] for record in deduplicated_records] == expected_orcids
+    assert deduplicator.dropped_record_count == 2  # noqa: PLR2004
+
+
+def test_record_deduplicator_with_capacity_uses_bloom_filter():
+    deduplicator = RecordDeduplicator(key_columns=("MIT_ID",), capacity=100)
+    deduplicated_records = list(deduplicator.deduplicate(records))
+    assert [record["MIT_ID"] for record in deduplicated_records] == ["1", "2"]
+    assert deduplicator.dropped_record_count == 2  # noqa: PLR2004
+
+
+def test_record_deduplicator_with_invalid_rule_raises_error():
+    with pytest.raises(ValueError, match="'random' is not a valid duplicate rule"):
+        RecordDeduplicator(key_columns=("MIT_ID",), rule="random")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    digests = [index.to_bytes(16) for index in range(1000)]
+    for digest in digests:
+        bloom_filter.add(digest)
+    assert all(digest in bloom_filter for digest in digests)
+
+
+@pytest.mark.usefixtures("_load_data")
+def test_people_xml_feed_drops_people_with_several_orcids(functional_engine):
+    with closing(functional_engine().connect()) as connection:
+        connection.execute(
+            orcids.insert(), {"MIT_ID": "123456", "ORCID": "http://example.com/4"}
+        )
+        connection.commit()
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), duplicate_rule="first"
+    )
+    people_xml_feed.run(nsmap=people_xml_feed.namespace_mapping)
+    assert people_xml_feed.summary == {"records": 2, "duplicate_records": 1}
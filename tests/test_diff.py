@@ -0,0 +1,95 @@
+from contextlib import closing
+from io import BytesIO
+
+import pytest
+from lxml import etree as ET
+
+from carbon.database import persons
+from carbon.diff import FeedDiff, FeedDiffError
+from carbon.feed import PeopleXmlFeed
+
+pytestmark = pytest.mark.usefixtures("_load_data")
+
+
+def write_people_feed(engine, path):
+    with open(path, "wb") as output_file:
+        people_xml_feed = PeopleXmlFeed(
+            engine=engine, output_file=output_file, sort_strategy="query"
+        )
+        people_xml_feed.run(nsmap=people_xml_feed.namespace_mapping)
+
+
+def write_articles_file(path, article_ids):
+    articles = ET.Element("ARTICLES")
+    for article_id in article_ids:
+        article = ET.SubElement(articles, "ARTICLE")
+        ET.SubElement(article, "ARTICLE_ID").text = article_id
+        ET.SubElement(article, "MIT_ID").text = "123456789"
+    ET.ElementTree(articles).write(path, encoding="UTF-8", xml_declaration=True)
+
+
+def test_feed_diff_finds_changed_and_removed_people(functional_engine, tmp_path):
+    old_path, new_path = tmp_path / "old.xml", tmp_path / "new.xml"
+    write_people_feed(functional_engine, old_path)
+    with closing(functional_engine().connect()) as connection:
+        connection.execute(
+            persons.update().where(persons.c.MIT_ID == "123456").values(LAST_NAME="Baz")
+        )
+        connection.execute(persons.delete().where(persons.c.MIT_ID == "098754"))
+        connection.commit()
+    write_people_feed(functional_engine, new_path)
+
+    output_file = BytesIO()
+    counts = FeedDiff(str(old_path), str(new_path), output_file).run()
+
+    assert counts == {"added": 0, "removed": 1, "changed": 1, "unchanged": 0}
+    delta = ET.XML(output_file.getvalue())
+    namespaces = {"s": PeopleXmlFeed.symplectic_elements_namespace}
+    assert delta.xpath(
+        "changed/s:record/s:field[@name='[LastName]']/text()", namespaces=namespaces
+    ) == ["Baz"]
+    assert delta.xpath(
+        "removed/s:record/s:field[@name='[Proprietary_ID]']/text()",
+        namespaces=namespaces,
+    ) == ["098754"]
+    assert delta.find("summary").attrib == {
+        "added": "0",
+        "removed": "1",
+        "changed": "1",
+        "unchanged": "0",
+    }
+
+
+def test_feed_diff_finds_added_articles(tmp_path):
+    old_path, new_path = tmp_path / "old.xml", tmp_path / "new.xml"
+    write_articles_file(old_path, ["1", "3"])
+    write_articles_file(new_path, ["1", "2", "3", "4"])
+    counts = FeedDiff(str(old_path), str(new_path), BytesIO()).run()
+    assert counts == {"added": 2, "removed": 0, "changed": 0, "unchanged": 2}
+
+
+def test_feed_diff_unsorted_file_raises_error(tmp_path):
+    old_path, new_path = tmp_path / "old.xml", tmp_path / "new.xml"
+    write_articles_file(old_path, ["1", "2"])
+    write_articles_file(new_path, ["2", "1"])
+    with pytest.raises(FeedDiffError, match="is not sorted by record key"):
+        FeedDiff(str(old_path), str(new_path), BytesIO()).run()
+
+
+def test_feed_diff_unknown_root_raises_error(tmp_path):
+    old_path = tmp_path / "old.xml"
+    old_path.write_bytes(b"<foo/>")
+    with pytest.raises(FeedDiffError, match="is not a Carbon feed"):
+        FeedDiff(str(old_path), str(old_path), BytesIO()).run()
+
+
+@pytest.mark.parametrize(
+    ("content", "message"),
+    [(b"", "the file is empty"), (b"not xml", "is not a valid XML file")],
+)
+def test_feed_diff_invalid_file_raises_error(tmp_path, content, message):
+    old_path, new_path = tmp_path / "old.xml", tmp_path / "new.xml"
+    old_path.write_bytes(content)
+    write_articles_file(new_path, ["1"])
+    with pytest.raises(FeedDiffError, match=message):
+        FeedDiff(str(old_path), str(new_path), BytesIO()).run()
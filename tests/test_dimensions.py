@@ -0,0 +1,87 @@
+from contextlib import closing
+from io import BytesIO
+
+import pytest
+
+from carbon.database import orcids
+from carbon.dimensions import DimensionCache, PeopleDimensions
+from carbon.feed import PeopleXmlFeed
+
+pytestmark = pytest.mark.usefixtures("_load_data")
+
+
+def _sorted_records(people_xml_feed):
+    return sorted(
+        people_xml_feed.records,
+        key=lambda record: (record["MIT_ID"], record["ORCID"] or ""),
+    )
+
+
+def test_people_dimensions_join_matches_join_semantics():
+    dimensions = PeopleDimensions(
+        org_units={"1": [["Chemistry", "SCIENCE AREA", None]]},
+        orcids={"123": ["orcid-1", "orcid-2"]},
+    )
+    person_records = [
+        {"MIT_ID": "123", "HR_ORG_UNIT_ID": "1"},
+        {"MIT_ID": "456", "HR_ORG_UNIT_ID": "1"},
+        {"MIT_ID": "789", "HR_ORG_UNIT_ID": "2"},
+        {"MIT_ID": "000", "HR_ORG_UNIT_ID": None},
+    ]
+    assert [
+        (record["MIT_ID"], record["ORCID"], record["DLC_NAME"])
+        for record in dimensions.join(person_records, ("MIT_ID", "ORCID", "DLC_NAME"))
+    ] == [
+        ("123", "orcid-1", "Chemistry"),
+        ("123", "orcid-2", "Chemistry"),
+        ("456", None, "Chemistry"),
+    ]
+
+
+def test_people_xml_feed_client_join_matches_server_join(functional_engine):
+    with closing(functional_engine().connect()) as connection:
+        connection.execute(
+            orcids.insert(), {"MIT_ID": "098754", "ORCID": "http://example.com/3"}
+        )
+        connection.commit()
+    server_feed = PeopleXmlFeed(engine=functional_engine, output_file=BytesIO())
+    client_feed = PeopleXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), join_mode="client"
+    )
+    client_records = _sorted_records(client_feed)
+    assert client_records == _sorted_records(server_feed)
+    assert list(client_records[0]) == list(server_feed.query.selected_columns.keys())
+    assert client_feed.dimension_cache.status == "memory"
+
+
+def test_dimension_cache_reuses_file_until_tables_change(functional_engine, tmp_path):
+    cache_path = str(tmp_path / "dimensions.json")
+    dimension_cache = DimensionCache(PeopleXmlFeed.areas, path=cache_path)
+    dimensions = dimension_cache.load(functional_engine)
+    assert dimension_cache.status == "miss"
+    assert dimension_cache.load(functional_engine).orcids == dimensions.orcids
+    assert dimension_cache.status == "hit"
+
+    with closing(functional_engine().connect()) as connection:
+        connection.execute(
+            orcids.insert(), {"MIT_ID": "098754", "ORCID": "http://example.com/3"}
+        )
+        connection.commit()
+    assert dimension_cache.load(functional_engine).orcids["098754"] == [
+        "http://example.com/2",
+        "http://example.com/3",
+    ]
+    assert dimension_cache.status == "miss"
+
+
+def test_people_xml_feed_summary_includes_dimension_cache_status(functional_engine):
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), join_mode="client"
+    )
+    people_xml_feed.run(nsmap=people_xml_feed.namespace_mapping)
+    assert people_xml_feed.summary == {"records": 2, "dimension_cache": "memory"}
+
+
+def test_people_xml_feed_raises_error_for_invalid_join_mode(functional_engine):
+    with pytest.raises(ValueError, match="'remote' is not a valid join mode"):
+        PeopleXmlFeed(engine=functional_engine, output_file=BytesIO(), join_mode="remote")
@@ -1,8 +1,14 @@
+import threading
 from unittest.mock import patch
 
 from freezegun import freeze_time
 
-from carbon.helpers import get_group_name, get_initials, sns_log
+from carbon.helpers import (
+    SnsNotifier,
+    get_group_name,
+    get_initials,
+    get_sns_message,
+)
 
 
 def test_group_name_adds_faculty():
@@ -28,51 +34,61 @@ def test_initials_returns_first_and_middle():
 
 
 @freeze_time("2023-08-18")
-def test_sns_log_publishes_status_message_start(config, stubbed_sns_client_start):
-    with patch("boto3.client") as mocked_boto_client:
-        mocked_boto_client.return_value = stubbed_sns_client_start
-
-        sns_start_response = sns_log(config, status="start")
-        assert sns_start_response["MessageId"] == "StartMessageId"
+def test_sns_notifier_publishes_messages_in_order(
+    config, stubbed_sns_client_start_success
+):
+    with SnsNotifier(config, sns_client=stubbed_sns_client_start_success) as notifier:
+        notifier.notify(status="start")
+        notifier.notify(status="success")
+    assert [response["MessageId"] for response in notifier.responses] == [
+        "StartMessageId",
+        "SuccessMessageId",
+    ]
 
 
 @freeze_time("2023-08-18")
-def test_sns_log_publishes_status_message_success(config, stubbed_sns_client_success):
-    with patch("boto3.client") as mocked_boto_client:
-        mocked_boto_client.return_value = stubbed_sns_client_success
-
-        sns_success_response = sns_log(config, status="success")
-        assert sns_success_response["MessageId"] == "SuccessMessageId"
-
-
-@freeze_time("2023-08-18")
-def test_sns_log_publishes_status_message_fail(config, stubbed_sns_client_fail):
-    with patch("boto3.client") as mocked_boto_client:
-        mocked_boto_client.return_value = stubbed_sns_client_fail
-
-        sns_fail_response = sns_log(config, status="fail")
-        assert sns_fail_response["MessageId"] == "FailMessageId"
+def test_sns_notifier_publishes_fail_message(config, stubbed_sns_client_start_fail):
+    with SnsNotifier(config, sns_client=stubbed_sns_client_start_fail) as notifier:
+        notifier.notify(status="start")
+        notifier.notify(status="fail")
+    assert [response["MessageId"] for response in notifier.responses] == [
+        "StartMessageId",
+        "FailMessageId",
+    ]
 
 
 @freeze_time("2023-08-18")
-def test_sns_log_message_flow_success(config, stubbed_sns_client_start_success):
+def test_sns_notifier_creates_one_client(config, stubbed_sns_client_start_success):
     with patch("boto3.client") as mocked_boto_client:
         mocked_boto_client.return_value = stubbed_sns_client_start_success
-
-        sns_start_response = sns_log(config, status="start")
-        assert sns_start_response["MessageId"] == "StartMessageId"
-
-        sns_success_response = sns_log(config, status="success")
-        assert sns_success_response["MessageId"] == "SuccessMessageId"
-
-
-@freeze_time("2023-08-18")
-def test_sns_log_message_flow_fail(config, stubbed_sns_client_start_fail):
-    with patch("boto3.client") as mocked_boto_client:
-        mocked_boto_client.return_value = stubbed_sns_client_start_fail
-
-        sns_start_response = sns_log(config, status="start")
-        assert sns_start_response["MessageId"] == "StartMessageId"
-
-        sns_fail_response = sns_log(config, status="fail")
-        assert sns_fail_response["MessageId"] == "FailMessageId"
+        with SnsNotifier(config) as notifier:
+            notifier.notify(status="start")
+            notifier.notify(status="success")
+        mocked_boto_client.assert_called_once_with("sns")
+    assert len(notifier.responses) == 2  # noqa: PLR2004
+
+
+def test_sns_notifier_drops_messages_when_queue_is_full(caplog, config):
+    class BlockedSnsClient:
+        def __init__(self):
+            self.released = threading.Event()
+
+        def publish(self, **_kwargs):
+            self.released.wait()
+            return {"MessageId": "MessageId"}
+
+    sns_client = BlockedSnsClient()
+    notifier = SnsNotifier(config, sns_client=sns_client, max_queue_size=1)
+    notifier.notify(status="start")
+    notifier.notify(status="start")
+    notifier.notify(status="start")
+    sns_client.released.set()
+    notifier.close()
+    assert "SNS message queue is full, dropping 'start' message" in caplog.text
+
+
+def test_get_sns_message_includes_run_summary(config):
+    message = get_sns_message(
+        config, status="success", run_summary={"records": 2, "elapsed_seconds": 0.5}
+    )
+    assert message.endswith("Run summary: records=2, elapsed_seconds=0.5.")
@@ -0,0 +1,55 @@
+import pytest
+
+from carbon.history import RunLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = RunLedger(str(tmp_path / "history.db"), baseline_size=3, tolerance=0.5)
+    for elapsed_seconds in (10.0, 12.0, 11.0, 100.0):
+        ledger.record(
+            {
+                "started_at": "2026-10-19T00:00:00+00:00",
+                "feed_type": "people",
+                "status": "success",
+                "records": 1000,
+                "elapsed_seconds": elapsed_seconds,
+                "query_fingerprint": "a" * 16,
+            }
+        )
+    return ledger
+
+
+def test_run_ledger_history_returns_recent_runs_oldest_first(ledger):
+    runs = ledger.history(limit=2)
+    assert [run["elapsed_seconds"] for run in runs] == [11.0, 100.0]
+    assert runs[0]["bytes"] is None
+
+
+def test_run_ledger_baseline_uses_median_of_recent_successful_runs(ledger):
+    ledger.record({"started_at": "", "feed_type": "people", "status": "fail"})
+    assert ledger.baseline("people", "a" * 16) == {
+        "runs": 3,
+        "elapsed_seconds": 12.0,
+        "records_per_second": pytest.approx(1000 / 12),
+    }
+
+
+def test_run_ledger_baseline_requires_runs_of_same_query(ledger):
+    assert ledger.baseline("people", "b" * 16) is None
+    assert ledger.baseline("articles", "a" * 16) is None
+
+
+def test_run_ledger_check_flags_values_outside_band(ledger):
+    run = {
+        "feed_type": "people",
+        "records": 1000,
+        "elapsed_seconds": 30.0,
+        "query_fingerprint": "a" * 16,
+    }
+    regressions = ledger.check(run)
+    assert len(regressions) == 2  # noqa: PLR2004
+    assert regressions[0] == (
+        "elapsed_seconds 30.000 is outside 6.000-18.000 (baseline 12.000 over 3 runs)"
+    )
+    assert ledger.check({**run, "elapsed_seconds": 13.0}) == []
@@ -0,0 +1,82 @@
+import os
+import socket
+from io import BytesIO
+
+import pytest
+
+from carbon.feed import ArticlesXmlFeed
+from carbon.metrics import (
+    MetricsRegistry,
+    StatsdClient,
+    export_metrics,
+    format_prometheus_text,
+    metrics,
+    write_prometheus_textfile,
+)
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry()
+    registry.increment("records_processed_total", 2)
+    registry.increment("records_processed_total")
+    registry.set_gauge("extract_seconds", 1.5)
+    registry.observe("db_execute_seconds", 0.25)
+    registry.observe("db_execute_seconds", 0.75)
+    return registry
+
+
+@pytest.fixture
+def statsd_listener():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.settimeout(5)
+        yield listener
+
+
+def test_format_prometheus_text_includes_labels_and_types(registry):
+    assert format_prometheus_text(registry, labels={"feed_type": "people"}) == (
+        "# TYPE carbon_records_processed_total counter\n"
+        'carbon_records_processed_total{feed_type="people"} 3\n'
+        "# TYPE carbon_extract_seconds gauge\n"
+        'carbon_extract_seconds{feed_type="people"} 1.5\n'
+        "# TYPE carbon_db_execute_seconds summary\n"
+        'carbon_db_execute_seconds_count{feed_type="people"} 2\n'
+        'carbon_db_execute_seconds_sum{feed_type="people"} 1.0\n'
+    )
+
+
+def test_write_prometheus_textfile_replaces_file(registry, tmp_path):
+    textfile_path = tmp_path / "carbon.prom"
+    textfile_path.write_text("stale")
+    write_prometheus_textfile(str(textfile_path), registry)
+    assert "carbon_records_processed_total 3" in textfile_path.read_text()
+    assert os.listdir(tmp_path) == ["carbon.prom"]
+
+
+def test_statsd_client_sends_metrics(registry, statsd_listener):
+    host, port = statsd_listener.getsockname()
+    StatsdClient(host, port, prefix="carbon.people").send(registry)
+    assert statsd_listener.recv(512).decode().splitlines() == [
+        "carbon.people.records_processed_total:3|c",
+        "carbon.people.extract_seconds:1.5|g",
+        "carbon.people.db_execute_seconds:500.0|ms",
+    ]
+
+
+def test_export_metrics_logs_error_for_invalid_textfile_path(caplog, registry):
+    export_metrics(registry, "people", textfile_path="/nonexistent/carbon.prom")
+    assert "Failed to write metrics to '/nonexistent/carbon.prom'" in caplog.text
+
+
+@pytest.mark.usefixtures("_load_data")
+def test_xml_feed_run_updates_metrics(functional_engine):
+    metrics.reset()
+    ArticlesXmlFeed(engine=functional_engine, output_file=BytesIO()).run()
+    assert metrics.counters["records_processed_total"] == 1
+    assert metrics.timers["db_execute_seconds"][0] == 1
+    assert set(metrics.gauges) == {
+        "extract_seconds",
+        "transform_seconds",
+        "write_seconds",
+    }
@@ -0,0 +1,53 @@
+import os
+import pstats
+import threading
+import time
+
+import pytest
+
+from carbon.profiling import RunProfiler, StackSampler
+
+
+def wait_for_event(event):
+    event.wait(5)
+
+
+def test_stack_sampler_samples_other_threads():
+    event = threading.Event()
+    thread = threading.Thread(target=wait_for_event, args=(event,), name="waiter")
+    thread.start()
+    sampler = StackSampler()
+    sampler.sample()
+    event.set()
+    thread.join()
+    waiter_stacks = [
+        stack for stack in sampler.stack_counts if stack.startswith("waiter")
+    ]
+    assert len(waiter_stacks) == 1
+    assert "wait_for_event (test_profiling.py" in waiter_stacks[0]
+    assert sampler.sample_count == 1
+
+
+def test_run_profiler_cprofile_writes_pstats(tmp_path):
+    with RunProfiler("cprofile", "people", directory=str(tmp_path)) as profiler:
+        sum(range(1000))
+    assert os.path.basename(profiler.output_path).startswith("carbon-people-")
+    assert profiler.output_path.endswith(".pstats")
+    assert pstats.Stats(profiler.output_path).total_calls > 0
+
+
+def test_run_profiler_sample_writes_collapsed_stacks(tmp_path):
+    with RunProfiler(
+        "sample", "articles", directory=str(tmp_path), interval=0.001
+    ) as profiler:
+        time.sleep(0.05)
+    with open(profiler.output_path) as collapsed_file:
+        lines = collapsed_file.read().splitlines()
+    assert profiler.output_path.endswith(".collapsed")
+    assert any(line.startswith("MainThread;") for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_run_profiler_invalid_mode_raises_error():
+    with pytest.raises(ValueError, match="'trace' is not a valid profile mode"):
+        RunProfiler("trace", "people")
@@ -0,0 +1,62 @@
+import logging
+import time
+from io import BytesIO
+
+import pytest
+
+from carbon.feed import ArticlesXmlFeed, PeopleXmlFeed
+from carbon.progress import ProgressReporter
+
+
+def test_progress_reporter_reports_rates_without_total():
+    progress_reporter = ProgressReporter()
+    assert progress_reporter.report(1000, 10.0) == (
+        "Processed 1,000 records, 100 records/s (average 100 records/s)"
+    )
+    assert progress_reporter.report(4000, 20.0) == (
+        "Processed 4,000 records, 300 records/s (average 200 records/s)"
+    )
+
+
+def test_progress_reporter_reports_percentage_and_eta_with_total():
+    progress_reporter = ProgressReporter(total_source="count")
+    progress_reporter.total = 10000
+    assert progress_reporter.report(2500, 50.0) == (
+        "Processed 2,500 of 10,000 records (25.0%), 50 records/s "
+        "(average 50 records/s), ETA 0:02:30"
+    )
+
+
+def test_progress_reporter_raises_error_for_invalid_total_source():
+    with pytest.raises(ValueError, match="'exact' is not a valid progress total"):
+        ProgressReporter(total_source="exact")
+
+
+@pytest.mark.usefixtures("_load_data")
+def test_progress_reporter_counts_feed_records(caplog, functional_engine):
+    caplog.set_level(logging.INFO)
+    people_xml_feed = PeopleXmlFeed(engine=functional_engine, output_file=BytesIO())
+    progress_reporter = ProgressReporter(total_source="count")
+    progress_reporter._retrieve_total(  # noqa: SLF001
+        functional_engine, people_xml_feed.build_query()
+    )
+    assert progress_reporter.total == 2  # noqa: PLR2004
+    assert "The feed has a total of 2 records" in caplog.text
+
+
+def test_progress_reporter_logs_progress_periodically(caplog, functional_engine):
+    caplog.set_level(logging.INFO)
+    progress_reporter = ProgressReporter(interval=0.001)
+    progress_reporter.start(functional_engine, PeopleXmlFeed.query, lambda: 5)
+    time.sleep(0.05)
+    progress_reporter.stop()
+    assert "Processed 5 records" in caplog.text
+
+
+@pytest.mark.usefixtures("_load_data")
+def test_xml_feed_stops_progress_reporter(functional_engine):
+    articles_xml_feed = ArticlesXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), progress_interval=60
+    )
+    articles_xml_feed.run()
+    assert articles_xml_feed.progress_reporter._stop_event.is_set()  # noqa: SLF001
@@ -0,0 +1,79 @@
+import json
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from lxml import etree as ET
+
+from carbon import helpers
+from carbon.feed import PeopleXmlFeed
+from carbon.quarantine import ErrorBudgetExceededError, RecordQuarantine
+
+pytestmark = pytest.mark.usefixtures("_load_data")
+
+
+@pytest.fixture
+def _failing_transform():
+    def get_initials(first_name, middle_name):
+        if first_name == "Foobar":
+            message = f"Unexpected name: {first_name}"
+            raise ValueError(message)
+        return helpers.get_initials(first_name, middle_name)
+
+    with patch("carbon.feed.get_initials", get_initials):
+        yield
+
+
+@pytest.mark.usefixtures("_failing_transform")
+def test_people_xml_feed_quarantines_record_and_continues(functional_engine, tmp_path):
+    quarantine_path = tmp_path / "quarantine.jsonl"
+    output_file = BytesIO()
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine,
+        output_file=output_file,
+        quarantine_path=str(quarantine_path),
+    )
+    people_xml_feed.run(nsmap=people_xml_feed.namespace_mapping)
+
+    people_ids = ET.XML(output_file.getvalue()).xpath(
+        "//s:field[@name='[Proprietary_ID]']/text()",
+        namespaces={"s": "http://www.symplectic.co.uk/hrimporter"},
+    )
+    assert people_ids == ["098754"]
+    assert people_xml_feed.summary["quarantined_records"] == 1
+    entries = [json.loads(line) for line in quarantine_path.read_text().splitlines()]
+    assert len(entries) == 1
+    assert entries[0]["key"] == ["123456"]
+    assert entries[0]["record"]["MIT_ID"] == "123456"
+    assert entries[0]["error"] == "ValueError: Unexpected name: Foobar"
+
+
+@pytest.mark.usefixtures("_failing_transform")
+def test_people_xml_feed_fails_without_quarantine(functional_engine):
+    people_xml_feed = PeopleXmlFeed(engine=functional_engine, output_file=BytesIO())
+    with pytest.raises(ValueError, match="Foobar"):
+        people_xml_feed.run(nsmap=people_xml_feed.namespace_mapping)
+
+
+@pytest.mark.usefixtures("_failing_transform")
+def test_people_xml_feed_fails_when_error_budget_is_exceeded(functional_engine, tmp_path):
+    quarantine_path = tmp_path / "quarantine.jsonl"
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine,
+        output_file=BytesIO(),
+        quarantine_path=str(quarantine_path),
+        error_budget=0,
+    )
+    with pytest.raises(ErrorBudgetExceededError, match="error budget of 0"):
+        people_xml_feed.run(nsmap=people_xml_feed.namespace_mapping)
+    assert len(quarantine_path.read_text().splitlines()) == 1
+
+
+def test_record_quarantine_replaces_file_of_previous_run(tmp_path):
+    quarantine_path = tmp_path / "quarantine.jsonl"
+    quarantine_path.write_text('{"record_number":1}\n')
+    quarantine = RecordQuarantine(str(quarantine_path))
+    quarantine.open()
+    quarantine.close()
+    assert quarantine_path.read_text() == ""
+    assert quarantine.summary["quarantined_records"] == 0
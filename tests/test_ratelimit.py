@@ -0,0 +1,71 @@
+from datetime import datetime
+from io import BytesIO
+
+import pytest
+
+from carbon.app import FtpFile
+from carbon.ratelimit import RateLimiter, RateSchedule
+
+
+@pytest.mark.parametrize(
+    ("moment", "expected_rate"),
+    [
+        (datetime(2024, 1, 1, 7, 59), 10 * 1024**2),  # noqa: DTZ001
+        (datetime(2024, 1, 1, 8, 0), 2 * 1024**2),  # noqa: DTZ001
+        (datetime(2024, 1, 1, 17, 59), 2 * 1024**2),  # noqa: DTZ001
+        (datetime(2024, 1, 1, 23, 0), 0.5 * 1024**2),  # noqa: DTZ001
+        (datetime(2024, 1, 1, 5, 59), 0.5 * 1024**2),  # noqa: DTZ001
+    ],
+)
+def test_rate_schedule_applies_first_matching_window(moment, expected_rate):
+    schedule = RateSchedule(["08:00-18:00=2", "22:00-06:00=0.5", "10"])
+    assert schedule.get_rate(moment) == expected_rate
+
+
+def test_rate_schedule_without_default_rate_is_unlimited_outside_windows():
+    schedule = RateSchedule(["08:00-18:00=2"])
+    assert schedule.get_rate(datetime(2024, 1, 1, 20, 0)) is None  # noqa: DTZ001
+
+
+@pytest.mark.parametrize("rule", ["0", "fast", "08:00=2", "8-18=2", "08:00-25:00=2"])
+def test_rate_schedule_raises_error_for_invalid_rule(rule):
+    with pytest.raises(ValueError, match="is not a valid rate limit"):
+        RateSchedule([rule])
+
+
+def test_rate_limiter_paces_reads_after_burst():
+    clock_times = iter([0.0, 0.0, 0.25])
+    sleeps = []
+    limiter = RateLimiter(
+        RateSchedule(["1"]),
+        clock=lambda: next(clock_times),
+        sleep=sleeps.append,
+    )
+    reader = limiter.reader(BytesIO(b"x" * 3 * 1024**2))
+    reader.read(1024**2)
+    reader.read(1024**2)
+    reader.read(1024**2)
+    assert sleeps == [1.0, 1.75]
+    assert limiter.throttled_seconds == 2.75  # noqa: PLR2004
+    assert limiter.byte_count == 3 * 1024**2
+
+
+def test_ftp_file_reports_rate_limit(ftp_server_wrapper):
+    ftp_socket, _ = ftp_server_wrapper
+    sleeps = []
+    ftp_file = FtpFile(
+        content_feed=BytesIO(b"x" * 20_000),
+        user="user",
+        password="pass",  # noqa: S106
+        path="/DEV",
+        port=ftp_socket[1],
+        rate_limiter=RateLimiter(
+            RateSchedule(["0.01"]), burst_seconds=0.5, sleep=sleeps.append
+        ),
+    )
+    ftp_file()
+    assert sleeps
+    assert ftp_file.summary["upload_throttled_seconds"] == pytest.approx(
+        sum(sleeps), abs=0.001
+    )
+    assert ftp_file.summary["upload_bytes_per_second"] > 0
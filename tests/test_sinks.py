@@ -0,0 +1,110 @@
+import gzip
+import os
+import time
+from io import BytesIO
+
+import pytest
+
+from carbon.config import Config
+from carbon.sinks import (
+    ArchiveSink,
+    DatabaseToSinksPipe,
+    FileSink,
+    FtpSink,
+    Sink,
+    SinkError,
+    TeeFile,
+)
+
+
+class FailingSink(Sink):
+    def consume(self):
+        self.reader.read(1)
+        msg = "disk full"
+        raise OSError(msg)
+
+
+class SlowSink(FileSink):
+    def consume(self):
+        while data := self.reader.read(1):
+            time.sleep(0.01)
+            self.output_file.write(data)
+
+
+@pytest.mark.usefixtures("_load_data")
+def test_database_to_sinks_pipe_writes_feed_to_every_sink(
+    ftp_server_wrapper, functional_engine, monkeypatch, tmp_path
+):
+    ftp_socket, ftp_directory = ftp_server_wrapper
+    monkeypatch.setenv("FEED_TYPE", "people")
+    output_file = BytesIO()
+    archive_path = str(tmp_path / "people.xml.gz")
+    pipe = DatabaseToSinksPipe(
+        config=Config(),
+        engine=functional_engine,
+        sinks=[
+            FileSink("file", output_file),
+            ArchiveSink("archive_1", archive_path),
+            FtpSink(
+                "ftp",
+                user="user",
+                password="pass",  # noqa: S106
+                path="/people.xml",
+                port=ftp_socket[1],
+            ),
+        ],
+    )
+    pipe.run()
+
+    content = output_file.getvalue()
+    assert b"<records" in content
+    with gzip.open(archive_path) as archive_file:
+        assert archive_file.read() == content
+    with open(os.path.join(ftp_directory, "people.xml"), "rb") as ftp_file:
+        assert ftp_file.read() == content
+    assert pipe.summary["records"] == 2  # noqa: PLR2004
+    assert pipe.summary["file_status"] == "ok"
+    assert pipe.summary["archive_1_bytes"] == len(content)
+    assert pipe.summary["ftp_uploaded_bytes"] == len(content)
+
+
+@pytest.mark.usefixtures("_load_data")
+def test_database_to_sinks_pipe_completes_other_sinks_if_a_sink_fails(
+    functional_engine, monkeypatch
+):
+    monkeypatch.setenv("FEED_TYPE", "articles")
+    output_file = BytesIO()
+    pipe = DatabaseToSinksPipe(
+        config=Config(),
+        engine=functional_engine,
+        sinks=[FailingSink("broken"), FileSink("file", output_file)],
+    )
+    with pytest.raises(SinkError, match="1 of 2 sinks failed: broken: disk full"):
+        pipe.run()
+    assert b"</ARTICLES>" in output_file.getvalue()
+    assert pipe.summary["broken_status"] == "failed"
+    assert pipe.summary["file_status"] == "ok"
+
+
+def test_tee_file_reports_time_blocked_by_slow_sink():
+    output_file = BytesIO()
+    slow_sink = SlowSink("slow", output_file, max_queued_chunks=1)
+    tee_file = TeeFile([slow_sink], chunk_size=1)
+    tee_file.start()
+    for _ in range(10):
+        tee_file.write(b"x")
+    tee_file.close()
+    assert output_file.getvalue() == b"x" * 10
+    assert slow_sink.blocked_seconds > 0
+
+
+def test_archive_sink_removes_partial_archive_if_feed_is_aborted(tmp_path):
+    archive_path = tmp_path / "people.xml.gz"
+    archive_sink = ArchiveSink("archive_1", str(archive_path))
+    tee_file = TeeFile([archive_sink])
+    tee_file.start()
+    tee_file.write(b"<records>")
+    tee_file.flush()
+    tee_file.close(aborted=True)
+    assert isinstance(archive_sink.error, SinkError)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,68 @@
+from io import BytesIO
+
+import pytest
+
+from carbon.feed import ArticlesXmlFeed, PeopleXmlFeed
+from carbon.sort import ExternalSorter
+
+records = [
+    {"MIT_ID": str(mit_id), "ORDER": order}
+    for order, mit_id in enumerate([5, 3, 9, 1, 3, 7, 2, 8, 3, 4])
+]
+
+
+def test_external_sorter_merges_sorted_runs():
+    sorter = ExternalSorter(key_columns=("MIT_ID",), memory_budget=200)
+    sorted_records = list(sorter.sort(records))
+    assert [record["MIT_ID"] for record in sorted_records] == sorted(
+        record["MIT_ID"] for record in records
+    )
+    assert sorter.run_count > 1
+    assert sorter.spilled_bytes > 0
+
+
+def test_external_sorter_is_stable():
+    sorter = ExternalSorter(key_columns=("MIT_ID",), memory_budget=200)
+    sorted_records = list(sorter.sort(records))
+    assert [record["ORDER"] for record in sorted_records if record["MIT_ID"] == "3"] == [
+        1,
+        4,
+        8,
+    ]
+
+
+def test_external_sorter_sorts_in_memory_within_budget():
+    sorter = ExternalSorter(key_columns=("MIT_ID",))
+    sorted_records = list(sorter.sort(records))
+    assert sorted_records[0]["MIT_ID"] == "1"
+    assert sorter.run_count == 0
+
+
+@pytest.mark.usefixtures("_load_data")
+@pytest.mark.parametrize("sort_strategy", ["query", "external"])
+def test_people_xml_feed_sorts_records_by_mit_id(functional_engine, sort_strategy):
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), sort_strategy=sort_strategy
+    )
+    records = people_xml_feed.records
+    if people_xml_feed.sorter:
+        records = people_xml_feed.sorter.sort(records)
+    assert [record["MIT_ID"] for record in records] == ["098754", "123456"]
+
+
+@pytest.mark.usefixtures("_load_data")
+def test_xml_feed_auto_sort_strategy_depends_on_feed(functional_engine):
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), sort_strategy="auto"
+    )
+    articles_xml_feed = ArticlesXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), sort_strategy="auto"
+    )
+    assert people_xml_feed.sort_strategy == "query"
+    assert articles_xml_feed.sort_strategy == "external"
+    articles_xml_feed.run()
+    assert articles_xml_feed.summary == {
+        "records": 1,
+        "sort_strategy": "external",
+        "sort_runs": 0,
+    }
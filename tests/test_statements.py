@@ -0,0 +1,60 @@
+from contextlib import closing
+from io import BytesIO
+
+import pytest
+
+from carbon.feed import PeopleXmlFeed
+from carbon.statements import StatementCache, statement_cache
+
+pytestmark = pytest.mark.usefixtures("_load_data")
+
+
+def test_statement_cache_compiles_statement_once(functional_engine):
+    cache = StatementCache()
+    build_count = []
+
+    def build_statement():
+        build_count.append(1)
+        return PeopleXmlFeed.query
+
+    with closing(functional_engine().connect()) as connection:
+        first_rows = cache.execute(connection, "people", build_statement).fetchall()
+        second_rows = cache.execute(connection, "people", build_statement).fetchall()
+    assert first_rows == second_rows
+    assert len(first_rows) == 2  # noqa: PLR2004
+    assert len(build_count) == 1
+    assert cache.miss_count == 1
+    assert cache.hit_count == 1
+
+
+def test_statement_cache_matches_uncached_query(functional_engine):
+    cache = StatementCache()
+    with closing(functional_engine().connect()) as connection:
+        cached_rows = cache.execute(
+            connection, "people", lambda: PeopleXmlFeed.query
+        ).fetchall()
+        rows = connection.execute(PeopleXmlFeed.query).fetchall()
+    assert cached_rows == rows
+
+
+def test_statement_cache_expands_in_lists_to_bind_parameters(functional_engine):
+    cache = StatementCache()
+    statement, parameters = cache.get(
+        functional_engine().dialect, "people", lambda: PeopleXmlFeed.query
+    )
+    assert "POSTCOMPILE" not in str(statement)
+    assert parameters["upper_1_1"] == "ADJUNCT ASSOCIATE PROFESSOR"
+
+
+def test_xml_feed_reuses_compiled_page_query(functional_engine):
+    statement_cache.clear()
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), page_size=1
+    )
+    assert [record["MIT_ID"] for record in people_xml_feed.records] == [
+        "098754",
+        "123456",
+    ]
+    # the first page, the later pages, and the key groups are compiled once each
+    assert statement_cache.miss_count == 3  # noqa: PLR2004
+    assert statement_cache.hit_count == 2  # noqa: PLR2004
@@ -0,0 +1,133 @@
+import json
+import threading
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sentry_sdk.client import NonRecordingClient
+
+from carbon import helpers
+from carbon.feed import ArticlesXmlFeed, PeopleXmlFeed
+from carbon.tracing import Tracer, tracer
+
+
+@pytest.fixture(autouse=True)
+def _sentry_not_initialized(monkeypatch):
+    monkeypatch.setattr("carbon.tracing.sentry_sdk.get_client", NonRecordingClient)
+
+
+def test_tracer_start_span_returns_none_if_not_started():
+    assert Tracer().start_span("db.execute") is None
+
+
+def test_tracer_nests_spans_per_thread():
+    run_tracer = Tracer()
+    run_tracer.start("carbon.people")
+    with (
+        run_tracer.span("feed.batch") as batch_span,
+        run_tracer.span("xml.flush") as flush_span,
+    ):
+        upload_thread = threading.Thread(
+            target=lambda: run_tracer.end_span(run_tracer.start_span("ftps.stor"))
+        )
+        upload_thread.start()
+        upload_thread.join()
+    run_tracer.finish()
+    spans = {span.name: span for span in run_tracer.spans}
+    root_span_id = spans["carbon.people"].span_id
+    assert flush_span.parent_span_id == batch_span.span_id
+    assert batch_span.parent_span_id == root_span_id
+    assert spans["ftps.stor"].parent_span_id == root_span_id
+    assert spans["ftps.stor"].thread_name != batch_span.thread_name
+
+
+def test_tracer_span_records_error():
+    run_tracer = Tracer()
+    run_tracer.start("carbon.people")
+    with pytest.raises(ValueError, match="bad"), run_tracer.span("db.execute"):
+        raise ValueError("bad")  # noqa: EM101
+    assert run_tracer.spans[0].error == "ValueError('bad')"
+
+
+def test_tracer_finish_writes_otlp_json(tmp_path):
+    trace_path = tmp_path / "trace.json"
+    run_tracer = Tracer()
+    run_tracer.start("carbon.people", output_path=str(trace_path))
+    with run_tracer.span("db.execute", page=1):
+        pass
+    run_tracer.finish()
+    otlp_spans = json.loads(trace_path.read_text())["resourceSpans"][0]["scopeSpans"][0][
+        "spans"
+    ]
+    assert [otlp_span["name"] for otlp_span in otlp_spans] == [
+        "db.execute",
+        "carbon.people",
+    ]
+    assert otlp_spans[0]["traceId"] == run_tracer.trace_id
+    assert otlp_spans[0]["parentSpanId"] == otlp_spans[1]["spanId"]
+    assert {"key": "page", "value": {"intValue": "1"}} in otlp_spans[0]["attributes"]
+    assert int(otlp_spans[0]["endTimeUnixNano"]) >= int(
+        otlp_spans[0]["startTimeUnixNano"]
+    )
+
+
+def test_tracer_sends_spans_to_sentry_if_initialized(monkeypatch):
+    monkeypatch.setattr(
+        "carbon.tracing.sentry_sdk.get_client",
+        lambda: MagicMock(is_active=MagicMock(return_value=True)),
+    )
+    with patch("carbon.tracing.sentry_sdk.start_transaction") as start_transaction:
+        run_tracer = Tracer()
+        run_tracer.start("carbon.people")
+        with run_tracer.span("ftps.stor", path="/people.xml"):
+            pass
+        run_tracer.finish()
+    transaction = start_transaction.return_value
+    transaction.start_child.assert_called_once_with(op="ftps.stor", name="ftps.stor")
+    transaction.start_child.return_value.set_data.assert_called_once_with(
+        "path", "/people.xml"
+    )
+    transaction.start_child.return_value.finish.assert_called_once()
+    transaction.finish.assert_called_once()
+
+
+@pytest.mark.usefixtures("_load_data")
+def test_xml_feed_run_traces_database_and_transform_spans(functional_engine):
+    tracer.start("carbon.articles")
+    try:
+        ArticlesXmlFeed(engine=functional_engine, output_file=BytesIO()).run()
+    finally:
+        tracer.finish()
+    assert [span.name for span in tracer.spans] == [
+        "db.connect",
+        "db.execute",
+        "db.first_row",
+        "feed.batch",
+        "carbon.articles",
+    ]
+
+
+@pytest.mark.usefixtures("_load_data")
+def test_xml_feed_run_counts_quarantined_records_in_trace_batches(
+    functional_engine, monkeypatch, tmp_path
+):
+    def get_initials(first_name, middle_name):
+        if first_name == "Foobar":
+            message = f"Unexpected name: {first_name}"
+            raise ValueError(message)
+        return helpers.get_initials(first_name, middle_name)
+
+    monkeypatch.setattr("carbon.feed.get_initials", get_initials)
+    monkeypatch.setattr("carbon.feed.TRACE_BATCH_SIZE", 2)
+    tracer.start("carbon.people")
+    try:
+        PeopleXmlFeed(
+            engine=functional_engine,
+            output_file=BytesIO(),
+            quarantine_path=str(tmp_path / "quarantine.jsonl"),
+        ).run()
+    finally:
+        tracer.finish()
+    batch_spans = [span for span in tracer.spans if span.name == "feed.batch"]
+    assert len(batch_spans) == 2  # noqa: PLR2004
+    assert batch_spans[0].attributes["records_processed"] == 1
@@ -0,0 +1,76 @@
+from io import BytesIO
+
+import pytest
+from lxml import etree as ET
+
+from carbon.feed import ArticlesXmlFeed, PeopleXmlFeed
+from carbon.validation import ARTICLE_SCHEMA, FeedValidationError, RecordValidator
+
+pytestmark = pytest.mark.usefixtures("_load_data")
+
+
+def valid_article():
+    article = ET.Element("ARTICLE")
+    for name, text in (
+        ("AA_MATCH_SCORE", "0.9"),
+        ("ARTICLE_ID", "1234567"),
+        ("ARTICLE_TITLE", "Title"),
+        ("ARTICLE_YEAR", "1999"),
+        ("AUTHORS", "Author"),
+        ("DOI", "10.0000/1234"),
+        ("ISSN_ELECTRONIC", None),
+        ("ISSN_PRINT", None),
+        ("IS_CONFERENCE_PROCEEDING", "0"),
+        ("JOURNAL_FIRST_PAGE", None),
+        ("JOURNAL_LAST_PAGE", None),
+        ("JOURNAL_ISSUE", None),
+        ("JOURNAL_VOLUME", None),
+        ("JOURNAL_NAME", "Bunnies"),
+        ("MIT_ID", "123456789"),
+        ("PUBLISHER", None),
+    ):
+        ET.SubElement(article, name).text = text
+    return article
+
+
+def test_people_xml_feed_validates_every_record(functional_engine):
+    people_xml_feed = PeopleXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), validation_sample_rate=1.0
+    )
+    people_xml_feed.run(nsmap=people_xml_feed.namespace_mapping)
+    assert people_xml_feed.validator.validated_record_count == 2  # noqa: PLR2004
+    assert people_xml_feed.summary["validated_records"] == 2  # noqa: PLR2004
+    assert "validation_seconds" in people_xml_feed.summary
+
+
+def test_articles_xml_feed_validates_every_record(functional_engine):
+    articles_xml_feed = ArticlesXmlFeed(
+        engine=functional_engine, output_file=BytesIO(), validation_sample_rate=1.0
+    )
+    articles_xml_feed.run()
+    assert articles_xml_feed.validator.validated_record_count == 1
+
+
+def test_xml_feed_without_validation_sample_rate_skips_validation(functional_engine):
+    articles_xml_feed = ArticlesXmlFeed(engine=functional_engine, output_file=BytesIO())
+    articles_xml_feed.run()
+    assert articles_xml_feed.validator is None
+    assert articles_xml_feed.summary == {"records": 1}
+
+
+def test_record_validator_raises_error_for_invalid_record():
+    validator = RecordValidator(ARTICLE_SCHEMA)
+    article = ET.Element("ARTICLE")
+    ET.SubElement(article, "AA_MATCH_SCORE").text = "None"
+    with pytest.raises(FeedValidationError, match="Record 1 does not match"):
+        validator.validate(article)
+
+
+def test_record_validator_sample_rate_validates_records_at_interval():
+    validator = RecordValidator(ARTICLE_SCHEMA, sample_rate=0.25)
+    validator.validate(valid_article())
+    for _ in range(3):
+        validator.validate(ET.Element("ARTICLE"))
+    with pytest.raises(FeedValidationError, match="Record 5 does not match"):
+        validator.validate(ET.Element("ARTICLE"))
+    assert validator.validated_record_count == 2  # noqa: PLR2004